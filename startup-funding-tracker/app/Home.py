@@ -1,8 +1,6 @@
 import streamlit as st
-import pandas as pd
-from utils.filters import load_data, sidebar_filters
-from utils.kpis import calculate_kpis
-from utils.charts import pie_chart, bar_chart, donut_chart
+from utils.summary import headline_kpis
+from utils.metrics import begin_rerun
 
 # --- CONFIG ---
 st.set_page_config(
@@ -10,6 +8,7 @@ st.set_page_config(
     page_icon="🚀",
     layout="wide"
 )
+begin_rerun("Home")
 
 # --- CUSTOM CSS ---
 st.markdown("""
@@ -106,8 +105,44 @@ with st.expander("📘 About this Project", expanded=True):
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
+def kpi_cards(kpis):
+    cols = st.columns(4)
+    for i, (key, val) in enumerate(kpis.items()):
+        card_class = "kpi-card highlight-card" if "Highest Success Startup" in key else "kpi-card"
+        val_display = f"{val:,.2f}" if isinstance(val, (int, float)) else val
+
+        with cols[i % 4]:
+            st.markdown(
+                f"""
+                <div class="{card_class}">
+                    <div class="kpi-value">{val_display}</div>
+                    <div class="kpi-label">{key}</div>
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+
+# --- FIRST PAINT ---
+# A session's first run shows whole-dataset headlines from the precomputed
+# summary while pandas, Plotly and the full dataset load below.
+first_paint = st.empty()
+if "filter_key" not in st.session_state:
+    headline = headline_kpis()
+    if headline:
+        with first_paint.container():
+            st.markdown('<p class="section-header">📈 Key Performance Indicators</p>', unsafe_allow_html=True)
+            st.caption("All startups — loading your filtered view…")
+            kpi_cards(headline)
+
 # --- LOAD & FILTER DATA ---
+from utils.filters import load_data, sidebar_filters
+from utils.kpis import calculate_kpis
+from utils.cache import cached_kpi_stats, partition_table
+from utils.partials import group_stat, partition_mask
+from utils.charts import pie_chart, bar_chart, donut_chart
+
 df = sidebar_filters(load_data())
+first_paint.empty()
 
 # --- HANDLE EMPTY FILTER RESULT ---
 if df is None or df.empty:
@@ -116,23 +151,11 @@ if df is None or df.empty:
 
 # --- KPI SECTION ---
 st.markdown('<p class="section-header">📈 Key Performance Indicators</p>', unsafe_allow_html=True)
-kpis = calculate_kpis(df)
-
-cols = st.columns(4)
-for i, (key, val) in enumerate(kpis.items()):
-    card_class = "kpi-card highlight-card" if "Highest Success Startup" in key else "kpi-card"
-    val_display = f"{val:,.2f}" if isinstance(val, (int, float)) else val
-
-    with cols[i % 4]:
-        st.markdown(
-            f"""
-            <div class="{card_class}">
-                <div class="kpi-value">{val_display}</div>
-                <div class="kpi-label">{key}</div>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+filter_key = st.session_state["filter_key"]
+kpis = calculate_kpis(df, cached_kpi_stats(filter_key, df))
+parts = partition_table()
+mask = partition_mask(parts, filter_key)
+kpi_cards(kpis)
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
@@ -143,7 +166,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     if not df.empty:
-        industry_data = df.groupby("industry")["funding_musd"].sum().sort_values(ascending=False).head(10).reset_index()
+        industry_data = group_stat(parts, "industry", "funding_musd", "sum", mask).sort_values(ascending=False).head(10).reset_index()
         if not industry_data.empty:
             st.plotly_chart(bar_chart(industry_data, "industry", "funding_musd", "Top 10 Industries by Total Funding ($M)"), use_container_width=True)
         else:
@@ -153,7 +176,7 @@ with col1:
 
 with col2:
     if not df.empty:
-        country_data = df.groupby("country")["funding_musd"].sum().reset_index()
+        country_data = group_stat(parts, "country", "funding_musd", "sum", mask).reset_index()
         if not country_data.empty:
             st.plotly_chart(donut_chart(country_data, "country", "funding_musd", "Funding Distribution by Country"), use_container_width=True)
         else:
@@ -169,7 +192,7 @@ st.markdown('<p class="section-header">💎 Valuation and Success Patterns</p>',
 col3, col4 = st.columns(2)
 with col3:
     if not df.empty:
-        top_valuation = df.groupby("industry")["valuation_busd"].mean().sort_values(ascending=False).head(10).reset_index()
+        top_valuation = group_stat(parts, "industry", "valuation_busd", "mean", mask).sort_values(ascending=False).head(10).reset_index()
         if not top_valuation.empty:
             st.plotly_chart(pie_chart(top_valuation, "industry", "valuation_busd", "Average Valuation by Industry ($B)"), use_container_width=True)
         else:
@@ -179,7 +202,7 @@ with col3:
 
 with col4:
     if not df.empty:
-        success_by_country = df.groupby("country")["success_score"].mean().sort_values(ascending=False).head(10).reset_index()
+        success_by_country = group_stat(parts, "country", "success_score", "mean", mask).sort_values(ascending=False).head(10).reset_index()
         if not success_by_country.empty:
             st.plotly_chart(bar_chart(success_by_country, "country", "success_score", "Average Success Score by Country"), use_container_width=True)
         else:
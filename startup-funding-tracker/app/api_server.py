@@ -0,0 +1,317 @@
+"""JSON API over the dashboard's aggregates, for tools that cannot embed Streamlit.
+
+Run from the project root: `python app/api_server.py`. Every endpoint takes
+the sidebar's filters as query parameters, with the same defaults:
+
+    country=USA&country=India     (default: first 3 countries, "all" for every one)
+    industry=AI                   (default: first 5 industries, "all" for every one)
+    year_from=2005&year_to=2020   (default: the full founded-year range)
+
+GET /health, /filters, /kpis, /industries, /countries, /exits,
+/percentiles?metric=funding_musd&by=industry,
+/export?format=csv|parquet&column=name&column=country&limit=10000
+
+Blocking work runs on a bounded thread pool; requests beyond API_MAX_PENDING
+get 503. Responses carry an ETag derived from the dataset version and the
+request, so `If-None-Match` revalidation costs one metadata lookup. /export
+is streamed with chunked transfer encoding instead, one chunk at a time.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from utils import queries
+from utils.cache import cached_kpi_stats, exit_analytics, industry_blocks, percentile_breakdown
+from utils.config import API_HOST, API_MAX_PENDING, API_PORT, API_WORKERS
+from utils.config import EXPORT_MAX_ROWS
+from utils.data_cache import data_version, versioned
+from utils.export import FORMATS, export_chunks
+from utils.filters import default_selection, filter_frame, filter_key, load_data
+from utils.kpis import calculate_kpis
+from utils.metrics import adopt_rerun
+from utils.scheduler import read_conn
+from utils.warmup import start_warmup
+
+log = logging.getLogger("api")
+
+PERCENTILE_METRICS = ["funding_musd", "valuation_busd", "revenue_musd", "employees", "success_score"]
+PERCENTILE_GROUPS = ["industry", "country"]
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def jsonable(value):
+    """`value` with frames, NumPy scalars/arrays and NaN turned into plain JSON types."""
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient="records"))
+    if isinstance(value, pd.Series):
+        return json.loads(value.to_json())
+    if isinstance(value, dict):
+        return {str(k): jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+@versioned(pinned=True)
+def sidebar_options():
+    """`filter_options` of the whole dataset, read with DISTINCT queries once per dataset version."""
+    conn = read_conn()
+    distinct = lambda column: [row[0] for row in conn.execute(
+        f"SELECT DISTINCT {column} FROM startups WHERE {column} IS NOT NULL ORDER BY {column}")]
+    return (sorted(distinct("country")), sorted(distinct("industry")),
+            sorted(int(year) for year in distinct("founded_year")))
+
+
+def selection(params):
+    """Filter key for the query parameters, defaulted exactly like `sidebar_filters`."""
+    countries, industries, years = sidebar_options()
+    default_countries, default_industries, (y0, y1) = default_selection(countries, industries, years)
+
+    def chosen(name, options, default):
+        values = params.get(name)
+        if not values:
+            return default
+        if values == ["all"]:
+            return options
+        return [v for v in values if v in options]
+
+    try:
+        year_range = (int(params.get("year_from", [y0])[0]), int(params.get("year_to", [y1])[0]))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "year_from and year_to must be integers")
+    return filter_key(chosen("country", countries, default_countries),
+                      chosen("industry", industries, default_industries), year_range)
+
+
+def require_rows(key):
+    """Raise a 404 ApiError unless filter `key` selects at least one startup (an indexed SQL probe)."""
+    if not queries.has_rows(key, conn=read_conn()):
+        raise ApiError(HTTPStatus.NOT_FOUND, "No data available for the selected filters.")
+
+
+def selected_rows(key):
+    """Rows of filter `key`, for the endpoints that need them rather than an SQL aggregate."""
+    require_rows(key)
+    return filter_frame(load_data(), key)
+
+
+def filters_endpoint(params):
+    countries, industries, years = sidebar_options()
+    default_countries, default_industries, default_years = default_selection(countries, industries, years)
+    return {"countries": countries, "industries": industries, "years": [min(years), max(years)],
+            "default": {"country": default_countries, "industry": default_industries, "years": list(default_years)}}
+
+
+def kpis_endpoint(params):
+    key = selection(params)
+    df = selected_rows(key)
+    return {"filters": key, "kpis": calculate_kpis(df, cached_kpi_stats(key, df))}
+
+
+def industries_endpoint(params):
+    key = selection(params)
+    require_rows(key)
+    return {"filters": key, **industry_blocks(key)}
+
+
+def countries_endpoint(params):
+    key = selection(params)
+    require_rows(key)
+    aggs = {"funding_musd": "SUM", "valuation_busd": "AVG", "success_score": "AVG", "employees": "AVG"}
+    return {"filters": key, "countries": queries.group_aggregate(key, "country", aggs, "funding_musd")}
+
+
+def exits_endpoint(params):
+    key = selection(params)
+    require_rows(key)
+    return {"filters": key, **exit_analytics(key)}
+
+
+def percentiles_endpoint(params):
+    metric = params.get("metric", ["funding_musd"])[0]
+    by = params.get("by", ["industry"])[0]
+    if metric not in PERCENTILE_METRICS or by not in PERCENTILE_GROUPS:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"metric must be one of {PERCENTILE_METRICS}, by one of {PERCENTILE_GROUPS}")
+    key = selection(params)
+    return {"filters": key, "metric": metric, "by": by,
+            "percentiles": percentile_breakdown(selected_rows(key), key, metric, by).reset_index()}
+
+
+def export_stream(params):
+    """(content type, bytes iterator) of the filtered startups in the requested format."""
+    fmt = {"csv": "CSV", "parquet": "Parquet"}.get(params.get("format", ["csv"])[0])
+    if fmt is None:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "format must be csv or parquet")
+    try:
+        limit = int(params.get("limit", [EXPORT_MAX_ROWS])[0])
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "limit must be a positive integer")
+    limit = min(limit, EXPORT_MAX_ROWS)
+    key = selection(params)
+    chunks = export_chunks(key, params.get("column"), limit, fmt)
+    try:
+        # Runs the column check and opens the cursor before the 200 is sent.
+        first = next(chunks, b"")
+    except ValueError as exc:
+        raise ApiError(HTTPStatus.BAD_REQUEST, str(exc))
+    return FORMATS[fmt][1], _prepend(first, chunks)
+
+
+def _prepend(first, chunks):
+    yield first
+    yield from chunks
+
+
+ROUTES = {
+    "/health": lambda params: {"status": "ok", "data_version": data_version()},
+    "/filters": filters_endpoint,
+    "/kpis": kpis_endpoint,
+    "/industries": industries_endpoint,
+    "/countries": countries_endpoint,
+    "/exits": exits_endpoint,
+    "/percentiles": percentiles_endpoint,
+    "/export": export_stream,
+}
+
+
+class ApiServer:
+    def __init__(self, workers=API_WORKERS, max_pending=API_MAX_PENDING):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self.slots = asyncio.Semaphore(max_pending)
+
+    async def run_blocking(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def respond(self, method, target, headers):
+        """(status, extra headers, body bytes) for one request."""
+        if method not in ("GET", "HEAD"):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"Allow": "GET, HEAD"}, b""
+        url = urlsplit(target)
+        handler = ROUTES.get(url.path.rstrip("/") or "/")
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {}, json.dumps({"error": f"Unknown endpoint {url.path}"}).encode()
+        if self.slots.locked():
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"Retry-After": "1"}, json.dumps({"error": "Server busy"}).encode()
+        if url.path.rstrip("/") == "/export":
+            # A streamed export keeps its slot until `write_chunks` has sent the last chunk.
+            await self.slots.acquire()
+            status, extra, body = await self.stream(target, parse_qs(url.query))
+            if isinstance(body, bytes):
+                self.slots.release()
+            return status, extra, body
+        async with self.slots:
+            version = await self.run_blocking(data_version)
+            canonical = json.dumps([version, url.path, sorted(parse_qs(url.query).items())])
+            etag = f'"{hashlib.blake2b(canonical.encode(), digest_size=12).hexdigest()}"'
+            if etag in [t.strip() for t in headers.get("if-none-match", "").split(",")]:
+                return HTTPStatus.NOT_MODIFIED, {"ETag": etag}, b""
+            try:
+                payload = await self.run_blocking(self.compute, handler, url.path, parse_qs(url.query))
+            except ApiError as exc:
+                return exc.status, {}, json.dumps({"error": str(exc)}).encode()
+            except Exception:
+                log.exception("Request %s failed", target)
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {}, json.dumps({"error": "Internal error"}).encode()
+            return HTTPStatus.OK, {"ETag": etag, "Cache-Control": "no-cache"}, payload
+
+    async def stream(self, target, params):
+        try:
+            content_type, chunks = await self.run_blocking(export_stream, params)
+        except ApiError as exc:
+            return exc.status, {}, json.dumps({"error": str(exc)}).encode()
+        except Exception:
+            log.exception("Request %s failed", target)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {}, json.dumps({"error": "Internal error"}).encode()
+        return HTTPStatus.OK, {"Content-Type": content_type}, chunks
+
+    @staticmethod
+    def compute(handler, path, params):
+        # Spans recorded while answering count as one "rerun" of the API page on the diagnostics page.
+        adopt_rerun((uuid.uuid4().hex[:12], f"API {path}"))
+        return json.dumps(jsonable(handler(params)), separators=(",", ":")).encode()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split(maxsplit=2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                status, extra, body = await self.respond(method, target, headers)
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and not version.strip().upper().endswith("1.0"))
+                streamed = not isinstance(body, bytes)
+                head = [f"HTTP/1.1 {status.value} {status.phrase}",
+                        "Transfer-Encoding: chunked" if streamed else f"Content-Length: {len(body)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                if body and "Content-Type" not in extra:
+                    head.append("Content-Type: application/json")
+                head += [f"{k}: {v}" for k, v in extra.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode())
+                if streamed:
+                    await self.write_chunks(writer, body, method == "HEAD")
+                elif method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+    async def write_chunks(self, writer, chunks, head_only):
+        """Send `chunks` with chunked encoding, pulling each one on the pool once the last is sent.
+
+        Closes the generator (and its SQLite cursor) and frees the request's slot when done.
+        """
+        try:
+            if head_only:
+                return
+            while (chunk := await self.run_blocking(next, chunks, None)) is not None:
+                if chunk:
+                    writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    await writer.drain()
+            writer.write(b"0\r\n\r\n")
+        finally:
+            await self.run_blocking(chunks.close)
+            self.slots.release()
+
+
+async def serve(host=API_HOST, port=API_PORT):
+    api = ApiServer()
+    server = await asyncio.start_server(api.handle, host, port)
+    log.info("Serving the dashboard API on http://%s:%d", host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    start_warmup()
+    asyncio.run(serve())
@@ -1,10 +1,16 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from utils.filters import load_data, sidebar_filters
+from utils.filters import filter_frame, load_data, sidebar_selection
+from utils.queries import has_rows
+from utils.charts import scatter_chart
+from utils.cache import industry_blocks, percentile_breakdown
+from utils.layout import section, section_header
+from utils.metrics import begin_rerun
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Industry Insights", page_icon="📊", layout="wide")
+begin_rerun("Industry Insights")
 
 # --- CUSTOM CSS ---
 st.markdown("""
@@ -46,78 +52,117 @@ st.title("📊 Industry Insights")
 st.caption("Analyze funding, valuation, workforce, and performance metrics across industries.")
 
 # --- LOAD & FILTER DATA ---
-df = sidebar_filters(load_data())
+# Sections read SQL aggregates; only the percentile panel filters rows, when it is opened.
+filter_key = sidebar_selection(load_data())
 
-if df.empty:
+if not has_rows(filter_key):
     st.warning("⚠️ No data available for selected filters. Try adjusting the filters in the sidebar.")
     st.stop()
 
+# Every section's aggregates, queried concurrently and cached per filter key.
+blocks = industry_blocks(filter_key)
+
 # --- KPI CARDS ---
-st.markdown('<p class="section-header">💡 Key Industry Statistics</p>', unsafe_allow_html=True)
+section_header("💡 Key Industry Statistics")
 
 col1, col2, col3 = st.columns(3)
 with col1:
     st.markdown('<div class="insight-card"><div class="metric">'
-                f"{df['industry'].nunique()}</div><div class='label'>Active Industries</div></div>", unsafe_allow_html=True)
+                f"{len(blocks['heatmap'])}</div><div class='label'>Active Industries</div></div>", unsafe_allow_html=True)
 with col2:
-    top_fund_ind = df.groupby("industry")["funding_musd"].sum().idxmax()
+    top_fund_ind = blocks["funding"].iloc[0]["industry"]
     st.markdown('<div class="insight-card"><div class="metric">'
                 f"{top_fund_ind}</div><div class='label'>Top Funded Industry</div></div>", unsafe_allow_html=True)
 with col3:
-    top_val_ind = df.groupby("industry")["valuation_busd"].mean().idxmax()
+    top_val_ind = blocks["valuation"].iloc[0]["industry"]
     st.markdown('<div class="insight-card"><div class="metric">'
                 f"{top_val_ind}</div><div class='label'>Highest Valuation Industry</div></div>", unsafe_allow_html=True)
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
+
+def block(name):
+    # `blocks` is fully determined by the filter key, so the key stands in for it.
+    return lambda key: blocks[name]
+
+
 # --- FUNDING DISTRIBUTION ---
-st.markdown('<p class="section-header">💰 Funding Distribution by Industry</p>', unsafe_allow_html=True)
-funding_data = df.groupby("industry")["funding_musd"].sum().sort_values(ascending=False).head(10).reset_index()
-fig = px.bar(funding_data, x="funding_musd", y="industry", orientation="h",
-             title="Top 10 Industries by Funding", color="funding_musd", color_continuous_scale="Blues")
-st.plotly_chart(fig, use_container_width=True)
+def render_funding(funding_data):
+    fig = px.bar(funding_data, x="funding_musd", y="industry", orientation="h",
+                 title="Top 10 Industries by Funding", color="funding_musd", color_continuous_scale="Blues")
+    st.plotly_chart(fig, use_container_width=True)
+
+funding_data = section("💰 Funding Distribution by Industry", render_funding, "industry_funding", deps=(filter_key,),
+                       load=block("funding"))
 
 # --- AVERAGE VALUATION ---
-st.markdown('<p class="section-header">💎 Average Valuation by Industry</p>', unsafe_allow_html=True)
-valuation_data = df.groupby("industry")["valuation_busd"].mean().sort_values(ascending=False).head(10).reset_index()
-fig2 = px.pie(valuation_data, names="industry", values="valuation_busd",
-              title="Average Valuation ($B) Distribution by Industry", hole=0.4)
-st.plotly_chart(fig2, use_container_width=True)
+def render_valuation(valuation_data):
+    fig2 = px.pie(valuation_data, names="industry", values="valuation_busd",
+                  title="Average Valuation ($B) Distribution by Industry", hole=0.4)
+    st.plotly_chart(fig2, use_container_width=True)
+
+valuation_data = section("💎 Average Valuation by Industry", render_valuation, "industry_valuation", deps=(filter_key,),
+                         load=block("valuation"))
 
 # --- FUNDING vs SUCCESS ---
-st.markdown('<p class="section-header">📈 Funding vs Success Score</p>', unsafe_allow_html=True)
-corr_data = df.groupby("industry")[["funding_musd", "success_score"]].mean().reset_index()
-fig3 = px.scatter(corr_data, x="funding_musd", y="success_score", size="success_score",
-                  color="industry", hover_name="industry",
-                  title="Correlation Between Funding and Success by Industry")
-st.plotly_chart(fig3, use_container_width=True)
+def render_success(corr_data):
+    fig3 = scatter_chart(corr_data, "funding_musd", "success_score", "Correlation Between Funding and Success by Industry",
+                         size="success_score", color="industry", hover_name="industry")
+    st.plotly_chart(fig3, use_container_width=True)
+
+section("📈 Funding vs Success Score", render_success, "industry_success", deps=(filter_key,),
+        load=block("success"))
 
 # --- EMPLOYEE SCALE ---
-st.markdown('<p class="section-header">👥 Average Employees per Industry</p>', unsafe_allow_html=True)
-emp_data = df.groupby("industry")["employees"].mean().sort_values(ascending=False).reset_index()
-fig4 = px.bar(emp_data, x="industry", y="employees", title="Average Employees by Industry",
-              color="employees", color_continuous_scale="Purples")
-st.plotly_chart(fig4, use_container_width=True)
+def render_employees(emp_data):
+    fig4 = px.bar(emp_data, x="industry", y="employees", title="Average Employees by Industry",
+                  color="employees", color_continuous_scale="Purples")
+    st.plotly_chart(fig4, use_container_width=True)
+
+section("👥 Average Employees per Industry", render_employees, "industry_employees", deps=(filter_key,),
+        load=block("employees"))
 
 # --- REVENUE-VALUATION RATIO ---
-st.markdown('<p class="section-header">⚖️ Revenue-to-Valuation Ratio</p>', unsafe_allow_html=True)
-ratio_data = df.groupby("industry")[["revenue_musd", "valuation_busd"]].mean().reset_index()
-ratio_data["efficiency_ratio"] = ratio_data["revenue_musd"] / ratio_data["valuation_busd"]
-ratio_data = ratio_data.sort_values("efficiency_ratio", ascending=False)
-fig5 = px.bar(ratio_data, x="efficiency_ratio", y="industry", orientation="h",
-              title="Revenue Efficiency by Industry", color="efficiency_ratio", color_continuous_scale="Tealgrn")
-st.plotly_chart(fig5, use_container_width=True)
+def load_ratio(key):
+    ratio_data = blocks["ratio"].copy()
+    ratio_data["efficiency_ratio"] = ratio_data["revenue_musd"] / ratio_data["valuation_busd"]
+    return ratio_data.sort_values("efficiency_ratio", ascending=False)
+
+def render_ratio(ratio_data):
+    fig5 = px.bar(ratio_data, x="efficiency_ratio", y="industry", orientation="h",
+                  title="Revenue Efficiency by Industry", color="efficiency_ratio", color_continuous_scale="Tealgrn")
+    st.plotly_chart(fig5, use_container_width=True)
+
+ratio_data = section("⚖️ Revenue-to-Valuation Ratio", render_ratio, "industry_ratio", deps=(filter_key,), load=load_ratio)
+
+# --- PERCENTILES ---
+def load_percentiles(key):
+    df = filter_frame(load_data(), key)
+    return {metric: percentile_breakdown(df, key, metric, "industry").reset_index() for metric in ("funding_musd", "valuation_busd")}
+
+def render_percentiles(pcts):
+    pct_cols = st.columns(2)
+    for pct_col, metric, label in [(pct_cols[0], "funding_musd", "Funding ($M)"), (pct_cols[1], "valuation_busd", "Valuation ($B)")]:
+        fig_pct = px.bar(pcts[metric].melt(id_vars="industry", var_name="percentile", value_name=metric),
+                         x="industry", y=metric, color="percentile", barmode="group",
+                         title=f"{label} p50 / p90 / p99 by Industry")
+        pct_col.plotly_chart(fig_pct, use_container_width=True)
+
+section("📐 Funding & Valuation Percentiles", render_percentiles, "industry_percentiles", deps=(filter_key,),
+        load=load_percentiles, lazy=True)
 
 # --- HEATMAP (BONUS) ---
-st.markdown('<p class="section-header">🔥 Multi-Metric Comparison (Heatmap)</p>', unsafe_allow_html=True)
-heat_data = df.groupby("industry")[["funding_musd", "valuation_busd", "success_score", "employees", "revenue_musd"]].mean().reset_index()
-fig6 = px.imshow(
-    heat_data.set_index("industry").T,
-    aspect="auto",
-    color_continuous_scale="Blues",
-    title="Industry Performance Comparison Matrix"
-)
-st.plotly_chart(fig6, use_container_width=True)
+def render_heatmap(heat_data):
+    fig6 = px.imshow(
+        heat_data.set_index("industry").T,
+        aspect="auto",
+        color_continuous_scale="Blues",
+        title="Industry Performance Comparison Matrix"
+    )
+    st.plotly_chart(fig6, use_container_width=True)
+
+section("🔥 Multi-Metric Comparison (Heatmap)", render_heatmap, "industry_heatmap", deps=(filter_key,),
+        load=block("heatmap"), lazy=True)
 
 # --- SUMMARY INSIGHTS ---
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
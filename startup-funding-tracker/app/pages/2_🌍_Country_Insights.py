@@ -1,11 +1,16 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 from utils.filters import load_data, sidebar_filters
+from utils.charts import choropleth_map, radar_chart, scatter_chart
+from utils.cache import country_codes, partition_table, percentile_breakdown, selection_totals
+from utils.partials import group_stat, group_stats, partition_mask
+from utils.layout import section, section_header
+from utils.metrics import begin_rerun
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Country Insights", page_icon="🌍", layout="wide")
+begin_rerun("Country Insights")
 
 # --- CUSTOM STYLES ---
 st.markdown("""
@@ -59,13 +64,17 @@ if df.empty:
     st.stop()
 
 # --- KPI CARDS ---
-st.markdown('<p class="section-header">💡 Global Overview</p>', unsafe_allow_html=True)
+section_header("💡 Global Overview")
 col1, col2, col3, col4 = st.columns(4)
 
-top_fund_country = df.groupby("country")["funding_musd"].sum().idxmax()
-top_val_country = df.groupby("country")["valuation_busd"].mean().idxmax()
-avg_success = round(df["success_score"].mean(), 2)
-total_funding = round(df["funding_musd"].sum(), 2)
+filter_key = st.session_state["filter_key"]
+parts = partition_table()
+mask = partition_mask(parts, filter_key)
+totals = selection_totals(filter_key).to_dict()
+top_fund_country = group_stat(parts, "country", "funding_musd", "sum", mask).idxmax()
+top_val_country = group_stat(parts, "country", "valuation_busd", "mean", mask).idxmax()
+avg_success = round(totals["success_score"]["mean"], 2)
+total_funding = round(totals["funding_musd"]["sum"], 2)
 
 with col1:
     st.markdown(f"<div class='insight-card'><div class='metric'>{df['country'].nunique()}</div><div class='label'>Countries Analyzed</div></div>", unsafe_allow_html=True)
@@ -81,88 +90,123 @@ st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 # --- COUNTRY SELECTION ---
 countries = sorted(df["country"].unique())
 selected_countries = st.multiselect("🌎 Compare Specific Countries", countries, default=countries[:6])
-filtered_df = df[df["country"].isin(selected_countries)]
+country_mask = mask & parts["country"].isin(selected_countries).to_numpy()
 
-if filtered_df.empty:
+if not country_mask.any():
     st.warning("No data for selected countries.")
     st.stop()
 
-# --- FUNDING DISTRIBUTION ---
-st.markdown('<p class="section-header">💰 Total Funding & Growth</p>', unsafe_allow_html=True)
-col1, col2 = st.columns(2)
+selection = (filter_key, tuple(selected_countries))
 
-with col1:
-    fund_data = filtered_df.groupby("country")["funding_musd"].sum().sort_values(ascending=False).reset_index()
-    fig = px.bar(fund_data, x="funding_musd", y="country", orientation="h",
-                 color="funding_musd", color_continuous_scale="Blues",
-                 title="Total Startup Funding by Country ($M)", text_auto=".2s")
-    fig.update_layout(margin=dict(l=0, r=0, t=40, b=0))
-    st.plotly_chart(fig, use_container_width=True)
 
-with col2:
-    yearly = filtered_df.groupby(["founded_year", "country"])["funding_musd"].sum().reset_index()
-    fig2 = px.area(yearly, x="founded_year", y="funding_musd", color="country",
-                   title="Funding Growth Over Time", line_group="country")
-    fig2.update_layout(margin=dict(l=0, r=0, t=40, b=0))
-    st.plotly_chart(fig2, use_container_width=True)
+def selection_mask(key, chosen):
+    return partition_mask(parts, key) & parts["country"].isin(chosen).to_numpy()
+
+
+def country_means(*metrics):
+    return lambda key, chosen: group_stats(parts, "country", {m: "mean" for m in metrics}, selection_mask(key, chosen)).reset_index()
+
+
+# --- FUNDING DISTRIBUTION ---
+def load_funding(key, chosen):
+    sel = selection_mask(key, chosen)
+    fund_data = group_stat(parts, "country", "funding_musd", "sum", sel).sort_values(ascending=False).reset_index()
+    yearly = group_stat(parts, ["founded_year", "country"], "funding_musd", "sum", sel).reset_index()
+    return fund_data, yearly
+
+def render_funding(data):
+    fund_data, yearly = data
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fig = px.bar(fund_data, x="funding_musd", y="country", orientation="h",
+                     color="funding_musd", color_continuous_scale="Blues",
+                     title="Total Startup Funding by Country ($M)", text_auto=".2s")
+        fig.update_layout(margin=dict(l=0, r=0, t=40, b=0))
+        st.plotly_chart(fig, use_container_width=True)
+
+    with col2:
+        fig2 = px.area(yearly, x="founded_year", y="funding_musd", color="country",
+                       title="Funding Growth Over Time", line_group="country")
+        fig2.update_layout(margin=dict(l=0, r=0, t=40, b=0))
+        st.plotly_chart(fig2, use_container_width=True)
+
+fund_data, _ = section("💰 Total Funding & Growth", render_funding, "country_funding", deps=selection, load=load_funding)
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- VALUATION vs SUCCESS ---
-st.markdown('<p class="section-header">💎 Valuation vs Success Performance</p>', unsafe_allow_html=True)
-corr = filtered_df.groupby("country")[["valuation_busd", "success_score"]].mean().reset_index()
-fig3 = px.scatter(corr, x="valuation_busd", y="success_score",
-                  size="valuation_busd", color="country", hover_name="country",
-                  title="Valuation vs Success Score (Avg per Country)")
-st.plotly_chart(fig3, use_container_width=True)
+def render_valuation(corr):
+    fig3 = scatter_chart(corr, "valuation_busd", "success_score", "Valuation vs Success Score (Avg per Country)",
+                         size="valuation_busd", color="country", hover_name="country")
+    st.plotly_chart(fig3, use_container_width=True)
+
+corr = section("💎 Valuation vs Success Performance", render_valuation, "country_valuation", deps=selection,
+               load=country_means("valuation_busd", "success_score"))
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- EFFICIENCY MATRIX ---
-st.markdown('<p class="section-header">⚖️ Revenue Efficiency Matrix</p>', unsafe_allow_html=True)
-eff = filtered_df.groupby("country")[["revenue_musd", "valuation_busd", "employees"]].mean().reset_index()
-eff["efficiency"] = eff["revenue_musd"] / eff["valuation_busd"]
-fig4 = px.scatter(eff, x="employees", y="efficiency", size="valuation_busd", color="country",
-                  hover_name="country", title="Revenue-to-Valuation Efficiency vs Employees")
-st.plotly_chart(fig4, use_container_width=True)
+def load_efficiency(key, chosen):
+    eff = country_means("revenue_musd", "valuation_busd", "employees")(key, chosen)
+    eff["efficiency"] = eff["revenue_musd"] / eff["valuation_busd"]
+    return eff
+
+def render_efficiency(eff):
+    fig4 = scatter_chart(eff, "employees", "efficiency", "Revenue-to-Valuation Efficiency vs Employees",
+                         size="valuation_busd", color="country", hover_name="country")
+    st.plotly_chart(fig4, use_container_width=True)
+
+eff = section("⚖️ Revenue Efficiency Matrix", render_efficiency, "country_efficiency", deps=selection, load=load_efficiency)
+
+st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+
+# --- PERCENTILES ---
+def load_percentiles(key, chosen):
+    country_key = (tuple(c for c in key[0] if c in chosen), key[1], key[2])
+    country_rows = df[df["country"].isin(chosen)]
+    return {metric: percentile_breakdown(country_rows, country_key, metric, "country").reset_index()
+            for metric in ("funding_musd", "valuation_busd")}
+
+def render_percentiles(pcts):
+    pct_cols = st.columns(2)
+    for pct_col, metric, label in [(pct_cols[0], "funding_musd", "Funding ($M)"), (pct_cols[1], "valuation_busd", "Valuation ($B)")]:
+        fig_pct = px.bar(pcts[metric].melt(id_vars="country", var_name="percentile", value_name=metric),
+                         x="country", y=metric, color="percentile", barmode="group",
+                         title=f"{label} p50 / p90 / p99 by Country")
+        fig_pct.update_layout(margin=dict(l=0, r=0, t=40, b=0))
+        pct_col.plotly_chart(fig_pct, use_container_width=True)
+
+section("📐 Funding & Valuation Percentiles", render_percentiles, "country_percentiles", deps=selection,
+        load=load_percentiles, lazy=True)
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- GEO FUNDING MAP ---
-st.markdown('<p class="section-header">🌍 Global Funding Map</p>', unsafe_allow_html=True)
-geo = df.groupby("country")["funding_musd"].sum().reset_index()
-fig5 = px.choropleth(
-    geo, locations="country", locationmode="country names",
-    color="funding_musd", hover_name="country",
-    color_continuous_scale="Viridis",
-    title="Global Distribution of Startup Funding ($M)"
-)
-fig5.update_layout(height=500, margin=dict(l=0, r=0, t=40, b=0))
-st.plotly_chart(fig5, use_container_width=True)
+def load_geo(key):
+    geo = group_stat(parts, "country", "funding_musd", "sum", partition_mask(parts, key))
+    geo_codes = country_codes().reindex(geo.index)
+    return geo_codes[geo_codes.notna()], geo[geo_codes.notna()]
+
+def render_geo(data):
+    geo_codes, geo = data
+    fig5 = choropleth_map(geo_codes, geo, "Global Distribution of Startup Funding ($M)", names=geo.index)
+    st.plotly_chart(fig5, use_container_width=True)
+
+# The map covers every filtered country, so it ignores the comparison picker.
+section("🌍 Global Funding Map", render_geo, "country_geo", deps=(filter_key,), load=load_geo, lazy=True)
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- RADAR CHART (MULTI-METRIC COMPARISON) ---
-st.markdown('<p class="section-header">📊 Multi-Metric Comparison (Radar View)</p>', unsafe_allow_html=True)
 metric_cols = ["funding_musd", "valuation_busd", "success_score", "revenue_musd", "employees"]
-radar_data = filtered_df.groupby("country")[metric_cols].mean().reset_index()
-radar_data_norm = radar_data.copy()
-radar_data_norm[metric_cols] = radar_data_norm[metric_cols].div(radar_data_norm[metric_cols].max())
-
-fig6 = go.Figure()
-for _, row in radar_data_norm.iterrows():
-    fig6.add_trace(go.Scatterpolar(
-        r=row[metric_cols].values.tolist(),
-        theta=metric_cols,
-        fill='toself',
-        name=row["country"]
-    ))
-fig6.update_layout(
-    polar=dict(radialaxis=dict(visible=True, range=[0, 1])),
-    title="Performance Radar by Country (Normalized)",
-    showlegend=True
-)
-st.plotly_chart(fig6, use_container_width=True)
+
+def render_radar(radar_data):
+    fig6 = radar_chart(radar_data, "country", metric_cols, "Performance Radar by Country (Normalized)")
+    st.plotly_chart(fig6, use_container_width=True)
+
+section("📊 Multi-Metric Comparison (Radar View)", render_radar, "country_radar", deps=selection,
+        load=country_means(*metric_cols), lazy=True)
 
 # --- INSIGHTS SUMMARY ---
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
@@ -2,10 +2,16 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from utils.filters import load_data, sidebar_filters
+from utils.filters import load_data, sidebar_selection
+from utils.charts import choropleth_map
+from utils.cache import choropleth_frames, country_codes, partition_table, year_index
+from utils.partials import group_stat, partition_mask
+from utils.layout import section, section_header
+from utils.metrics import begin_rerun
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Trends Over Time", page_icon="📅", layout="wide")
+begin_rerun("Trends Over Time")
 
 # --- CUSTOM CSS ---
 st.markdown("""
@@ -52,15 +58,23 @@ st.title("📅 Trends Over Time")
 st.caption("Track how startup ecosystems evolved year by year — funding, valuation, success, and growth metrics.")
 
 # --- LOAD & FILTER DATA ---
-df = sidebar_filters(load_data())
-if df.empty:
+# Everything below reads the year index and partitions, so the selection is never applied to rows.
+filter_key = sidebar_selection(load_data())
+if year_index().totals(filter_key)["rows"] == 0:
     st.warning("⚠️ No data available for the selected filters.")
     st.stop()
 
 # --- PREPROCESS ---
-df = df[df["founded_year"].notnull()]
-df["founded_year"] = df["founded_year"].astype(int)
-yearly = df.groupby("founded_year").agg({
+parts = partition_table()
+
+
+def load_by(dimension):
+    def load(key):
+        return group_stat(parts, ["founded_year", dimension], "funding_musd", "sum", partition_mask(parts, key)).reset_index()
+    return load
+
+
+yearly = year_index().yearly(filter_key, {
     "funding_musd": "sum",
     "valuation_busd": "mean",
     "success_score": "mean",
@@ -68,7 +82,7 @@ yearly = df.groupby("founded_year").agg({
 }).reset_index()
 
 # --- KPIs ---
-st.markdown('<p class="section-header">💡 Key Historical Metrics</p>', unsafe_allow_html=True)
+section_header("💡 Key Historical Metrics")
 col1, col2, col3, col4 = st.columns(4)
 
 total_years = yearly["founded_year"].nunique()
@@ -87,124 +101,132 @@ with col4:
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- FUNDING OVER TIME ---
-st.markdown('<p class="section-header">💰 Total Funding Over Time</p>', unsafe_allow_html=True)
-st.markdown("<p class='subtext'>Compare global funding evolution and see how different countries’ investments have grown across the years.</p>", unsafe_allow_html=True)
-
-# ✨ Adjusted column widths: give more space to Funding by Country
-col1, col2 = st.columns([1.2, 2.3])
+def render_funding(trend_country):
+    # ✨ Adjusted column widths: give more space to Funding by Country
+    col1, col2 = st.columns([1.2, 2.3])
+
+    with col1:
+        fig1 = px.area(
+            yearly, x="founded_year", y="funding_musd",
+            title="🌎 Global Total Funding Over Time",
+            color_discrete_sequence=["#2E86C1"]
+        )
+        fig1.update_layout(
+            yaxis_title="Funding ($M)",
+            xaxis_title="Year",
+            height=400,
+            margin=dict(l=10, r=10, t=60, b=40),
+            font=dict(size=13)
+        )
+        st.plotly_chart(fig1, use_container_width=True)
+
+    with col2:
+        fig2 = px.line(
+            trend_country, x="founded_year", y="funding_musd",
+            color="country", markers=True,
+            title="🏆 Funding Growth by Country (Yearly Trend)",
+            line_shape="spline"
+        )
+        fig2.update_traces(line=dict(width=3))
+        fig2.update_layout(
+            height=600,
+            yaxis_title="Funding ($M)",
+            xaxis_title="Year",
+            legend=dict(orientation="h", y=-0.3),
+            margin=dict(l=0, r=0, t=60, b=40),
+            font=dict(size=13),
+            plot_bgcolor="rgba(255,255,255,1)"
+        )
+        st.plotly_chart(fig2, use_container_width=True)
+
+section("💰 Total Funding Over Time", render_funding, "trends_funding", deps=(filter_key,), load=load_by("country"),
+        subtext="Compare global funding evolution and see how different countries’ investments have grown across the years.")
 
-with col1:
-    fig1 = px.area(
-        yearly, x="founded_year", y="funding_musd",
-        title="🌎 Global Total Funding Over Time",
-        color_discrete_sequence=["#2E86C1"]
-    )
-    fig1.update_layout(
-        yaxis_title="Funding ($M)",
-        xaxis_title="Year",
-        height=400,
-        margin=dict(l=10, r=10, t=60, b=40),
-        font=dict(size=13)
-    )
-    st.plotly_chart(fig1, use_container_width=True)
+st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
-with col2:
-    trend_country = df.groupby(["founded_year", "country"])["funding_musd"].sum().reset_index()
-    fig2 = px.line(
-        trend_country, x="founded_year", y="funding_musd",
-        color="country", markers=True,
-        title="🏆 Funding Growth by Country (Yearly Trend)",
-        line_shape="spline"
-    )
-    fig2.update_traces(line=dict(width=3))
-    fig2.update_layout(
-        height=600,
-        yaxis_title="Funding ($M)",
+# --- VALUATION TRENDS ---
+def render_valuation(_):
+    fig3 = go.Figure()
+    fig3.add_trace(go.Scatter(
+        x=yearly["founded_year"], y=yearly["valuation_busd"],
+        mode="lines+markers", name="Valuation ($B)",
+        line=dict(color="#16A085", width=4)
+    ))
+    fig3.add_trace(go.Bar(
+        x=yearly["founded_year"], y=yearly["funding_musd"]/1000,
+        name="Funding ($B)", marker_color="#AED6F1", opacity=0.5
+    ))
+    fig3.update_layout(
+        title="💎 Valuation vs Funding (Yearly Comparison)",
         xaxis_title="Year",
-        legend=dict(orientation="h", y=-0.3),
-        margin=dict(l=0, r=0, t=60, b=40),
-        font=dict(size=13),
-        plot_bgcolor="rgba(255,255,255,1)"
+        yaxis_title="Value",
+        legend_title="Metric",
+        height=500,
+        margin=dict(l=10, r=10, t=60, b=30)
     )
-    st.plotly_chart(fig2, use_container_width=True)
-
-st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+    st.plotly_chart(fig3, use_container_width=True)
 
-# --- VALUATION TRENDS ---
-st.markdown('<p class="section-header">💎 Valuation Trends Over Time</p>', unsafe_allow_html=True)
-st.markdown("<p class='subtext'>Track how startup valuations have evolved globally and identify high-value years.</p>", unsafe_allow_html=True)
-
-fig3 = go.Figure()
-fig3.add_trace(go.Scatter(
-    x=yearly["founded_year"], y=yearly["valuation_busd"],
-    mode="lines+markers", name="Valuation ($B)",
-    line=dict(color="#16A085", width=4)
-))
-fig3.add_trace(go.Bar(
-    x=yearly["founded_year"], y=yearly["funding_musd"]/1000,
-    name="Funding ($B)", marker_color="#AED6F1", opacity=0.5
-))
-fig3.update_layout(
-    title="💎 Valuation vs Funding (Yearly Comparison)",
-    xaxis_title="Year",
-    yaxis_title="Value",
-    legend_title="Metric",
-    height=500,
-    margin=dict(l=10, r=10, t=60, b=30)
-)
-st.plotly_chart(fig3, use_container_width=True)
+section("💎 Valuation Trends Over Time", render_valuation, "trends_valuation",
+        subtext="Track how startup valuations have evolved globally and identify high-value years.")
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- SUCCESS TRENDS ---
-st.markdown('<p class="section-header">📈 Success Score Evolution</p>', unsafe_allow_html=True)
-fig4 = px.line(yearly, x="founded_year", y="success_score", markers=True,
-               title="Average Success Score Over Time", color_discrete_sequence=["#F39C12"])
-fig4.update_layout(height=450, margin=dict(l=10, r=10, t=50, b=30))
-st.plotly_chart(fig4, use_container_width=True)
+def render_success(_):
+    fig4 = px.line(yearly, x="founded_year", y="success_score", markers=True,
+                   title="Average Success Score Over Time", color_discrete_sequence=["#F39C12"])
+    fig4.update_layout(height=450, margin=dict(l=10, r=10, t=50, b=30))
+    st.plotly_chart(fig4, use_container_width=True)
+
+section("📈 Success Score Evolution", render_success, "trends_success")
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- EFFICIENCY OVER TIME ---
-st.markdown('<p class="section-header">⚖️ Revenue-to-Valuation Efficiency Trend</p>', unsafe_allow_html=True)
-yearly["efficiency_ratio"] = yearly["revenue_musd"] / yearly["valuation_busd"]
-fig5 = go.Figure()
-fig5.add_trace(go.Scatter(
-    x=yearly["founded_year"], y=yearly["efficiency_ratio"],
-    mode="lines+markers", name="Efficiency Ratio",
-    line=dict(color="#1ABC9C", width=4)
-))
-fig5.update_layout(
-    title="⚙️ Global Efficiency Ratio (Revenue vs Valuation)",
-    xaxis_title="Year", yaxis_title="Efficiency Ratio",
-    height=450,
-    margin=dict(l=10, r=10, t=60, b=30)
-)
-st.plotly_chart(fig5, use_container_width=True)
+def render_efficiency(_):
+    efficiency_ratio = yearly["revenue_musd"] / yearly["valuation_busd"]
+    fig5 = go.Figure()
+    fig5.add_trace(go.Scatter(
+        x=yearly["founded_year"], y=efficiency_ratio,
+        mode="lines+markers", name="Efficiency Ratio",
+        line=dict(color="#1ABC9C", width=4)
+    ))
+    fig5.update_layout(
+        title="⚙️ Global Efficiency Ratio (Revenue vs Valuation)",
+        xaxis_title="Year", yaxis_title="Efficiency Ratio",
+        height=450,
+        margin=dict(l=10, r=10, t=60, b=30)
+    )
+    st.plotly_chart(fig5, use_container_width=True)
+
+section("⚖️ Revenue-to-Valuation Efficiency Trend", render_efficiency, "trends_efficiency", lazy=True)
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- INDUSTRY EVOLUTION ---
-st.markdown('<p class="section-header">🏭 Industry-Level Funding Evolution</p>', unsafe_allow_html=True)
-industry_trend = df.groupby(["founded_year", "industry"])["funding_musd"].sum().reset_index()
-fig6 = px.area(industry_trend, x="founded_year", y="funding_musd", color="industry",
-               title="Funding Trends by Industry Over Time", groupnorm=None)
-fig6.update_layout(height=500, margin=dict(l=10, r=10, t=50, b=30))
-st.plotly_chart(fig6, use_container_width=True)
+def render_industry(industry_trend):
+    fig6 = px.area(industry_trend, x="founded_year", y="funding_musd", color="industry",
+                   title="Funding Trends by Industry Over Time", groupnorm=None)
+    fig6.update_layout(height=500, margin=dict(l=10, r=10, t=50, b=30))
+    st.plotly_chart(fig6, use_container_width=True)
+
+section("🏭 Industry-Level Funding Evolution", render_industry, "trends_industry",
+        deps=(filter_key,), load=load_by("industry"), lazy=True)
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- GLOBAL FUNDING MAP ---
-st.markdown('<p class="section-header">🌍 Global Funding Map (Over the Years)</p>', unsafe_allow_html=True)
-map_data = df.groupby(["country", "founded_year"])["funding_musd"].sum().reset_index()
-fig7 = px.choropleth(
-    map_data, locations="country", locationmode="country names",
-    color="funding_musd", hover_name="country",
-    animation_frame="founded_year", color_continuous_scale="Viridis",
-    title="Yearly Global Funding Distribution"
-)
-fig7.update_layout(height=550, margin=dict(l=0, r=0, t=60, b=30))
-st.plotly_chart(fig7, use_container_width=True)
+def render_map(frames):
+    map_frames, zrange = frames
+    map_year = st.select_slider("Year", options=map_frames.index.tolist(), value=map_frames.index[-1])
+    year_values = map_frames.loc[map_year].dropna()
+    codes = country_codes().reindex(year_values.index)
+    fig7 = choropleth_map(codes.dropna(), year_values[codes.notna()], f"Global Funding Distribution — {map_year}",
+                          names=year_values.index[codes.notna()], zrange=zrange, height=550)
+    st.plotly_chart(fig7, use_container_width=True)
+
+section("🌍 Global Funding Map (Over the Years)", render_map, "trends_map",
+        deps=(filter_key,), load=choropleth_frames, lazy=True)
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
@@ -3,10 +3,16 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from utils.filters import load_data, sidebar_filters
+from utils.cache import cached_trendlines, comoment_table
+from utils.charts import add_trendlines, scatter_chart
+from utils.partials import merged_corr, partition_mask
+from utils.layout import section, section_header
 import numpy as np
+from utils.metrics import begin_rerun
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Success Factors", page_icon="🚀", layout="wide")
+begin_rerun("Success Factors")
 
 # --- CUSTOM STYLING ---
 st.markdown("""
@@ -51,108 +57,124 @@ if df.empty:
     st.stop()
 
 # --- DATA PREP ---
-numeric_cols = ["funding_musd", "valuation_busd", "revenue_musd", "employees", "success_score", "customers_mil", "followers"]
-data = df[numeric_cols].dropna()
+filter_key = st.session_state["filter_key"]
+moments = comoment_table()
+
+
+def load_corr(key):
+    return merged_corr(moments, partition_mask(moments["keys"], key))
 
-st.markdown('<p class="section-header">📊 Correlation Between Metrics</p>', unsafe_allow_html=True)
-st.markdown("<p class='subtext'>Understand how different metrics relate to startup success using correlation heatmaps.</p>", unsafe_allow_html=True)
 
 # --- CORRELATION HEATMAP ---
-corr = data.corr()
-fig_corr = px.imshow(
-    corr, text_auto=True, color_continuous_scale="Blues",
-    title="Correlation Matrix of Key Metrics", aspect="auto"
-)
-fig_corr.update_layout(height=600, margin=dict(l=0, r=0, t=60, b=40))
-st.plotly_chart(fig_corr, use_container_width=True)
+def render_corr(corr):
+    fig_corr = px.imshow(
+        corr, text_auto=True, color_continuous_scale="Blues",
+        title="Correlation Matrix of Key Metrics", aspect="auto"
+    )
+    fig_corr.update_layout(height=600, margin=dict(l=0, r=0, t=60, b=40))
+    st.plotly_chart(fig_corr, use_container_width=True)
+
+corr = section("📊 Correlation Between Metrics", render_corr, "success_corr", deps=(filter_key,), load=load_corr,
+               subtext="Understand how different metrics relate to startup success using correlation heatmaps.")
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- FEATURE IMPORTANCE (SIMULATED ML INSIGHT) ---
-st.markdown('<p class="section-header">⚖️ Most Influential Factors Driving Success</p>', unsafe_allow_html=True)
-st.markdown("<p class='subtext'>Ranking of features that correlate most strongly with startup success scores.</p>", unsafe_allow_html=True)
-
-# Compute simple feature importance (absolute correlation with success_score)
-importance = corr["success_score"].drop("success_score").abs().sort_values(ascending=False).reset_index()
-importance.columns = ["Feature", "Importance"]
-
-fig_imp = px.bar(
-    importance, x="Importance", y="Feature", orientation="h",
-    color="Importance", color_continuous_scale="Tealgrn",
-    title="Top Factors Influencing Success Score"
-)
-fig_imp.update_layout(height=500, margin=dict(l=10, r=10, t=60, b=40))
-st.plotly_chart(fig_imp, use_container_width=True)
+def load_importance(key):
+    # Compute simple feature importance (absolute correlation with success_score)
+    importance = corr["success_score"].drop("success_score").abs().sort_values(ascending=False).reset_index()
+    importance.columns = ["Feature", "Importance"]
+    return importance
+
+def render_importance(importance):
+    fig_imp = px.bar(
+        importance, x="Importance", y="Feature", orientation="h",
+        color="Importance", color_continuous_scale="Tealgrn",
+        title="Top Factors Influencing Success Score"
+    )
+    fig_imp.update_layout(height=500, margin=dict(l=10, r=10, t=60, b=40))
+    st.plotly_chart(fig_imp, use_container_width=True)
+
+importance = section("⚖️ Most Influential Factors Driving Success", render_importance, "success_importance",
+                     deps=(filter_key,), load=load_importance,
+                     subtext="Ranking of features that correlate most strongly with startup success scores.")
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- SUCCESS VS FUNDING ---
-st.markdown('<p class="section-header">💰 Funding vs Success</p>', unsafe_allow_html=True)
-st.markdown("<p class='subtext'>Do higher-funded startups perform better? Explore the relationship between funding and success score.</p>", unsafe_allow_html=True)
-
-fig_fund = px.scatter(
-    df, x="funding_musd", y="success_score", size="valuation_busd", color="industry",
-    hover_name="industry", title="Funding vs Success (Bubble Size = Valuation $B)"
-)
-fig_fund.update_traces(marker=dict(opacity=0.7, line=dict(width=1, color='DarkSlateGrey')))
-fig_fund.update_layout(height=500, margin=dict(l=10, r=10, t=60, b=40))
-st.plotly_chart(fig_fund, use_container_width=True)
+def render_funding(_):
+    fig_fund = scatter_chart(
+        df, "funding_musd", "success_score", "Funding vs Success (Bubble Size = Valuation $B)",
+        size="valuation_busd", color="industry", hover_name="industry",
+        marker=dict(opacity=0.7, line=dict(width=1, color='DarkSlateGrey'))
+    )
+    fig_fund.update_layout(height=500, margin=dict(l=10, r=10, t=60, b=40))
+    st.plotly_chart(fig_fund, use_container_width=True)
+
+section("💰 Funding vs Success", render_funding, "success_funding",
+        subtext="Do higher-funded startups perform better? Explore the relationship between funding and success score.")
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- SUCCESS VS EMPLOYEES ---
-st.markdown('<p class="section-header">👥 Employees vs Success</p>', unsafe_allow_html=True)
-st.markdown("<p class='subtext'>Is there an optimal team size for success? This chart shows how the number of employees impacts performance.</p>", unsafe_allow_html=True)
-
-fig_emp = px.scatter(
-    df, x="employees", y="success_score", color="industry", trendline="ols",
-    title="Employee Count vs Success Score by Industry"
-)
-fig_emp.update_layout(height=500, margin=dict(l=10, r=10, t=60, b=40))
-st.plotly_chart(fig_emp, use_container_width=True)
+def render_employees(segments):
+    fig_emp = scatter_chart(
+        df, "employees", "success_score", "Employee Count vs Success Score by Industry",
+        color="industry"
+    )
+    add_trendlines(fig_emp, segments)
+    fig_emp.update_layout(height=500, margin=dict(l=10, r=10, t=60, b=40))
+    st.plotly_chart(fig_emp, use_container_width=True)
+
+section("👥 Employees vs Success", render_employees, "success_employees", deps=(filter_key,),
+        load=lambda key: cached_trendlines(key, "employees", "success_score", "industry"), lazy=True,
+        subtext="Is there an optimal team size for success? This chart shows how the number of employees impacts performance.")
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- SUCCESS VS VALUATION ---
-st.markdown('<p class="section-header">💎 Valuation vs Success Over Time</p>', unsafe_allow_html=True)
-yearly = df.groupby("founded_year")[["valuation_busd", "success_score"]].mean().reset_index()
-fig_val = go.Figure()
-fig_val.add_trace(go.Scatter(
-    x=yearly["founded_year"], y=yearly["success_score"],
-    mode="lines+markers", name="Success Score", line=dict(color="#F39C12", width=3)
-))
-fig_val.add_trace(go.Scatter(
-    x=yearly["founded_year"], y=yearly["valuation_busd"] * 10,
-    mode="lines+markers", name="Valuation (scaled ×10)", line=dict(color="#1ABC9C", width=3, dash="dot")
-))
-fig_val.update_layout(
-    title="Success Score vs Valuation Over Time",
-    xaxis_title="Year",
-    yaxis_title="Success / Valuation (scaled)",
-    height=500,
-    margin=dict(l=10, r=10, t=60, b=40)
-)
-st.plotly_chart(fig_val, use_container_width=True)
+def render_valuation(yearly):
+    fig_val = go.Figure()
+    fig_val.add_trace(go.Scatter(
+        x=yearly["founded_year"], y=yearly["success_score"],
+        mode="lines+markers", name="Success Score", line=dict(color="#F39C12", width=3)
+    ))
+    fig_val.add_trace(go.Scatter(
+        x=yearly["founded_year"], y=yearly["valuation_busd"] * 10,
+        mode="lines+markers", name="Valuation (scaled ×10)", line=dict(color="#1ABC9C", width=3, dash="dot")
+    ))
+    fig_val.update_layout(
+        title="Success Score vs Valuation Over Time",
+        xaxis_title="Year",
+        yaxis_title="Success / Valuation (scaled)",
+        height=500,
+        margin=dict(l=10, r=10, t=60, b=40)
+    )
+    st.plotly_chart(fig_val, use_container_width=True)
+
+section("💎 Valuation vs Success Over Time", render_valuation, "success_valuation", deps=(filter_key,),
+        load=lambda key: df.groupby("founded_year")[["valuation_busd", "success_score"]].mean().reset_index(), lazy=True)
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- INDUSTRY-WISE SUCCESS ---
-st.markdown('<p class="section-header">🏭 Average Success by Industry</p>', unsafe_allow_html=True)
-st.markdown("<p class='subtext'>Identify which sectors consistently produce successful startups.</p>", unsafe_allow_html=True)
-
-industry_success = df.groupby("industry")["success_score"].mean().sort_values(ascending=True).reset_index()
-fig_ind = px.bar(
-    industry_success, x="success_score", y="industry",
-    orientation="h", color="success_score", color_continuous_scale="Blues",
-    title="Average Success Score by Industry"
-)
-fig_ind.update_layout(height=500, margin=dict(l=10, r=10, t=60, b=40))
-st.plotly_chart(fig_ind, use_container_width=True)
+def render_industry(industry_success):
+    fig_ind = px.bar(
+        industry_success, x="success_score", y="industry",
+        orientation="h", color="success_score", color_continuous_scale="Blues",
+        title="Average Success Score by Industry"
+    )
+    fig_ind.update_layout(height=500, margin=dict(l=10, r=10, t=60, b=40))
+    st.plotly_chart(fig_ind, use_container_width=True)
+
+industry_success = section("🏭 Average Success by Industry", render_industry, "success_industry", deps=(filter_key,),
+                           load=lambda key: df.groupby("industry")["success_score"].mean().sort_values(ascending=True).reset_index(),
+                           subtext="Identify which sectors consistently produce successful startups.")
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- INSIGHT SUMMARY ---
-st.markdown('<p class="section-header">🧠 Insights & Observations</p>', unsafe_allow_html=True)
+section_header("🧠 Insights & Observations")
 
 top_factor = importance.iloc[0]["Feature"]
 second_factor = importance.iloc[1]["Feature"]
@@ -1,11 +1,40 @@
 import streamlit as st
-from utils import queries
+import plotly.express as px
+from utils.cache import exit_analytics
+from utils.filters import load_data, sidebar_selection
+from utils.metrics import begin_rerun
 
+begin_rerun("Acquisition & IPO")
 st.title("🏆 Acquisition & IPO Insights")
 
-data = queries.acquisition_ipo_stats()
-acq_rate = (data['total_acquired'] / data['total_startups']) * 100
-ipo_rate = (data['total_ipo'] / data['total_startups']) * 100
+# Everything on this page comes from the grouped SQL scan, so the selection is never applied to rows.
+data = exit_analytics(sidebar_selection(load_data()))
+total = data["total"]
+if total["startups"] == 0:
+    st.warning("⚠️ No data available for the selected filters.")
+    st.stop()
 
-st.metric("🏢 % Acquired Startups", f"{acq_rate:.1f}%")
-st.metric("📈 % IPO Startups", f"{ipo_rate:.1f}%")
+col1, col2, col3 = st.columns(3)
+col1.metric("🚀 Startups", f"{int(total['startups']):,}")
+col2.metric("🏢 % Acquired Startups", f"{total['acq_rate']:.1f}%")
+col3.metric("📈 % IPO Startups", f"{total['ipo_rate']:.1f}%")
+
+BREAKDOWNS = [
+    ("funding_stage", "💼 Exits by Funding Stage"),
+    ("industry", "🏭 Exits by Industry"),
+    ("country", "🌍 Exits by Country"),
+]
+for by, title in BREAKDOWNS:
+    st.subheader(title)
+    rates = data[by].melt(id_vars=by, value_vars=["acq_rate", "ipo_rate"], var_name="exit", value_name="rate")
+    rates["exit"] = rates["exit"].map({"acq_rate": "Acquired", "ipo_rate": "IPO"})
+    fig = px.bar(rates, x=by, y="rate", color="exit", barmode="group",
+                 labels={"rate": "% of startups", by: by.replace("_", " ").title()})
+    st.plotly_chart(fig, use_container_width=True)
+
+st.subheader("📅 Exits by Founding-Year Cohort")
+cohorts = data["cohort"]
+fig = px.line(cohorts, x="cohort", y=["acq_rate", "ipo_rate"], markers=True,
+              labels={"value": "% of startups", "cohort": "Founded", "variable": "Exit"})
+st.plotly_chart(fig, use_container_width=True)
+st.dataframe(cohorts.round(1), use_container_width=True)
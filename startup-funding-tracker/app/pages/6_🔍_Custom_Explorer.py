@@ -1,27 +1,51 @@
 import streamlit as st
 import plotly.express as px
 from utils.filters import load_data, sidebar_filters
+from utils.charts import aggregate_for_chart
+from utils.metrics import begin_rerun
+from utils.export import export_panel
 
+begin_rerun("Custom Explorer")
 st.title("🔍 Custom Data Explorer")
 
 df = sidebar_filters(load_data())
+export_panel(st.session_state["filter_key"], "custom_explorer")
 
-cols = st.columns(3)
+numeric_cols = df.select_dtypes("number").columns.tolist()
+
+cols = st.columns(4)
 x_axis = cols[0].selectbox("Select X-axis", df.columns)
-y_axis = cols[1].selectbox("Select Y-axis", df.columns)
+y_axis = cols[1].selectbox("Select Y-axis", numeric_cols)
 color = cols[2].selectbox("Color by", [None] + df.columns.tolist())
+agg = cols[3].selectbox("Aggregate", ["sum", "mean", "count", "median"])
 
 chart_type = st.radio("Chart Type", ["Bar", "Line", "Area", "Pie", "Donut"])
 
+with st.expander("⚙️ Grouping options"):
+    opt_cols = st.columns(2)
+    top_n = opt_cols[0].slider("Max categories (rest grouped as 'Other')", 5, 50, 15)
+    bins = opt_cols[1].slider("Bins for numeric X-axis", 5, 100, 30)
+
+# Pie slices ignore colour; everything else groups by (X, colour).
+group_color = None if chart_type in ("Pie", "Donut") else color
+try:
+    data = aggregate_for_chart(df, x_axis, y_axis, agg=agg, color=group_color, top_n=top_n, bins=bins)
+except ValueError as err:
+    st.warning(f"⚠️ {err}")
+    st.stop()
+
+value = data.columns[-1]
+label = f"{agg}({y_axis})"
 if chart_type == "Bar":
-    fig = px.bar(df, x=x_axis, y=y_axis, color=color, title=f"{y_axis} by {x_axis}")
+    fig = px.bar(data, x=x_axis, y=value, color=group_color, title=f"{label} by {x_axis}", labels={value: label})
 elif chart_type == "Line":
-    fig = px.line(df, x=x_axis, y=y_axis, color=color, markers=True)
+    fig = px.line(data, x=x_axis, y=value, color=group_color, markers=True, labels={value: label})
 elif chart_type == "Area":
-    fig = px.area(df, x=x_axis, y=y_axis, color=color)
+    fig = px.area(data, x=x_axis, y=value, color=group_color, labels={value: label})
 elif chart_type == "Pie":
-    fig = px.pie(df, names=x_axis, values=y_axis, title=f"{y_axis} Distribution by {x_axis}")
+    fig = px.pie(data, names=x_axis, values=value, title=f"{label} Distribution by {x_axis}")
 elif chart_type == "Donut":
-    fig = px.pie(df, names=x_axis, values=y_axis, hole=0.5, title=f"{y_axis} Distribution by {x_axis}")
+    fig = px.pie(data, names=x_axis, values=value, hole=0.5, title=f"{label} Distribution by {x_axis}")
 
 st.plotly_chart(fig, use_container_width=True)
+st.caption(f"{len(df):,} startups aggregated into {len(data):,} groups.")
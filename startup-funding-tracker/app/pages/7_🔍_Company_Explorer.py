@@ -2,9 +2,15 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from utils.filters import load_data, sidebar_filters
+from utils.queries import company_ranks, startups_by_id
+from utils.cache import neighbor_index
+from utils.ranks import RANK_METRICS, rank_column
+from utils.metrics import begin_rerun
+from utils.export import export_panel
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Company Explorer", page_icon="🔍", layout="wide")
+begin_rerun("Company Explorer")
 
 # --- CUSTOM CSS ---
 st.markdown("""
@@ -61,6 +67,9 @@ if df.empty:
     st.warning("⚠️ No data available for the selected filters.")
     st.stop()
 
+# --- EXPORT ---
+export_panel(st.session_state["filter_key"], "company_explorer")
+
 # --- NORMALIZE COLUMNS ---
 df.columns = df.columns.str.strip().str.lower().str.replace('[^a-z0-9]+', '_', regex=True)
 
@@ -110,7 +119,7 @@ col4.markdown(f"<div class='metric-card'><div class='metric-value'>{company_row.
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 
 # --- TABS ---
-tabs = st.tabs(["📊 Financials", "🚀 Success Metrics", "🌍 Context & Comparison", "🧠 Insights Summary"])
+tabs = st.tabs(["📊 Financials", "🚀 Success Metrics", "🌍 Context & Comparison", "🧭 Similar Startups", "🧠 Insights Summary"])
 
 # --- FINANCIALS TAB ---
 with tabs[0]:
@@ -162,45 +171,82 @@ with tabs[1]:
     st.plotly_chart(fig_success, use_container_width=True)
 
 # --- CONTEXT TAB ---
+RANK_LABELS = {
+    "funding_musd": "Funding", "valuation_busd": "Valuation", "revenue_musd": "Revenue",
+    "success_score": "Success Score", "customers_mil": "Customers", "employees": "Employees",
+}
+ranks = company_ranks(company_row["startup_id"])
+
 with tabs[2]:
     st.markdown("<p class='section-header'>🌍 Market & Industry Context</p>", unsafe_allow_html=True)
+    st.markdown(
+        "How this company ranks against its **industry, country and global peers across the full dataset** — "
+        "the sidebar filters do not narrow these peer groups. Each value is a percentile rank: the share of "
+        "peers at or below this company."
+    )
 
-    same_industry = df[df["industry"] == company_row["industry"]]
-    same_country = df[df["country"] == company_row["country"]]
-
-    col1, col2 = st.columns(2)
+    if ranks is None:
+        st.info("No peer ranks available for this company — re-run the ETL to rebuild them.")
+    else:
+        rank_table = pd.DataFrame({
+            f"🏭 {company_row['industry']} ({int(ranks['industry_peers'])} peers)": [ranks[rank_column(m, "industry")] for m in RANK_METRICS],
+            f"🌎 {company_row['country']} ({int(ranks['country_peers'])} peers)": [ranks[rank_column(m, "country")] for m in RANK_METRICS],
+            "🌐 Global": [ranks[rank_column(m, "global")] for m in RANK_METRICS],
+        }, index=[RANK_LABELS[m] for m in RANK_METRICS]) * 100
+
+        col1, col2 = st.columns([1, 1.4])
+        with col1:
+            st.dataframe(rank_table.round(1), use_container_width=True)
+        with col2:
+            fig_rank = px.bar(
+                rank_table.reset_index(names="metric").melt(id_vars="metric", var_name="peer group", value_name="percentile"),
+                x="metric", y="percentile", color="peer group", barmode="group",
+                title="Percentile Rank vs Peers", range_y=[0, 100]
+            )
+            st.plotly_chart(fig_rank, use_container_width=True)
+
+# --- SIMILAR STARTUPS TAB ---
+with tabs[3]:
+    st.markdown("<p class='section-header'>🧭 Similar Startups</p>", unsafe_allow_html=True)
+    st.caption("Nearest companies on normalized funding, valuation, revenue, employees, customers, success score and founded year.")
 
-    with col1:
-        if not same_industry.empty:
-            industry_avg = same_industry[["funding_musd", "valuation_busd", "success_score"]].mean().to_dict()
-            st.markdown(f"### 🏭 {company_row['industry']} Industry Averages")
-            st.write(pd.DataFrame([industry_avg], index=["Average"]))
-        else:
-            st.info("No industry data available for comparison.")
+    colk, coli = st.columns([2, 1])
+    k = colk.slider("Number of matches", 3, 25, 5)
+    same_industry_only = coli.checkbox(f"Only {company_row['industry']}", value=False)
 
-    with col2:
-        if not same_country.empty:
-            country_avg = same_country[["funding_musd", "valuation_busd", "success_score"]].mean().to_dict()
-            st.markdown(f"### 🌎 {company_row['country']} Country Averages")
-            st.write(pd.DataFrame([country_avg], index=["Average"]))
-        else:
-            st.info("No country data available for comparison.")
+    matches = neighbor_index().query(
+        company_row, k=k,
+        industry=company_row["industry"] if same_industry_only else None,
+        exclude=company_row["startup_id"]
+    )
+    if matches.empty:
+        st.info("No similar startups found.")
+    else:
+        similar = startups_by_id(matches["startup_id"]).merge(matches, on="startup_id").sort_values("distance")
+        st.dataframe(
+            similar[["name", "country", "industry", "founded_year", "funding_musd", "valuation_busd", "success_score", "distance"]]
+            .round(2).reset_index(drop=True),
+            use_container_width=True
+        )
 
 # --- INSIGHTS TAB ---
-with tabs[3]:
+with tabs[4]:
     st.markdown("<p class='section-header'>🧠 AI-Style Insights</p>", unsafe_allow_html=True)
 
+    def top_half(metric, scope="global"):
+        return ranks is not None and ranks[rank_column(metric, scope)] > 0.5
+
     insights = []
-    if company_row.get("funding_musd", 0) > df["funding_musd"].mean():
-        insights.append("💰 Above-average funding — strong investor confidence.")
-    if company_row.get("success_score", 0) > df["success_score"].mean():
+    if top_half("funding_musd"):
+        insights.append("💰 Above-median funding — strong investor confidence.")
+    if top_half("success_score"):
         insights.append("🚀 Exceptional success metrics — performing better than peers.")
-    if company_row.get("valuation_busd", 0) > df["valuation_busd"].mean():
+    if top_half("valuation_busd"):
         insights.append("💎 High valuation suggests category leadership or market dominance.")
-    if company_row.get("customers_mil", 0) > df["customers_mil"].mean():
+    if top_half("customers_mil"):
         insights.append("👥 Strong customer base — indicates market traction.")
-    if company_row.get("employees", 0) > df["employees"].mean():
-        insights.append("👨‍💻 Scaled operations — larger workforce than average for its sector.")
+    if top_half("employees", "industry"):
+        insights.append("👨‍💻 Scaled operations — larger workforce than most in its sector.")
     if not insights:
         insights.append("📊 This company maintains balanced performance across all major KPIs.")
 
@@ -0,0 +1,89 @@
+import time
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from utils.cache import cache_stats
+from utils.metrics import LATENCY_BUCKETS_MS, flush, snapshot
+from utils.profiler import captures
+from utils.queries import metrics_since
+from utils.query_log import report
+
+# Not linked from the sidebar (see utils.filters); open it at /Diagnostics.
+st.set_page_config(page_title="Diagnostics", page_icon="🩺", layout="wide")
+st.title("🩺 Diagnostics")
+st.caption("Span timings recorded by utils.metrics across every server process, plus this process's caches.")
+
+WINDOWS = {"Last 15 minutes": 15 * 60, "Last hour": 3600, "Last 24 hours": 86400, "Last 7 days": 7 * 86400}
+
+cols = st.columns([3, 1])
+window = cols[0].selectbox("Window", list(WINDOWS), index=1)
+if cols[1].button("Flush buffered spans"):
+    st.toast(f"Flushed {flush()} spans")
+
+flush()
+spans = metrics_since(time.time() - WINDOWS[window])
+if spans.empty:
+    st.info("No spans recorded in this window yet. Browse a few pages and come back.")
+    st.stop()
+
+# --- LATENCY PER SPAN ---
+st.subheader("⏱️ Latency per span")
+looked_up = spans.dropna(subset=["cache"])
+per_span = spans.groupby("span")["ms"].agg(
+    calls="count",
+    p50=lambda s: s.quantile(0.5),
+    p95=lambda s: s.quantile(0.95),
+    p99=lambda s: s.quantile(0.99),
+    max="max",
+    total="sum",
+)
+per_span["rows"] = spans.groupby("span")["rows"].sum()
+per_span["hit rate %"] = looked_up["cache"].ne("miss").groupby(looked_up["span"]).mean() * 100
+st.dataframe(per_span.sort_values("total", ascending=False).round(2), use_container_width=True)
+
+# --- SLOWEST RERUNS ---
+st.subheader("🐢 Slowest recent reruns")
+st.caption("A rerun lasts from its first span's start to its last span's end.")
+in_rerun = spans.dropna(subset=["rerun"]).assign(end=lambda d: d["ts"] + d["ms"] / 1000)
+reruns = in_rerun.groupby("rerun").agg(page=("page", "first"), started=("ts", "min"), ended=("end", "max"), spans=("span", "count"))
+reruns["duration ms"] = (reruns["ended"] - reruns["started"]) * 1000
+reruns["started"] = pd.to_datetime(reruns["started"], unit="s")
+slowest = reruns.sort_values("duration ms", ascending=False).head(20)
+st.dataframe(slowest[["page", "started", "duration ms", "spans"]].round(1), use_container_width=True)
+
+chosen = st.selectbox("Spans of rerun", slowest.index, format_func=lambda r: f"{slowest.at[r, 'page']} · {slowest.at[r, 'duration ms']:.0f} ms")
+if chosen:
+    detail = in_rerun[in_rerun["rerun"] == chosen]
+    st.dataframe(detail[["span", "ms", "rows", "cache"]].sort_values("ms", ascending=False).round(2), use_container_width=True)
+
+# --- PROFILES ---
+st.subheader("🔥 Rerun profiles")
+st.caption("Open any page with `?profile=1` (or run with DEBUG=true) to sample one rerun. "
+           "Files are collapsed stacks for flamegraph.pl or speedscope.")
+saved = captures()
+if not saved:
+    st.info("No profiles captured yet.")
+for path, meta in saved[:10]:
+    cols = st.columns([4, 1])
+    cols[0].markdown(f"**{meta.get('page', '?')}** · {meta.get('duration_s', 0):.2f}s · "
+                     f"{meta.get('samples', 0)} samples · `{path.name}`")
+    cols[1].download_button("Download", path.read_bytes(), file_name=path.name, key=f"profile_{path.name}")
+
+# --- THIS PROCESS ---
+st.subheader("🧮 This process")
+spans, _ = snapshot()
+if spans:
+    name = st.selectbox("Latency histogram of", sorted(spans))
+    labels = [f"≤{b} ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]} ms"]
+    hist = pd.DataFrame({"latency": labels, "calls": spans[name]["histogram"]})
+    st.plotly_chart(px.bar(hist, x="latency", y="calls", title=f"{name}: {spans[name]['calls']} calls"), use_container_width=True)
+
+st.markdown("**SQL statements by total time** (⚠️ marks full scans of large tables)")
+statements = pd.DataFrame(report())
+if not statements.empty:
+    statements.insert(0, "scan", statements["full_scans"].map(lambda t: "⚠️ " + ", ".join(t) if t else ""))
+    statements["plan"] = statements["plan"].map(lambda p: " | ".join(p) if p else "")
+    st.dataframe(statements[["scan", "shape", "calls", "total_ms", "max_ms", "rows", "plan"]].round(2),
+                 use_container_width=True, hide_index=True)
+st.json(cache_stats())
@@ -1,17 +1,207 @@
 import streamlit as st
-from datetime import timedelta
+import numpy as np
+import pandas as pd
 from . import queries
+from .db import get_conn
+from .data_cache import DATA_CACHE, RESULT_CACHE, versioned
+from .figure_cache import FIGURES
+from .single_flight import FLIGHTS
+from .filters import load_data
+from .kpis import encode_dimensions, kpi_stats
+from .partials import IncrementalAggregate, build_comoments, build_partitions, group_stat, partition_mask
+from .trendlines import fit_lines, group_moments, trendline_segments
+from .time_index import YearIndex
+from .geo import iso3_codes
+from .neighbors import INDEX_PATH, NeighborIndex
+from .scheduler import run_batch
+from .sketches import EXACT_MAX_ROWS, build_partition_sketches, grouped_quantiles, load_sketch_table, merged_quantiles
 
-@st.cache_data(ttl=timedelta(hours=6))
+@versioned
 def cached_industry_data():
-    """Cache top industry data for 6 hours."""
+    """Top industry data, cached until the next ETL load."""
     return queries.top_industries()
 
-@st.cache_data(ttl=timedelta(hours=6))
+@versioned
 def cached_country_data():
-    """Cache top country data for 6 hours."""
+    """Top country data, cached until the next ETL load."""
     return queries.top_countries()
 
+@versioned(pinned=True)
+def dimension_codes():
+    """Factorized country/industry/tech stack codes of the full dataset."""
+    return encode_dimensions(load_data())
+
+@versioned
+def cached_kpi_stats(key, _df):
+    """KPI sufficient statistics for the sidebar selection identified by `key`."""
+    median = None
+    if len(_df) > EXACT_MAX_ROWS:
+        sketches = sketch_tables()["funding_musd"]
+        median = merged_quantiles(sketches, [0.5], partition_mask(sketches, key))[0]
+    return kpi_stats(_df, dimension_codes(), median_funding=median)
+
+@versioned(pinned=True)
+def partition_table():
+    """Country × industry × year partial aggregates of the full dataset."""
+    return build_partitions(load_data())
+
+@versioned(pinned=True)
+def year_index():
+    """Founded-year prefix sums per country × industry cell of the full dataset."""
+    return YearIndex(load_data())
+
+@versioned(pinned=True)
+def comoment_table():
+    """Per-partition correlation sufficient statistics of the full dataset."""
+    return build_comoments(load_data())
+
+@versioned(pinned=True)
+def pair_moments(x, y):
+    """Per-partition co-moments of `x` and `y` over the rows complete in both (for trendlines)."""
+    return build_comoments(load_data(), [x, y])
+
+@versioned(pinned=True)
+def country_codes():
+    """Country name → ISO-3 code, as resolved by etl/clean_transform.py."""
+    df = load_data()
+    if "iso3" not in df:
+        # Databases loaded before the iso3 column existed: resolve the names here.
+        df = df.assign(iso3=iso3_codes(df["country"]).to_numpy())
+    return df.dropna(subset=["iso3"]).drop_duplicates("country").set_index("country")["iso3"]
+
+@versioned
+def choropleth_frames(key, metric="funding_musd"):
+    """Year × country sums of `metric` for selection `key`, and their (min, max) colour range."""
+    parts = partition_table()
+    frames = group_stat(parts, ["founded_year", "country"], metric, "sum", partition_mask(parts, key)).unstack("country")
+    frames.index = frames.index.astype(int)
+    values = frames.to_numpy()
+    zrange = (float(np.nanmin(values)), float(np.nanmax(values))) if values.size else None
+    return frames, zrange
+
+@versioned
+def cached_trendlines(key, x, y, by):
+    """OLS trendline segments of `y` on `x` per `by` group for selection `key`.
+
+    Fitted on every row with both `x` and `y`, the same points the scatter
+    plots, rather than on the rows complete in all correlation columns.
+    """
+    moments, parts = pair_moments(x, y), partition_table()
+    fits = fit_lines(group_moments(moments, x, y, by, partition_mask(moments["keys"], key)))
+    mask = partition_mask(parts, key)
+    return trendline_segments(fits, group_stat(parts, by, x, "min", mask), group_stat(parts, by, x, "max", mask))
+
+def selection_totals(key):
+    """Overall AggState for `key`, updated incrementally from this session's last selection."""
+    parts = partition_table()
+    running = st.session_state.get("selection_totals")
+    if running is None or running.parts is not parts:
+        running = st.session_state["selection_totals"] = IncrementalAggregate(parts)
+    return running.update(key)
+
+@versioned(pinned=True)
+def sketch_tables():
+    """Per-partition quantile sketches written by etl/build_sketches.py."""
+    try:
+        frame = pd.read_sql("SELECT * FROM partition_sketches", get_conn())
+    except Exception:
+        # Databases loaded before the sketch step existed: build them in-process.
+        frame = build_partition_sketches(load_data())
+    return load_sketch_table(frame)
+
+@versioned(pinned=True)
+def neighbor_index():
+    """Similarity index written next to the database by etl/build_neighbors.py."""
+    if INDEX_PATH.exists():
+        return NeighborIndex.load(INDEX_PATH)
+    # Databases loaded before the index step existed: build it in-process.
+    return NeighborIndex.build(load_data())
+
+def percentile_breakdown(df, key, metric, by, qs=(0.5, 0.9, 0.99)):
+    """Per-`by` percentiles of `metric` (columns p50, p90, ...) for selection `key`.
+
+    Small selections are answered exactly from the filtered rows `df`; larger
+    ones merge the partition sketches covered by `key`, within the KLL
+    rank-error bound documented in utils/sketches.py.
+    """
+    if len(df) <= EXACT_MAX_ROWS:
+        exact = df.groupby(by)[metric].quantile(list(qs)).unstack()
+        exact.columns = [f"p{round(q * 100)}" for q in qs]
+        return exact
+    sketches = sketch_tables()[metric]
+    return grouped_quantiles(sketches, by, qs, partition_mask(sketches, key))
+
+# Founding-year cohorts on the Acquisition & IPO page span this many years.
+COHORT_YEARS = 5
+
+def _exit_rates(frame):
+    # NaN rates rather than ZeroDivisionError for an empty selection.
+    startups = frame["startups"].astype(float).where(frame["startups"] > 0)
+    return frame.assign(
+        acq_rate=frame["acquired"] / startups * 100,
+        ipo_rate=frame["ipo"] / startups * 100,
+    )
+
+@versioned
+def exit_analytics(key):
+    """Acquisition/IPO counts and rates for selection `key`.
+
+    Returns the overall totals plus one frame per breakdown (funding stage,
+    industry, country, founding-year cohort), all rolled up from a single
+    `queries.exit_breakdown` scan.
+    """
+    cube = queries.exit_breakdown(key)
+    start = cube["founded_year"] // COHORT_YEARS * COHORT_YEARS
+    cube["cohort"] = start.astype(str) + "–" + (start + COHORT_YEARS - 1).astype(str)
+    counts = ["startups", "acquired", "ipo"]
+    out = {"total": _exit_rates(cube[counts].sum().to_frame().T).iloc[0].to_dict()}
+    for by in ["funding_stage", "industry", "country", "cohort"]:
+        out[by] = _exit_rates(cube.groupby(by)[counts].sum()).reset_index()
+    return out
+
+# Industry Insights sections: name → (aggregates, column to rank by, row limit).
+INDUSTRY_BLOCKS = {
+    "funding": ({"funding_musd": "SUM"}, "funding_musd", 10),
+    "valuation": ({"valuation_busd": "AVG"}, "valuation_busd", 10),
+    "success": ({"funding_musd": "AVG", "success_score": "AVG"}, None, None),
+    "employees": ({"employees": "AVG"}, "employees", None),
+    "ratio": ({"revenue_musd": "AVG", "valuation_busd": "AVG"}, None, None),
+    "heatmap": ({c: "AVG" for c in ["funding_musd", "valuation_busd", "success_score", "employees", "revenue_musd"]}, None, None),
+}
+
+@versioned
+def industry_blocks(key):
+    """Per-industry aggregates behind every Industry Insights section for selection `key`.
+
+    The INDUSTRY_BLOCKS queries are independent, so they run as one
+    `run_batch` on the query thread pool.
+    """
+    return run_batch({
+        name: (lambda conn, aggs=aggs, order_by=order_by, limit=limit:
+               queries.group_aggregate(key, "industry", aggs, order_by, limit, conn=conn))
+        for name, (aggs, order_by, limit) in INDUSTRY_BLOCKS.items()
+    })
+
+# The per-selection cached loads behind each page, as `load(key, df)`. utils/warmup.py
+# runs all of them for every warm-up selection; add a page's loader here when it gains one.
+# (Country Insights and the percentile panels build on the pinned partition and sketch tables.)
+PAGE_LOADERS = {
+    "Home": lambda key, df: cached_kpi_stats(key, df),
+    "Industry Insights": lambda key, df: industry_blocks(key),
+    "Trends Over Time": lambda key, df: choropleth_frames(key),
+    "Success Factors": lambda key, df: cached_trendlines(key, "employees", "success_score", "industry"),
+    "Acquisition & IPO": lambda key, df: exit_analytics(key),
+}
+
+def cache_stats():
+    """Size and hit/miss/eviction counters of the data, on-disk result and figure caches, plus coalesced calls."""
+    return {"data": DATA_CACHE.stats(), "disk": RESULT_CACHE.stats(), "figures": FIGURES.stats(),
+            "single_flight": FLIGHTS.stats()}
+
 def clear_cache():
     st.cache_data.clear()
+    st.cache_resource.clear()
+    DATA_CACHE.clear()
+    RESULT_CACHE.clear()
+    FIGURES.clear()
     st.success("✅ Cache cleared — data will refresh next time.")
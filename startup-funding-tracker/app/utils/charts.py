@@ -1,23 +1,207 @@
-import plotly.express as px
+import itertools
 
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from .figure_cache import cached_chart
+from .metrics import timed
+
+# Max markers a scatter sends to the browser before it is sampled or binned.
+POINT_BUDGET = 5_000
+# Beyond this multiple of the budget, "auto" scatters switch from sampling to 2D bins.
+BIN_FACTOR = 20
+
+def _px():
+    """plotly.express, imported when the first chart is built rather than with this module."""
+    import plotly.express as px
+    return px
+
+@cached_chart
 def pie_chart(df, names, values, title):
-    fig = px.pie(df, names=names, values=values, hole=0.3, title=title)
+    fig = _px().pie(df, names=names, values=values, hole=0.3, title=title)
     fig.update_traces(textposition='inside', textinfo='percent+label')
     return fig
 
+@cached_chart
 def bar_chart(df, x, y, title):
-    fig = px.bar(df, x=x, y=y, text_auto=True, title=title)
+    fig = _px().bar(df, x=x, y=y, text_auto=True, title=title)
     fig.update_layout(xaxis_tickangle=-30)
     return fig
 
+@cached_chart
 def line_chart(df, x, y, title):
-    fig = px.line(df, x=x, y=y, markers=True, title=title)
+    fig = _px().line(df, x=x, y=y, markers=True, title=title)
     return fig
 
+@cached_chart
 def area_chart(df, x, y, color, title):
-    fig = px.area(df, x=x, y=y, color=color, title=title)
+    fig = _px().area(df, x=x, y=y, color=color, title=title)
     return fig
 
+@cached_chart
 def donut_chart(df, names, values, title):
-    fig = px.pie(df, names=names, values=values, hole=0.6, title=title)
+    fig = _px().pie(df, names=names, values=values, hole=0.6, title=title)
+    return fig
+
+@cached_chart
+def choropleth_map(codes, values, title, names=None, zrange=None, height=500):
+    """World choropleth from ISO-3 `codes` and a matching `values` vector.
+
+    Plotly ships the world geometry with plotly.js, so the figure itself
+    carries only the codes and one value per country. Pass a shared `zrange`
+    to keep colours comparable across maps of different years.
+    """
+    zmin, zmax = zrange if zrange is not None else (None, None)
+    fig = go.Figure(go.Choropleth(
+        locations=list(codes), z=list(values), text=None if names is None else list(names),
+        locationmode="ISO-3", colorscale="Viridis", zmin=zmin, zmax=zmax,
+        hovertemplate="<b>%{text}</b><br>%{z:,.2f}<extra></extra>" if names is not None else None,
+    ))
+    fig.update_layout(title=title, height=height, margin=dict(l=0, r=0, t=40, b=0),
+                      geo=dict(showframe=False, projection_type="natural earth"))
+    return fig
+
+@cached_chart
+def radar_chart(df, name_col, metric_cols, title):
+    """Scatterpolar trace per row of `df`, metrics normalized to each column's max."""
+    norm = df[metric_cols].div(df[metric_cols].max())
+    fig = go.Figure()
+    for name, values in zip(df[name_col], norm.to_numpy()):
+        fig.add_trace(go.Scatterpolar(r=values.tolist(), theta=metric_cols, fill='toself', name=name))
+    fig.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, 1])),
+        title=title,
+        showlegend=True
+    )
+    return fig
+
+def axis_outliers(df, x, y):
+    """Mask of rows outside the 0.5–99.5th percentile of `x` or `y`."""
+    xs, ys = df[x], df[y]
+    lo_x, hi_x = xs.quantile([0.005, 0.995])
+    lo_y, hi_y = ys.quantile([0.005, 0.995])
+    return (xs < lo_x) | (xs > hi_x) | (ys < lo_y) | (ys > hi_y)
+
+def budget_points(df, x, y, budget=POINT_BUDGET, color=None, outlier_share=0.1, seed=0):
+    """At most `budget` rows of `df`: axis outliers first, then a stratified sample.
+
+    Rows outside the 0.5–99.5th percentile of `x` or `y` are kept (up to
+    `outlier_share` of the budget) so extremes stay hoverable; the remainder
+    is sampled proportionally within each `color` group, preserving density.
+    """
+    if len(df) <= budget:
+        return df
+    is_outlier = axis_outliers(df, x, y)
+    outliers = df[is_outlier]
+    cap = int(budget * outlier_share)
+    if len(outliers) > cap:
+        outliers = outliers.sample(n=cap, random_state=seed)
+    rest = df[~is_outlier]
+    frac = min(1.0, (budget - len(outliers)) / max(len(rest), 1))
+    # dropna=False: rows without a `color` value are sampled as their own group rather than dropped.
+    sampled = (rest.groupby(color, group_keys=False, dropna=False).sample(frac=frac, random_state=seed) if color
+               else rest.sample(frac=frac, random_state=seed))
+    return pd.concat([outliers, sampled])
+
+def _binned_scatter(df, x, y, title, budget, nbins=80, seed=0, color=None, **kwargs):
+    data = df[[x, y]].dropna()
+    z, xe, ye = np.histogram2d(data[x], data[y], bins=nbins)
+    fig = go.Figure(go.Heatmap(
+        x=(xe[:-1] + xe[1:]) / 2, y=(ye[:-1] + ye[1:]) / 2, z=np.where(z > 0, z, np.nan).T,
+        colorscale="Blues", colorbar=dict(title="Startups"),
+        hovertemplate=f"{x}: %{{x:.3g}}<br>{y}: %{{y:.3g}}<br>Startups: %{{z}}<extra></extra>",
+    ))
+    outliers = df[axis_outliers(df, x, y)]
+    if len(outliers) > budget:
+        outliers = outliers.sample(n=budget, random_state=seed)
+    points = _px().scatter(outliers, x=x, y=y, color=color, render_mode="webgl", hover_name=kwargs.get("hover_name"),
+                           hover_data=kwargs.get("hover_data"))
+    if color:
+        # One trace per `color` group, so `add_trendlines` can match its lines to them.
+        fig.add_traces([trace.update(marker=dict(size=4)) for trace in points.data])
+    elif points.data:
+        fig.add_trace(points.data[0].update(name="Outliers", marker=dict(size=4, color="#C0392B")))
+    fig.update_layout(title=f"{title} (binned {len(df):,} points)", xaxis_title=x, yaxis_title=y)
+    return fig
+
+@cached_chart
+def scatter_chart(df, x, y, title, color=None, size=None, hover_name=None, budget=POINT_BUDGET, mode="auto",
+                  marker=None, **kwargs):
+    """`px.scatter` that keeps the browser payload within `budget` markers.
+
+    Within budget the figure is a plain SVG scatter. Above it, `mode="sample"`
+    draws a WebGL scatter of `budget_points`, and `mode="bin"` draws a 2D
+    histogram heatmap with outliers overlaid (one trace per `color` group).
+    `"auto"` samples up to
+    BIN_FACTOR × budget rows and bins beyond that. `marker` styles the point
+    traces of the first two; the binned heatmap keeps its own styling.
+    """
+    if len(df) <= budget:
+        fig = _px().scatter(df, x=x, y=y, color=color, size=size, hover_name=hover_name, title=title, **kwargs)
+    elif mode == "bin" or (mode == "auto" and len(df) > BIN_FACTOR * budget):
+        return _binned_scatter(df, x, y, title, budget, color=color, hover_name=hover_name, hover_data=kwargs.get("hover_data"))
+    else:
+        sample = budget_points(df, x, y, budget, color=color)
+        fig = _px().scatter(sample, x=x, y=y, color=color, size=size, hover_name=hover_name, render_mode="webgl",
+                         title=f"{title} (showing {len(sample):,} of {len(df):,})", **kwargs)
+    if marker:
+        fig.update_traces(marker=marker)
+    return fig
+
+def _cap_categories(values, ranking, top_n):
+    keep = ranking.nlargest(top_n).index
+    return values.where(values.isin(keep), "Other")
+
+@timed
+def aggregate_for_chart(df, x, y, agg="sum", color=None, top_n=15, color_top_n=8, bins=30, budget=2_000):
+    """Group `df` by (`x`, `color`) server-side so a chart gets one mark per group.
+
+    Categorical axes keep their `top_n` (colours: `color_top_n`) largest
+    categories and fold the rest into "Other"; numeric `x` with more than
+    `bins` distinct values is cut into equal-width bins labelled by their
+    midpoint. `agg` is sum, mean, count or median of `y`, returned in the
+    last column (renamed "<y> (<agg>)" if `y` is also a grouping key).
+    Raises ValueError if the result would still exceed `budget` marks.
+    """
+    keys = [x] + ([color] if color and color != x else [])
+    value = y if y not in keys else f"{y} ({agg})"
+    data = df[keys].copy()
+    data[value] = df[y]
+    if pd.api.types.is_numeric_dtype(data[x]) and data[x].nunique() > bins:
+        cut = pd.cut(data[x], bins=bins)
+        data[x] = cut.map(lambda interval: interval.mid).astype(float)
+    for key, limit in list(zip(keys, [top_n, color_top_n])):
+        if not pd.api.types.is_numeric_dtype(data[key]) and data[key].nunique() > limit:
+            grouped = data.groupby(key)[value]
+            ranking = grouped.sum() if agg == "sum" else grouped.size()
+            data[key] = _cap_categories(data[key], ranking, limit)
+    grouped = data.groupby(keys, sort=True, observed=True)[value]
+    out = grouped.size() if agg == "count" else grouped.agg(agg)
+    out = out.rename(value).reset_index()
+    if len(out) > budget:
+        raise ValueError(f"{len(out):,} groups exceed the {budget:,}-mark chart budget; pick a coarser axis.")
+    return out
+
+def add_trendlines(fig, segments):
+    """Overlay precomputed trendline segments, coloured like the matching scatter trace.
+
+    Matches scatter and WebGL traces, including the per-group outlier traces
+    of binned scatters. Segments without a matching trace (a group with no
+    binned outliers, say) take the next unused colour of the default palette.
+    """
+    colors = {trace.name: trace.marker.color for trace in fig.data
+              if trace.type.startswith("scatter") and isinstance(trace.marker.color, str)}
+    palette = _px().colors.qualitative.Plotly
+    used = {c.lower() for c in colors.values()}
+    spare = itertools.cycle([c for c in palette if c.lower() not in used] or palette)
+    for name in segments.index:
+        if str(name) not in colors:
+            colors[str(name)] = next(spare)
+    for name, seg in segments.iterrows():
+        fig.add_trace(go.Scatter(
+            x=[seg["x0"], seg["x1"]], y=[seg["y0"], seg["y1"]], mode="lines",
+            name=f"{name} trend", legendgroup=str(name), showlegend=False,
+            line=dict(color=colors.get(str(name))),
+            hovertemplate=f"{name}<br>y = {seg['slope']:.4g}x + {seg['intercept']:.4g}<br>R² = {seg['r2']:.3f}<extra></extra>",
+        ))
     return fig
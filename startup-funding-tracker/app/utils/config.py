@@ -7,6 +7,46 @@ PROJECT_NAME = os.getenv("PROJECT_NAME", "Startup Intelligence Dashboard")
 DB_PATH = os.getenv("DB_PATH", "db/funding.db")
 DEFAULT_COUNTRY = os.getenv("DEFAULT_COUNTRY", "Global")
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+FIGURE_CACHE_MB = int(os.getenv("FIGURE_CACHE_MB", "64"))
+DATA_CACHE_MB = int(os.getenv("DATA_CACHE_MB", "512"))
+# How long a read of the dataset version is reused before metadata is queried again.
+DATA_VERSION_TTL_S = float(os.getenv("DATA_VERSION_TTL_S", "2"))
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "db/result_cache.db")
+RESULT_CACHE_MB = int(os.getenv("RESULT_CACHE_MB", "1024"))
+# Part of every persisted result's key: bump when a cached function's output changes without its own code changing.
+CACHE_SCHEMA = 2
+# Span timings: in-memory ring buffer size, flush interval to the `metrics` table, retention, and how long a flush waits on a locked database.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+METRICS_BUFFER = int(os.getenv("METRICS_BUFFER", "10000"))
+METRICS_FLUSH_S = float(os.getenv("METRICS_FLUSH_S", "30"))
+METRICS_RETENTION_DAYS = int(os.getenv("METRICS_RETENTION_DAYS", "7"))
+METRICS_WRITE_TIMEOUT_S = float(os.getenv("METRICS_WRITE_TIMEOUT_S", "5"))
+# SQL log (utils/query_log.py): on/off, executions kept, table size from which full scans are flagged.
+QUERY_LOG = os.getenv("QUERY_LOG", "True").lower() == "true"
+QUERY_LOG_RECENT = int(os.getenv("QUERY_LOG_RECENT", "1000"))
+QUERY_SCAN_ROWS = int(os.getenv("QUERY_SCAN_ROWS", "1000"))
+# Per-rerun sampling profiles (DEBUG or ?profile=1): output folder, captures kept, sampling rate, cap.
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_S = float(os.getenv("PROFILE_MAX_S", "60"))
+# Callers waiting on another caller's identical in-flight computation give up after this long.
+SINGLE_FLIGHT_TIMEOUT_S = float(os.getenv("SINGLE_FLIGHT_TIMEOUT_S", "120"))
+# Threads (each with its own read-only SQLite connection) running batches of independent queries.
+QUERY_WORKERS = int(os.getenv("QUERY_WORKERS", "4"))
+# app/api_server.py: bind address, worker threads, in-flight requests before answering 503.
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8502"))
+API_WORKERS = int(os.getenv("API_WORKERS", "4"))
+API_MAX_PENDING = int(os.getenv("API_MAX_PENDING", "64"))
+# Filtered-data exports: rows fetched and written per chunk, and the most rows one export may hold.
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+EXPORT_MAX_ROWS = int(os.getenv("EXPORT_MAX_ROWS", "1000000"))
+# Lower cap for the dashboard's download panel: st.download_button holds the whole file in memory.
+EXPORT_PANEL_MAX_ROWS = int(os.getenv("EXPORT_PANEL_MAX_ROWS", "100000"))
+WARMUP_WORKERS = int(os.getenv("WARMUP_WORKERS", "2"))
+# Optional JSON file listing extra filter combinations to precompute (see utils/warmup.py).
+WARMUP_FILTERS = os.getenv("WARMUP_FILTERS", "")
 
 COLOR_PRIMARY = "#0072B5"
 COLOR_SECONDARY = "#F4B400"
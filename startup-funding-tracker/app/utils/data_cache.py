@@ -0,0 +1,133 @@
+import functools
+import hashlib
+import inspect
+import time
+import types
+
+from . import queries
+from .config import CACHE_SCHEMA, DATA_CACHE_MB, DATA_VERSION_TTL_S, RESULT_CACHE_MB, RESULT_CACHE_PATH
+from .disk_cache import DiskCache
+from .figure_cache import fingerprint, tag_frame
+from .lru import LRUCache
+from .metrics import count_rows, span
+from .single_flight import FLIGHTS
+
+# Every cached query result and derived structure of the dashboard, keyed by dataset version.
+DATA_CACHE = LRUCache(DATA_CACHE_MB * 1024 * 1024)
+# The same results on disk, so restarts and sibling processes start warm.
+RESULT_CACHE = DiskCache(RESULT_CACHE_PATH, RESULT_CACHE_MB * 1024 * 1024)
+_MISSING = object()
+_current = {"version": None, "checked": float("-inf")}
+
+
+def data_version():
+    """Version of the loaded dataset (metadata `last_updated`).
+
+    Read from the database at most once per DATA_VERSION_TTL_S, so the dozens
+    of cached lookups in one rerun share a single metadata query. When it
+    differs from the last one seen, entries built from older versions are
+    dropped from DATA_CACHE and RESULT_CACHE straight away.
+    """
+    now = time.monotonic()
+    if now - _current["checked"] < DATA_VERSION_TTL_S:
+        return _current["version"]
+    version = queries.data_version()
+    _current["checked"] = now
+    if version != _current["version"]:
+        _current["version"] = version
+        DATA_CACHE.retain(version)
+        RESULT_CACHE.retain(version)
+    return version
+
+
+def code_fingerprint(fn):
+    """Hash of `fn`'s bytecode, constants and names (nested functions included) and CACHE_SCHEMA.
+
+    Keeps results pickled by an older deploy from being served once the
+    function computing them has changed.
+    """
+    h = hashlib.blake2b(digest_size=8)
+
+    def feed(code):
+        h.update(code.co_code)
+        h.update(repr(code.co_names).encode())
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                feed(const)
+            else:
+                h.update(repr(const).encode())
+
+    feed(inspect.unwrap(fn).__code__)
+    h.update(str(CACHE_SCHEMA).encode())
+    return h.hexdigest()
+
+
+def _tag_frames(key, value):
+    """Tag a cached frame, or the frames directly inside a cached tuple or dict, with its cache key."""
+    if isinstance(value, (tuple, list)):
+        for i, item in enumerate(value):
+            tag_frame(item, (key, i))
+    elif isinstance(value, dict):
+        for name, item in value.items():
+            tag_frame(item, (key, name))
+    else:
+        tag_frame(value, key)
+
+
+def versioned(fn=None, *, pinned=False, persist=None):
+    """Cache `fn` per (dataset version, arguments) in DATA_CACHE.
+
+    Entries never expire while the data is unchanged and are invalidated as
+    soon as a new load bumps the version. Arguments named with a leading
+    underscore are left out of the key, as with `st.cache_data`, while the
+    function's `code_fingerprint` is part of it. Pinned entries (whole-dataset
+    structures) are exempt from LRU eviction. With `persist` (default: not
+    pinned, since whole-dataset structures rebuild from SQLite faster than
+    they unpickle and would duplicate the database on disk), misses are
+    looked up in and written to RESULT_CACHE before and after computing. Cached values are shared, not copied: treat
+    them as read-only. Concurrent misses on the same key are computed once
+    through FLIGHTS and shared. Returned frames are tagged with their key
+    (`tag_frame`), so chart caches fingerprint them without hashing rows. Each call is timed as a metrics span that
+    records whether it was a memory hit, a disk hit, a shared in-flight
+    result or a miss.
+    """
+    if fn is None:
+        return functools.partial(versioned, pinned=pinned, persist=persist)
+    if persist is None:
+        persist = not pinned
+    signature = inspect.signature(fn)
+    code = code_fingerprint(fn)
+    label = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with span(label) as record:
+            value, outcome = lookup(args, kwargs)
+            if record:
+                record["cache"], record["rows"] = outcome, count_rows((), value)
+            return value
+
+    def lookup(args, kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        hashed = {k: v for k, v in bound.arguments.items() if not k.startswith("_")}
+        version = data_version()
+        key = fingerprint((fn.__module__, fn.__qualname__, code, version, hashed))
+        value = DATA_CACHE.get(key, _MISSING)
+        if value is not _MISSING:
+            return value, "hit"
+        (value, outcome), shared = FLIGHTS.do(key, lambda: load(key, version, args, kwargs), name=label)
+        return value, "shared" if shared else outcome
+
+    def load(key, version, args, kwargs):
+        value = RESULT_CACHE.get(key, _MISSING) if persist else _MISSING
+        outcome = "disk"
+        if value is _MISSING:
+            outcome = "miss"
+            value = fn(*args, **kwargs)
+            if persist:
+                RESULT_CACHE.put(key, value, version=version, name=f"{fn.__module__}.{fn.__qualname__}")
+        _tag_frames(key, value)
+        DATA_CACHE.put(key, value, tag=version, pinned=pinned)
+        return value, outcome
+    return wrapper
@@ -1,8 +1,9 @@
-import sqlite3
 from functools import lru_cache
 
+from .query_log import connect
+
 DB_PATH = "db/funding.db"
 
 @lru_cache(maxsize=1)
 def get_conn():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    return connect(DB_PATH, check_same_thread=False)
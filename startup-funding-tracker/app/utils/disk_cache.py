@@ -0,0 +1,133 @@
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Hits refresh an entry's LRU timestamp at most this often, to keep reads read-only.
+TOUCH_INTERVAL_S = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    name TEXT,
+    version TEXT,
+    size INTEGER,
+    created REAL,
+    last_used REAL,
+    value BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_results_last_used ON results(last_used);
+"""
+
+
+class DiskCache:
+    """Pickled results in a sidecar SQLite file, shared by every process on the host.
+
+    The file runs in WAL mode so readers never block the single writer, and
+    writers wait up to `timeout` seconds for each other instead of failing.
+    Entries are evicted least-recently-used first once their total size
+    passes `max_bytes`, and `retain(version)` drops entries of other dataset
+    versions. Anything that fails to pickle is simply not cached, and an
+    entry that fails to unpickle is deleted and reported as a miss.
+    """
+
+    def __init__(self, path, max_bytes, timeout=10.0):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._local = threading.local()
+        self.hits = self.misses = self.writes = self.evictions = 0
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        try:
+            conn = self._conn()
+            row = conn.execute("SELECT value, last_used FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            try:
+                value = pickle.loads(row[0])
+            except Exception:
+                # Truncated, corrupt or stale-class pickles can raise almost anything: drop the row.
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self.misses += 1
+                return default
+            now = time.time()
+            if now - row[1] > TOUCH_INTERVAL_S:
+                conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+        except sqlite3.Error:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key, value, version=None, name=None):
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+        if len(blob) > self.max_bytes:
+            return False
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, name, version, size, created, last_used, value) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, name, version, len(blob), now, now, blob),
+                )
+                self._evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            return False
+        self.writes += 1
+        return True
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used").fetchall():
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def retain(self, version):
+        """Delete entries computed from any other dataset version."""
+        try:
+            return self._conn().execute("DELETE FROM results WHERE version IS NOT ?", (version,)).rowcount
+        except sqlite3.Error:
+            return 0
+
+    def clear(self):
+        try:
+            self._conn().execute("DELETE FROM results")
+        except sqlite3.Error:
+            pass
+
+    def stats(self):
+        try:
+            entries, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        except sqlite3.Error:
+            entries, size = 0, 0
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes, "hits": self.hits,
+                "misses": self.misses, "writes": self.writes, "evictions": self.evictions}
@@ -0,0 +1,182 @@
+import csv
+import io
+import time
+import uuid
+from pathlib import Path
+import tempfile
+
+import streamlit as st
+
+from .config import EXPORT_CHUNK_ROWS, EXPORT_PANEL_MAX_ROWS
+from .db import DB_PATH
+from .queries import filter_clause
+from .query_log import connect
+
+# Finished exports waiting to be downloaded; files older than EXPORT_TTL_S are swept.
+EXPORT_DIR = Path(tempfile.gettempdir()) / "startup-exports"
+EXPORT_TTL_S = 3600
+FORMATS = {"CSV": ("csv", "text/csv"), "Parquet": ("parquet", "application/vnd.apache.parquet")}
+# SQLite declared type → Arrow type, so every Parquet row group shares one schema.
+ARROW_TYPES = {"INTEGER": "int64", "REAL": "float64", "TEXT": "string"}
+
+
+def export_columns(conn):
+    """(name, declared type) of every `startups` column, in table order."""
+    return [(row[1], row[2].upper()) for row in conn.execute("PRAGMA table_info(startups)").fetchall()]
+
+
+def _read_conn():
+    return connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+
+
+def startup_columns():
+    conn = _read_conn()
+    try:
+        return export_columns(conn)
+    finally:
+        conn.close()
+
+
+def export_rows(key, columns, limit=None, chunk_rows=EXPORT_CHUNK_ROWS, progress=None):
+    """Rows of `columns` for the startups in filter `key`, yielded `chunk_rows` at a time.
+
+    Reads straight from SQLite with the filter pushed into the WHERE clause,
+    on a read-only connection of its own, so at most one chunk is in memory.
+    `progress(done, total)` is called after every chunk. Unknown columns
+    and a `limit` below 1 raise ValueError.
+    """
+    if limit is not None and limit < 1:
+        raise ValueError(f"Export limit must be at least 1, got {limit}")
+    conn = _read_conn()
+    try:
+        known = dict(export_columns(conn))
+        unknown = [c for c in columns if c not in known]
+        if unknown or not columns:
+            raise ValueError(f"Unknown or no export columns: {unknown}")
+        where, params = filter_clause(key)
+        total = conn.execute(f"SELECT COUNT(*) FROM startups WHERE {where}", params).fetchone()[0]
+        total = min(total, limit) if limit is not None else total
+        select = ", ".join(f'"{c}"' for c in columns)
+        cursor = conn.execute(f"SELECT {select} FROM startups WHERE {where} LIMIT ?", [*params, total])
+        try:
+            done = 0
+            while rows := cursor.fetchmany(chunk_rows):
+                done += len(rows)
+                yield rows
+                if progress:
+                    progress(done, total)
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
+
+
+def csv_chunks(key, columns, limit=None, progress=None):
+    """UTF-8 CSV of the filtered startups, header first, one bytes chunk per row chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in export_rows(key, columns, limit, progress=progress):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink whose bytes are handed out (and forgotten) after each row group."""
+
+    def __init__(self):
+        self.parts, self.position = [], 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data, self.parts = b"".join(self.parts), []
+        return data
+
+
+def parquet_chunks(key, columns, limit=None, progress=None):
+    """Parquet file of the filtered startups, written and yielded one row group per row chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = dict(startup_columns())
+    schema = pa.schema([(c, ARROW_TYPES.get(types.get(c), "string")) for c in columns])
+    sink = _Drain()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in export_rows(key, columns, limit, progress=progress):
+            writer.write_table(pa.Table.from_arrays([pa.array(col, type=f.type) for col, f in zip(zip(*rows), schema)], schema=schema))
+            yield sink.take()
+    yield sink.take()
+
+
+def export_chunks(key, columns=None, limit=None, fmt="CSV", progress=None):
+    """Bytes of the export of `columns` (default: all) in `fmt`, "CSV" or "Parquet", chunk by chunk."""
+    columns = columns or [name for name, _ in startup_columns()]
+    return (parquet_chunks if fmt == "Parquet" else csv_chunks)(key, columns, limit, progress)
+
+
+def _sweep():
+    for old in EXPORT_DIR.glob("*"):
+        if time.time() - old.stat().st_mtime > EXPORT_TTL_S:
+            old.unlink(missing_ok=True)
+
+
+@st.fragment
+def export_panel(key, page, default_columns=None):
+    """"Download filtered data" expander: pick columns, row cap and format, then stream to a file.
+
+    The export is written chunk by chunk to a temporary file with a progress
+    bar, and only that finished file is handed to `st.download_button`.
+    The download button holds the whole file in memory, so rows are capped
+    at EXPORT_PANEL_MAX_ROWS here; larger exports go through the API's
+    streamed /export endpoint. Runs as a fragment, so preparing and
+    downloading don't rerun the page.
+    """
+    with st.expander("⬇️ Download filtered data"):
+        columns = [name for name, _ in startup_columns()]
+        chosen = st.multiselect("Columns", columns, default=default_columns or columns, key=f"{page}_export_columns")
+        cols = st.columns(2)
+        limit = cols[0].number_input("Max rows", min_value=1, max_value=EXPORT_PANEL_MAX_ROWS,
+                                     value=EXPORT_PANEL_MAX_ROWS, step=1_000, key=f"{page}_export_limit",
+                                     help=f"Downloads here are capped at {EXPORT_PANEL_MAX_ROWS:,} rows. For larger "
+                                          "exports, use the API's streamed /export endpoint (`python app/api_server.py`).")
+        fmt = cols[1].radio("Format", list(FORMATS), horizontal=True, key=f"{page}_export_format")
+        state_key = f"{page}_export_file"
+
+        if st.button("Prepare export", key=f"{page}_export_prepare", disabled=not chosen):
+            EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+            _sweep()
+            previous = st.session_state.pop(state_key, None)
+            if previous:
+                Path(previous).unlink(missing_ok=True)
+            extension, _ = FORMATS[fmt]
+            path = EXPORT_DIR / f"{page}_{uuid.uuid4().hex[:8]}.{extension}"
+            bar = st.progress(0.0, text="Exporting…")
+            report = lambda done, total: bar.progress(done / total if total else 1.0, text=f"Exported {done:,} of {total:,} rows")
+            with open(path, "wb") as out:
+                for chunk in export_chunks(key, chosen, int(limit), fmt, progress=report):
+                    out.write(chunk)
+            bar.progress(1.0, text="Export ready")
+            st.session_state[state_key] = str(path)
+
+        path = st.session_state.get(state_key)
+        if path and Path(path).exists():
+            extension = Path(path).suffix.lstrip(".")
+            mime = next(m for ext, m in FORMATS.values() if ext == extension)
+            with open(path, "rb") as data:
+                st.download_button(f"Download {extension.upper()} ({Path(path).stat().st_size / 1e6:,.1f} MB)", data,
+                                   file_name=f"startups_{page}.{extension}", mime=mime, on_click="ignore",
+                                   key=f"{page}_export_download")
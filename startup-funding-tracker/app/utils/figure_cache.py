@@ -0,0 +1,112 @@
+import functools
+import hashlib
+import json
+import weakref
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from .config import FIGURE_CACHE_MB
+from .lru import LRUCache
+from .metrics import count_rows, span
+
+
+# Scalars hashed by type and repr; anything else must be a container, a frame or an array.
+_SCALARS = (type(None), bool, int, float, complex, str, bytes, np.generic)
+
+
+# id() of frames whose content is identified by a cache key → (weak reference, key).
+_KEYED = {}
+
+
+def tag_frame(frame, key):
+    """Record that `frame` is fully identified by `key` (a @versioned key, say) and return it.
+
+    `fingerprint` then feeds that key instead of hashing every row. Only this
+    exact object is tagged: frames derived from it are hashed by content.
+    """
+    if isinstance(frame, (pd.DataFrame, pd.Series)):
+        ident = id(frame)
+        _KEYED[ident] = (weakref.ref(frame, lambda _: _KEYED.pop(ident, None)), key)
+    return frame
+
+
+def frame_key(frame):
+    """The key `frame` was tagged with, or None."""
+    entry = _KEYED.get(id(frame))
+    return entry[1] if entry is not None and entry[0]() is frame else None
+
+
+def fingerprint(obj):
+    """Cheap content hash of chart inputs.
+
+    Frames tagged with `tag_frame` are hashed by their key. Other frames,
+    Series and indexes are hashed column-wise and arrays by their raw bytes,
+    dtype and shape (a repr would be truncated for large ones). Unsupported
+    types raise TypeError rather than risk two inputs colliding.
+    """
+    h = hashlib.blake2b(digest_size=16)
+
+    def feed(value):
+        if isinstance(value, (pd.DataFrame, pd.Series)) and (key := frame_key(value)) is not None:
+            h.update(f"{type(value).__name__}@".encode())
+            feed(key)
+        elif isinstance(value, (pd.DataFrame, pd.Series)):
+            frame = value.to_frame() if isinstance(value, pd.Series) else value
+            h.update(repr((type(value).__name__, frame.shape, list(frame.columns), [str(t) for t in frame.dtypes])).encode())
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        elif isinstance(value, pd.Index):
+            h.update(repr(("Index", len(value), str(value.dtype))).encode())
+            h.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+        elif isinstance(value, np.ndarray):
+            h.update(repr(("ndarray", value.dtype.str, value.shape)).encode())
+            if value.dtype.hasobject:
+                feed(value.ravel().tolist())
+            else:
+                h.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, (list, tuple)):
+            h.update(f"{type(value).__name__}[{len(value)}]".encode())
+            for item in value:
+                feed(item)
+        elif isinstance(value, dict):
+            feed(sorted(value.items(), key=lambda kv: repr(kv[0])))
+        elif isinstance(value, _SCALARS):
+            h.update(f"{type(value).__name__}:{value!r}".encode())
+        else:
+            raise TypeError(f"Cannot fingerprint a {type(value).__name__}")
+
+    feed(obj)
+    return h.hexdigest()
+
+
+# Process-wide LRU of serialized figures, bounded by total JSON bytes.
+FIGURES = LRUCache(FIGURE_CACHE_MB * 1024 * 1024, sizeof=len)
+
+
+def cached_chart(builder):
+    """Serve a chart builder's figure from FIGURES when its inputs are unchanged.
+
+    The key is the builder's name plus a fingerprint of its arguments, in
+    which cached frames count by their (data version, filter, arguments) key
+    rather than their rows. Hits
+    rebuild the figure from stored JSON without Plotly validation, which is
+    an order of magnitude cheaper than running the builder again. Each call
+    is timed as a metrics span named after the builder.
+    """
+    label = f"charts.{builder.__qualname__}"
+
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        with span(label) as record:
+            key = fingerprint((builder.__module__, builder.__qualname__, args, kwargs))
+            spec = FIGURES.get(key)
+            if record:
+                record["cache"] = "miss" if spec is None else "hit"
+                record["rows"] = count_rows(args, None)
+            if spec is not None:
+                return go.Figure(json.loads(spec), _validate=False)
+            fig = builder(*args, **kwargs)
+            FIGURES.put(key, fig.to_json())
+            return fig
+    return wrapper
@@ -1,25 +1,78 @@
 import streamlit as st
 import pandas as pd
 from utils.db import get_conn
+from utils.data_cache import versioned
+from utils.figure_cache import frame_key, tag_frame
+from utils.metrics import span, timed
+from utils.profiler import annotate
 
-@st.cache_data
+# Pages reachable by URL but kept out of the sidebar navigation.
+HIDDEN_PAGES_CSS = """
+<style>
+[data-testid="stSidebarNav"] li:has(a[href$="/Diagnostics"]) { display: none; }
+</style>
+"""
+
+@versioned(pinned=True)
 def load_data():
     return pd.read_sql("SELECT * FROM startups", get_conn())
 
-def sidebar_filters(df):
-    st.sidebar.header("🔍 Filters")
+def filter_key(countries, industries, years):
+    """Hashable, order-independent key identifying one sidebar selection."""
+    return (tuple(sorted(countries)), tuple(sorted(industries)), (int(years[0]), int(years[1])))
+
+def default_selection(countries, industries, years):
+    """The sidebar's initial selection: first 3 countries, first 5 industries, every year."""
+    return countries[:3], industries[:5], (min(years), max(years))
 
+def filter_options(df):
+    """Sorted country, industry and founded-year choices offered by the sidebar."""
     countries = sorted(df['country'].dropna().unique().tolist())
     industries = sorted(df['industry'].dropna().unique().tolist())
     years = sorted(df['founded_year'].dropna().unique().astype(int).tolist())
+    return countries, industries, years
 
-    selected_country = st.sidebar.multiselect("🌍 Country", countries, default=countries[:3])
-    selected_industry = st.sidebar.multiselect("🏭 Industry", industries, default=industries[:5])
-    selected_year = st.sidebar.slider("📅 Founded Year", min(years), max(years), (min(years), max(years)))
-
-    filtered_df = df[
-        (df['country'].isin(selected_country)) &
-        (df['industry'].isin(selected_industry)) &
-        (df['founded_year'].between(*selected_year))
+def filter_frame(df, key):
+    """Rows of `df` matching a `filter_key` selection, tagged by `key` when `df` is itself a cached frame."""
+    countries, industries, years = key
+    rows = df[
+        (df['country'].isin(countries)) &
+        (df['industry'].isin(industries)) &
+        (df['founded_year'].between(*years))
     ]
-    return filtered_df
+    source = frame_key(df)
+    return rows if source is None else tag_frame(rows, (source, "filter_frame", key))
+
+@timed
+def sidebar_selection(df):
+    """Draw the sidebar filters and return their `filter_key` without filtering any rows."""
+    # Imported here: the warm-up goes through utils.cache, which imports this module.
+    from utils.warmup import start_warmup
+    start_warmup()
+    st.sidebar.markdown(HIDDEN_PAGES_CSS, unsafe_allow_html=True)
+    st.sidebar.header("🔍 Filters")
+
+    countries, industries, years = filter_options(df)
+    default_countries, default_industries, default_years = default_selection(countries, industries, years)
+
+    selected_country = st.sidebar.multiselect("🌍 Country", countries, default=default_countries)
+    selected_industry = st.sidebar.multiselect("🏭 Industry", industries, default=default_industries)
+    selected_year = st.sidebar.slider("📅 Founded Year", min(years), max(years), default_years)
+
+    key = filter_key(selected_country, selected_industry, selected_year)
+    st.session_state["filter_key"] = key
+    annotate(filter_key=key)
+    return key
+
+def sidebar_filters(df):
+    """Draw the sidebar filters and return the matching rows of `df`.
+
+    The sidebar is timed by `sidebar_selection`'s span and the row filter by
+    a sibling `filters.filter_frame` span, so neither is counted twice.
+    """
+    key = sidebar_selection(df)
+    with span("filters.filter_frame") as record:
+        rows = filter_frame(df, key)
+        if record:
+            record["rows"] = len(rows)
+    return rows
@@ -0,0 +1,16 @@
+import pandas as pd
+
+# ISO 3166-1 alpha-3 codes for the maps; resolved once (by etl/clean_transform.py)
+# instead of by Plotly's country-name matching on every render.
+ISO3 = {
+    "Australia": "AUS", "Brazil": "BRA", "Canada": "CAN", "China": "CHN",
+    "France": "FRA", "Germany": "DEU", "India": "IND", "Japan": "JPN",
+    "UK": "GBR", "United Kingdom": "GBR", "USA": "USA", "United States": "USA",
+    "Singapore": "SGP", "Israel": "ISR", "South Korea": "KOR", "Netherlands": "NLD",
+    "Sweden": "SWE", "Spain": "ESP", "Italy": "ITA", "Switzerland": "CHE",
+}
+
+
+def iso3_codes(countries):
+    """ISO-3 code for each country name in `countries` (NaN where unknown)."""
+    return pd.Series(countries).map(ISO3)
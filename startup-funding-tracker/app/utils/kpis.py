@@ -1,25 +1,114 @@
+import numpy as np
 import pandas as pd
 
-def calculate_kpis(df):
-    kpis = {
-        "Total Startups": len(df),
-        "Total Funding ($M)": df["funding_musd"].sum(),
-        "Avg Funding ($M)": df["funding_musd"].mean(),
-        "Avg Valuation ($B)": df["valuation_busd"].mean(),
-        "Avg Revenue ($M)": df["revenue_musd"].mean(),
-        "Avg Employees": df["employees"].mean(),
-        "IPO %": 100 * df["ipo"].mean(),
-        "Acquired %": 100 * df["acquired"].mean(),
-        "Avg Success Score": df["success_score"].mean(),
-        "Avg Customers (M)": df["customers_mil"].mean(),
-        "Top Country": df.groupby("country")["funding_musd"].sum().idxmax(),
-        "Top Industry": df.groupby("industry")["funding_musd"].sum().idxmax(),
-        "Median Funding ($M)": df["funding_musd"].median(),
-        "Valuation / Funding Ratio": (df["valuation_busd"].sum() / df["funding_musd"].sum()) if df["funding_musd"].sum() > 0 else 0,
-        "Top Tech Stack": df["tech_stack"].mode()[0] if "tech_stack" in df.columns and not df["tech_stack"].dropna().empty else "N/A",
-        "Highest Success Startup": df.loc[df["success_score"].idxmax(), "name"],
-        "Avg Funding per Employee": (df["funding_musd"].sum() / df["employees"].sum()) if df["employees"].sum() > 0 else 0,
-        "Total Followers (M)": df["followers"].sum() / 1_000_000,
-        "Avg Valuation / Employee": (df["valuation_busd"].sum() * 1000 / df["employees"].sum()) if df["employees"].sum() > 0 else 0,
+from .metrics import timed
+
+# Numeric columns whose sums / non-null counts feed the KPI cards.
+SUM_COLS = [
+    "funding_musd", "valuation_busd", "revenue_musd", "employees",
+    "ipo", "acquired", "success_score", "customers_mil", "followers",
+]
+# Categorical columns the KPIs group by (top country/industry, modal tech stack).
+DIMENSIONS = ["country", "industry", "tech_stack"]
+
+
+def encode_dimensions(df):
+    """Sorted integer codes for the KPI dimension columns of `df`.
+
+    Build this once on the unfiltered frame and pass it to `kpi_stats` so the
+    string columns are not re-hashed on every filter change.
+    """
+    return {col: pd.factorize(df[col], sort=True) for col in DIMENSIONS if col in df.columns}
+
+
+def _dimension_codes(df, col, codes):
+    if codes is not None and col in codes:
+        # Filtered frames keep the RangeIndex labels of the frame the codes came from.
+        full_codes, labels = codes[col]
+        return full_codes[df.index.to_numpy()], labels
+    return pd.factorize(df[col], sort=True)
+
+
+def kpi_stats(df, codes=None, median_funding=None):
+    """Sufficient statistics for every KPI, gathered in a single pass over `df`.
+
+    The result is a small dict of scalars and per-category arrays, cheap to
+    cache per filter key and turned into the KPI cards by `kpis_from_stats`.
+    Pass `median_funding` (e.g. from merged quantile sketches) to skip the
+    exact median.
+    """
+    stats = {"n": len(df), "sum": {}, "count": {}}
+    for col in SUM_COLS:
+        values = df[col].to_numpy()
+        if values.dtype.kind in "iub":
+            stats["sum"][col] = values.sum()
+            stats["count"][col] = len(values)
+        else:
+            values = values.astype(np.float64, copy=False)
+            valid = ~np.isnan(values)
+            # Zero-fill rather than drop NaNs so the summation order matches pandas.
+            stats["sum"][col] = np.where(valid, values, 0.0).sum()
+            stats["count"][col] = int(valid.sum())
+
+    funding = df["funding_musd"].to_numpy(dtype=np.float64)
+    if median_funding is None:
+        median_funding = np.nanmedian(funding) if stats["count"]["funding_musd"] else np.nan
+    stats["median_funding"] = median_funding
+    funding = np.nan_to_num(funding)
+
+    for col in ["country", "industry"]:
+        col_codes, labels = _dimension_codes(df, col, codes)
+        keep = col_codes >= 0
+        totals = np.bincount(col_codes[keep], weights=funding[keep], minlength=len(labels))
+        present = np.bincount(col_codes[keep], minlength=len(labels)) > 0
+        stats[f"{col}_funding"] = (np.asarray(labels)[present], totals[present])
+
+    if "tech_stack" in df.columns:
+        col_codes, labels = _dimension_codes(df, "tech_stack", codes)
+        counts = np.bincount(col_codes[col_codes >= 0], minlength=len(labels))
+        stats["tech_stack_counts"] = (np.asarray(labels)[counts > 0], counts[counts > 0])
+
+    success = df["success_score"].to_numpy(dtype=np.float64)
+    stats["best_name"] = df["name"].iloc[np.nanargmax(success)] if stats["count"]["success_score"] else None
+    return stats
+
+
+def _top_label(pair):
+    labels, totals = pair
+    return labels[np.argmax(totals)]
+
+
+def kpis_from_stats(stats):
+    s, c = stats["sum"], stats["count"]
+
+    def mean(col):
+        return np.float64(s[col] / c[col]) if c[col] else np.float64(np.nan)
+
+    funding, employees, valuation = s["funding_musd"], s["employees"], s["valuation_busd"]
+    tech = stats.get("tech_stack_counts")
+    return {
+        "Total Startups": stats["n"],
+        "Total Funding ($M)": funding,
+        "Avg Funding ($M)": mean("funding_musd"),
+        "Avg Valuation ($B)": mean("valuation_busd"),
+        "Avg Revenue ($M)": mean("revenue_musd"),
+        "Avg Employees": mean("employees"),
+        "IPO %": 100 * mean("ipo"),
+        "Acquired %": 100 * mean("acquired"),
+        "Avg Success Score": mean("success_score"),
+        "Avg Customers (M)": mean("customers_mil"),
+        "Top Country": _top_label(stats["country_funding"]),
+        "Top Industry": _top_label(stats["industry_funding"]),
+        "Median Funding ($M)": np.float64(stats["median_funding"]),
+        "Valuation / Funding Ratio": valuation / funding if funding > 0 else 0,
+        "Top Tech Stack": _top_label(tech) if tech is not None and len(tech[0]) else "N/A",
+        "Highest Success Startup": stats["best_name"],
+        "Avg Funding per Employee": funding / employees if employees > 0 else 0,
+        "Total Followers (M)": s["followers"] / 1_000_000,
+        "Avg Valuation / Employee": valuation * 1000 / employees if employees > 0 else 0,
     }
-    return kpis
+
+
+@timed
+def calculate_kpis(df, stats=None):
+    return kpis_from_stats(stats if stats is not None else kpi_stats(df))
@@ -0,0 +1,51 @@
+import streamlit as st
+
+from .data_cache import data_version
+from .figure_cache import fingerprint
+from .metrics import span, timed
+
+
+def section_header(title, subtext=None):
+    st.markdown(f'<p class="section-header">{title}</p>', unsafe_allow_html=True)
+    if subtext:
+        st.markdown(f"<p class='subtext'>{subtext}</p>", unsafe_allow_html=True)
+
+
+def memoize(key, load, deps):
+    """`load(*deps)`, recomputed only when `deps` or the dataset version change.
+
+    The last result per `key` lives in session state, so reruns triggered by
+    unrelated widgets reuse it instead of recomputing.
+    """
+    store = st.session_state.setdefault("_sections", {})
+    stamp = fingerprint((data_version(), deps))
+    entry = store.get(key)
+    with span(f"section.{key}.load") as record:
+        if record:
+            record["cache"] = "hit" if entry is not None and entry[0] == stamp else "miss"
+        if entry is None or entry[0] != stamp:
+            entry = store[key] = (stamp, load(*deps))
+    return entry[1]
+
+
+def section(title, render, key, deps=(), load=None, lazy=False, subtext=None):
+    """Draw one page section that recomputes only when its declared inputs change.
+
+    `deps` lists everything the section reads from outside itself (the sidebar
+    filter key, page-level widget values); `load(*deps)` turns them into the
+    section's data through `memoize`. `render(data)` runs as an `st.fragment`,
+    so widgets created inside it rerun this section alone. A lazy section sits
+    behind a toggle and neither loads nor renders until it is switched on.
+
+    Loading and rendering are timed as the metrics spans
+    `section.<key>.load` and `section.<key>.render`.
+
+    Returns the loaded data, or None while a lazy section is closed.
+    """
+    section_header(title, subtext)
+    if lazy and not st.toggle("Show section", key=f"{key}__open"):
+        st.caption("Switch on to compute this section.")
+        return None
+    data = memoize(key, load, deps) if load is not None else None
+    st.fragment(timed(render, name=f"section.{key}.render"))(data)
+    return data
@@ -0,0 +1,108 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def approx_size(obj, _seen=None):
+    """Rough in-memory size of a cached value in bytes."""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (str, bytes)):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(approx_size(k, seen) + approx_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(approx_size(v, seen) for v in obj)
+    if hasattr(obj, "__dict__"):
+        return sys.getsizeof(obj) + approx_size(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by the approximate total bytes of its values.
+
+    Every entry carries a `tag` (e.g. the dataset version) so `retain(tag)`
+    can drop exactly the entries built from other tags. Pinned entries are
+    never evicted for space, only by `retain` or `clear`, and their bytes are
+    tallied separately so they cannot crowd the evictable ones out of
+    `max_bytes`.
+    """
+
+    def __init__(self, max_bytes, sizeof=approx_size):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self._pinned = {}
+        self._bytes = self._pinned_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._pinned:
+                self.hits += 1
+                return self._pinned[key][0]
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, tag=None, pinned=False):
+        size = self.sizeof(value)
+        if size > self.max_bytes and not pinned:
+            return
+        with self._lock:
+            self._drop(key)
+            if pinned:
+                self._pinned[key] = (value, size, tag)
+                self._pinned_bytes += size
+                return
+            self._entries[key] = (value, size, tag)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, old_size, _) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+
+    def _drop(self, key):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        if key in self._pinned:
+            self._pinned_bytes -= self._pinned.pop(key)[1]
+
+    def retain(self, tag):
+        """Drop every entry whose tag differs from `tag`; returns how many went."""
+        with self._lock:
+            stale = [k for store in (self._entries, self._pinned) for k, v in store.items() if v[2] != tag]
+            for key in stale:
+                self._drop(key)
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._pinned.clear()
+            self._bytes = self._pinned_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries) + len(self._pinned), "pinned": len(self._pinned),
+                "bytes": self._bytes, "pinned_bytes": self._pinned_bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "invalidations": self.invalidations,
+            }
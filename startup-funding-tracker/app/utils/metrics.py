@@ -0,0 +1,176 @@
+import atexit
+import bisect
+import functools
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager, suppress
+
+from .config import METRICS_BUFFER, METRICS_ENABLED, METRICS_FLUSH_S, METRICS_RETENTION_DAYS, METRICS_WRITE_TIMEOUT_S
+from .db import DB_PATH
+from .profiler import start_capture
+
+# Upper bounds (ms) of the in-process latency histogram buckets; one more bucket holds the rest.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    ts REAL,
+    rerun TEXT,
+    page TEXT,
+    span TEXT,
+    ms REAL,
+    rows INTEGER,
+    cache TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_metrics_ts ON metrics(ts);
+"""
+
+# The most recent span records (ts, rerun, page, span, ms, rows, cache), newest last.
+RECENT = deque(maxlen=METRICS_BUFFER)
+# Per-span counters of this process: calls, cache hits/misses, rows and a latency histogram.
+SPANS = {}
+_pending = deque(maxlen=METRICS_BUFFER)
+_lock = threading.Lock()
+_local = threading.local()
+_state = {"last_flush": time.time(), "conn": None}
+# Serializes flushes: the writer connection below is shared by every thread that flushes.
+_write_lock = threading.Lock()
+
+
+def begin_rerun(page):
+    """Mark the start of a page rerun; spans recorded on this thread are attributed to it.
+
+    Also starts a profile of the rerun when utils.profiler is switched on.
+    """
+    _local.rerun = (uuid.uuid4().hex[:12], page)
+    start_capture(page, sys._getframe(1))
+
+
+def current_rerun():
+    """The (rerun id, page) spans on this thread are attributed to, for handing to worker threads."""
+    return getattr(_local, "rerun", (None, None))
+
+
+def adopt_rerun(rerun):
+    """Attribute spans recorded on this (worker) thread to `rerun`, as returned by `current_rerun`."""
+    _local.rerun = rerun
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def count_rows(args, result):
+    """Rows processed: the length of the first frame argument, else of a frame result."""
+    for value in (*args, result):
+        if hasattr(value, "shape") and hasattr(value, "__len__"):
+            return len(value)
+    return None
+
+
+@contextmanager
+def span(name, rows=None):
+    """Time the enclosed block as `name`.
+
+    Yields the open record, a dict whose "rows" and "cache" ("hit", "disk",
+    "shared" or "miss") entries the block may fill in before it ends.
+    """
+    if not METRICS_ENABLED:
+        yield {}
+        return
+    record = {"rows": rows, "cache": None}
+    stack = _stack()
+    stack.append(record)
+    ts, start = time.time(), time.perf_counter()
+    try:
+        yield record
+    finally:
+        ms = (time.perf_counter() - start) * 1000
+        stack.pop()
+        _record(ts, name, ms, record["rows"], record["cache"])
+
+
+def timed(fn=None, *, name=None):
+    """Decorator form of `span`, named `module.function` unless `name` is given."""
+    if fn is None:
+        return functools.partial(timed, name=name)
+    label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with span(label) as record:
+            result = fn(*args, **kwargs)
+            if record and record["rows"] is None:
+                record["rows"] = count_rows(args, result)
+            return result
+    return wrapper
+
+
+def _record(ts, name, ms, rows, cache):
+    rerun, page = current_rerun()
+    row = (ts, rerun, page, name, ms, rows, cache)
+    with _lock:
+        RECENT.append(row)
+        _pending.append(row)
+        stats = SPANS.get(name)
+        if stats is None:
+            stats = SPANS[name] = {"calls": 0, "hits": 0, "misses": 0, "rows": 0,
+                                   "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1)}
+        stats["calls"] += 1
+        if cache is not None:
+            stats["hits" if cache != "miss" else "misses"] += 1
+        stats["rows"] += rows or 0
+        stats["histogram"][bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        due = ts - _state["last_flush"] >= METRICS_FLUSH_S
+    if due:
+        flush()
+
+
+def snapshot():
+    """Consistent copy of SPANS (histograms included) and RECENT, taken under the metrics lock."""
+    with _lock:
+        spans = {name: {**stats, "histogram": list(stats["histogram"])} for name, stats in SPANS.items()}
+        return spans, list(RECENT)
+
+
+def flush():
+    """Write span records gathered since the last flush to the `metrics` table.
+
+    Records older than METRICS_RETENTION_DAYS are deleted on the way. If the
+    database cannot be written the batch is dropped; the in-memory ring
+    buffer still holds it. Writes go through a connection of their own, not
+    the app's shared `get_conn()`, one flush at a time. Returns the number
+    of records written.
+    """
+    with _lock:
+        batch = list(_pending)
+        _pending.clear()
+        _state["last_flush"] = time.time()
+    if not batch:
+        return 0
+    with _write_lock:
+        try:
+            conn = _state["conn"]
+            if conn is None:
+                conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=METRICS_WRITE_TIMEOUT_S)
+                conn.executescript(SCHEMA)
+                _state["conn"] = conn
+            conn.executemany("INSERT INTO metrics (ts, rerun, page, span, ms, rows, cache) VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            conn.execute("DELETE FROM metrics WHERE ts < ?", (time.time() - METRICS_RETENTION_DAYS * 86400,))
+            conn.commit()
+        except sqlite3.Error:
+            if _state["conn"] is not None:
+                with suppress(sqlite3.Error):
+                    _state["conn"].rollback()
+            return 0
+    return len(batch)
+
+
+atexit.register(flush)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Numeric features the similarity search compares, z-scored before indexing.
+NEIGHBOR_FEATURES = [
+    "funding_musd", "valuation_busd", "revenue_musd", "employees",
+    "customers_mil", "success_score", "founded_year",
+]
+# Persisted next to db/funding.db by etl/build_neighbors.py.
+INDEX_PATH = Path("db/funding_neighbors.npz")
+# Rows scored per matrix product; bounds scratch memory to BLOCK_ROWS floats.
+BLOCK_ROWS = 1 << 16
+
+
+class NeighborIndex:
+    """Exact k-nearest-neighbour search over z-scored float32 startup features.
+
+    Rows are stored grouped by industry as [x, |x|²], so the ranking distance
+    |x|² - 2·x·q of a whole block is one BLAS matrix-vector product with
+    [-2q, 1]. Blocks are scanned in order while a running k-th best distance
+    prunes candidates, and an industry-restricted query scans only that
+    industry's contiguous slice. Queries never touch the database.
+    """
+
+    def __init__(self, features, ids, industries, offsets, mean, std):
+        features = np.asarray(features, dtype=np.float32)
+        sq_norms = np.einsum("ij,ij->i", features, features)
+        self.rows = np.ascontiguousarray(np.column_stack([features, sq_norms]))
+        # Fixed-width bytes keep millions of UUIDs compact.
+        self.ids = np.asarray(ids, dtype="S")
+        self.industries = list(industries)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, df):
+        values = df[NEIGHBOR_FEATURES].to_numpy(dtype=np.float64)
+        mean, std = np.nanmean(values, axis=0), np.nanstd(values, axis=0)
+        std[std == 0] = 1.0
+        # Missing features sit at the mean, i.e. contribute no distance.
+        features = np.nan_to_num((values - mean) / std)
+        industry, industries = pd.factorize(df["industry"], sort=True, use_na_sentinel=False)
+        order = np.argsort(industry, kind="stable")
+        offsets = np.searchsorted(industry[order], np.arange(len(industries) + 1))
+        ids = df["startup_id"].to_numpy(dtype="S")[order]
+        return cls(features[order], ids, [str(i) for i in industries], offsets, mean, std)
+
+    def save(self, path=INDEX_PATH):
+        np.savez(path, features=self.rows[:, :-1], ids=self.ids, industries=np.asarray(self.industries, dtype=str),
+                 offsets=self.offsets, mean=self.mean, std=self.std)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path) as data:
+            return cls(data["features"], data["ids"], data["industries"].tolist(), data["offsets"],
+                       data["mean"], data["std"])
+
+    def encode(self, row):
+        """Query vector for a startup record (mapping or Series with NEIGHBOR_FEATURES)."""
+        values = np.array([row.get(f, np.nan) for f in NEIGHBOR_FEATURES], dtype=np.float64)
+        return np.nan_to_num((values - self.mean) / self.std).astype(np.float32)
+
+    def query(self, row, k=5, industry=None, exclude=None):
+        """Ids and Euclidean distances of the `k` startups closest to `row`.
+
+        Pass `industry` to search only that industry and `exclude` (a startup
+        id) to drop the query company itself from the results.
+        """
+        q = self.encode(row)
+        if industry is None:
+            lo, hi = 0, len(self)
+        elif industry in self.industries:
+            code = self.industries.index(industry)
+            lo, hi = self.offsets[code], self.offsets[code + 1]
+        else:
+            lo = hi = 0
+        probe = np.append(-2.0 * q, 1.0).astype(np.float32)
+        take = k + (exclude is not None)
+        best_idx, best_dist, bound = np.empty(0, np.int64), np.empty(0, np.float32), np.inf
+        for start in range(lo, hi, BLOCK_ROWS):
+            dist = self.rows[start:min(start + BLOCK_ROWS, hi)] @ probe
+            hits = np.flatnonzero(dist < bound)
+            if not len(hits):
+                continue
+            best_idx = np.concatenate([best_idx, hits + start])
+            best_dist = np.concatenate([best_dist, dist[hits]])
+            if len(best_dist) > take:
+                top = np.argpartition(best_dist, take - 1)[:take]
+                best_idx, best_dist = best_idx[top], best_dist[top]
+                bound = best_dist.max()
+        order = np.argsort(best_dist, kind="stable")
+        idx, dist = best_idx[order], best_dist[order]
+        if exclude is not None:
+            keep = self.ids[idx] != str(exclude).encode()
+            idx, dist = idx[keep], dist[keep]
+        idx, dist = idx[:k], dist[:k]
+        return pd.DataFrame({
+            "startup_id": self.ids[idx].astype(str),
+            "distance": np.sqrt(np.maximum(dist + float(q @ q), 0.0)),
+        })
@@ -0,0 +1,260 @@
+import numpy as np
+import pandas as pd
+
+# One partition per country × industry × founded_year cell.
+PARTITION_KEYS = ["country", "industry", "founded_year"]
+METRICS = [
+    "funding_musd", "valuation_busd", "revenue_musd", "employees",
+    "success_score", "customers_mil", "followers", "acquired", "ipo",
+]
+FIELDS = ["count", "sum", "m2", "min", "max", "argmax"]
+
+
+class AggState:
+    """Mergeable aggregate state for a set of metrics.
+
+    Holds, per metric, the non-null count, sum, M2 (sum of squared deviations
+    from the mean), min, max and the row label of the max. States merge with
+    `+` (Chan et al. parallel update) and subtract with `-`; count, sum and M2
+    subtract exactly, while min/max/argmax are kept only where the removed
+    state cannot have held them and are NaN (unknown) otherwise.
+    """
+
+    def __init__(self, metrics, count, total, m2, minimum, maximum, argmax):
+        self.metrics = list(metrics)
+        self.count = np.asarray(count, dtype=np.float64)
+        self.sum = np.asarray(total, dtype=np.float64)
+        self.m2 = np.asarray(m2, dtype=np.float64)
+        self.min = np.asarray(minimum, dtype=np.float64)
+        self.max = np.asarray(maximum, dtype=np.float64)
+        self.argmax = np.asarray(argmax, dtype=np.float64)
+
+    @classmethod
+    def empty(cls, metrics=METRICS):
+        zeros, nans = np.zeros(len(metrics)), np.full(len(metrics), np.nan)
+        return cls(metrics, zeros, zeros, zeros, nans, nans, nans)
+
+    @property
+    def mean(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, self.sum / self.count, np.nan)
+
+    def var(self, ddof=1):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+    def __add__(self, other):
+        n = self.count + other.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = np.nan_to_num(other.mean - self.mean)
+            m2 = self.m2 + other.m2 + np.where(n > 0, delta ** 2 * self.count * other.count / n, 0.0)
+        take_other = (other.max > self.max) | np.isnan(self.max) | (
+            (other.max == self.max) & (other.argmax < self.argmax)
+        )
+        return AggState(
+            self.metrics, n, self.sum + other.sum, m2,
+            np.fmin(self.min, other.min), np.fmax(self.max, other.max),
+            np.where(take_other, other.argmax, self.argmax),
+        )
+
+    def __sub__(self, other):
+        n = self.count - other.count
+        total = self.sum - other.sum
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rest_mean = np.where(n > 0, total / n, 0.0)
+            delta = np.nan_to_num(other.mean - rest_mean)
+            m2 = self.m2 - other.m2 - np.where(self.count > 0, delta ** 2 * n * other.count / self.count, 0.0)
+        # Extrema survive only where the removed state was strictly inside them.
+        keep_max = (other.count == 0) | (other.max < self.max)
+        keep_min = (other.count == 0) | (other.min > self.min)
+        empty = n <= 0
+        return AggState(
+            self.metrics, np.maximum(n, 0), np.where(empty, 0.0, total), np.where(empty, 0.0, np.maximum(m2, 0.0)),
+            np.where(keep_min & ~empty, self.min, np.nan), np.where(keep_max & ~empty, self.max, np.nan),
+            np.where(keep_max & ~empty, self.argmax, np.nan),
+        )
+
+    def to_dict(self):
+        """Per-metric summary: count, sum, mean, std, min, max and argmax row label."""
+        std = np.sqrt(self.var())
+        return {
+            m: {
+                "count": int(self.count[i]), "sum": self.sum[i], "mean": self.mean[i], "std": std[i],
+                "min": self.min[i], "max": self.max[i],
+                "argmax": None if np.isnan(self.argmax[i]) else int(self.argmax[i]),
+            }
+            for i, m in enumerate(self.metrics)
+        }
+
+
+def build_partitions(df, metrics=METRICS):
+    """Partial aggregates of `df`, one row per country × industry × founded_year cell.
+
+    Columns are the partition keys plus `<metric>__<field>` for every field in
+    FIELDS. `argmax` is the row label of the metric's max in `df`.
+    """
+    keyed = df.dropna(subset=PARTITION_KEYS)
+    grouped = keyed.groupby(PARTITION_KEYS, sort=True)
+    parts = {}
+    for m in metrics:
+        col = grouped[m]
+        count = col.count()
+        parts[f"{m}__count"] = count
+        parts[f"{m}__sum"] = col.sum()
+        parts[f"{m}__m2"] = (col.var(ddof=0) * count).fillna(0.0)
+        parts[f"{m}__min"] = col.min()
+        parts[f"{m}__max"] = col.max()
+        filled = keyed[m].fillna(-np.inf)
+        parts[f"{m}__argmax"] = filled.groupby([keyed[k] for k in PARTITION_KEYS], sort=True).idxmax().where(count > 0)
+    return pd.DataFrame(parts).astype(np.float64).reset_index()
+
+
+def partition_mask(parts, key):
+    """Boolean mask of the partitions covered by a `filters.filter_key` selection."""
+    countries, industries, (y0, y1) = key
+    return (
+        parts["country"].isin(countries).to_numpy()
+        & parts["industry"].isin(industries).to_numpy()
+        & parts["founded_year"].between(y0, y1).to_numpy()
+    )
+
+
+def _stacked(parts, field, metrics):
+    return parts[[f"{m}__{field}" for m in metrics]].to_numpy()
+
+
+def reduce_partitions(parts, mask=None, metrics=METRICS):
+    """Merge the selected partitions into a single AggState."""
+    sel = parts if mask is None else parts[mask]
+    if sel.empty:
+        return AggState.empty(metrics)
+    count = _stacked(sel, "count", metrics)
+    total = _stacked(sel, "sum", metrics)
+    n = count.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n > 0, total.sum(axis=0) / n, 0.0)
+        part_mean = np.where(count > 0, total / count, mean)
+    m2 = _stacked(sel, "m2", metrics).sum(axis=0) + (count * (part_mean - mean) ** 2).sum(axis=0)
+
+    minima, maxima = _stacked(sel, "min", metrics), _stacked(sel, "max", metrics)
+    has = ~np.isnan(maxima).all(axis=0)
+    best = np.where(np.isnan(maxima), -np.inf, maxima).max(axis=0)
+    # Ties resolve to the earliest row, matching pandas' idxmax.
+    arg = np.where(maxima == best, _stacked(sel, "argmax", metrics), np.inf).min(axis=0)
+    return AggState(
+        metrics, n, total.sum(axis=0), m2,
+        np.where(has, np.where(np.isnan(minima), np.inf, minima).min(axis=0), np.nan),
+        np.where(has, best, np.nan), np.where(has, arg, np.nan),
+    )
+
+
+def group_stat(parts, by, metric, stat, mask=None):
+    """`df.groupby(by)[metric].<stat>()` answered from partitions instead of rows.
+
+    `by` is one or more partition keys; `stat` is one of count, sum, mean,
+    var, min or max.
+    """
+    sel = parts if mask is None else parts[mask]
+    grouped = sel.groupby(by, sort=True)
+    count = grouped[f"{metric}__count"].sum()
+    total = grouped[f"{metric}__sum"].sum()
+    if stat == "count":
+        out = count.astype(np.int64)
+    elif stat == "sum":
+        out = total
+    elif stat == "mean":
+        out = total / count.where(count > 0)
+    elif stat == "var":
+        keys = [by] if isinstance(by, str) else list(by)
+        cell_count = sel[f"{metric}__count"]
+        cell_mean = sel[f"{metric}__sum"] / cell_count.where(cell_count > 0)
+        group_mean = (total / count.where(count > 0)).rename("group_mean")
+        spread = cell_count * (cell_mean - sel.join(group_mean, on=keys)["group_mean"]) ** 2
+        m2 = grouped[f"{metric}__m2"].sum() + spread.fillna(0.0).groupby([sel[k] for k in keys], sort=True).sum()
+        out = m2 / (count - 1).where(count > 1)
+    elif stat in ("min", "max"):
+        out = getattr(grouped[f"{metric}__{stat}"], stat)()
+    else:
+        raise ValueError(f"Unsupported stat: {stat}")
+    return out.rename(metric)
+
+
+def group_stats(parts, by, aggs, mask=None):
+    """`df.groupby(by).agg(aggs)` for a {metric: stat} mapping, from partitions."""
+    return pd.concat([group_stat(parts, by, m, stat, mask) for m, stat in aggs.items()], axis=1)
+
+
+class IncrementalAggregate:
+    """Running AggState over the partitions of the current filter selection.
+
+    `update(key)` merges in the partitions a new selection adds and subtracts
+    the ones it drops, so toggling one country or industry touches only those
+    cells. Extrema lost to a subtraction are re-derived from the selected
+    partitions' own min/max columns, never from raw rows.
+    """
+
+    def __init__(self, parts, metrics=METRICS):
+        self.parts = parts
+        self.metrics = metrics
+        self.mask = np.zeros(len(parts), dtype=bool)
+        self.state = AggState.empty(metrics)
+
+    def update(self, key):
+        mask = partition_mask(self.parts, key)
+        added, removed = mask & ~self.mask, self.mask & ~mask
+        if added.sum() + removed.sum() >= mask.sum():
+            self.state = reduce_partitions(self.parts, mask, self.metrics)
+        else:
+            state = self.state
+            if added.any():
+                state = state + reduce_partitions(self.parts, added, self.metrics)
+            if removed.any():
+                state = state - reduce_partitions(self.parts, removed, self.metrics)
+                if np.isnan(state.max).any() or np.isnan(state.min).any():
+                    extrema = reduce_partitions(self.parts, mask, self.metrics)
+                    state.min, state.max, state.argmax = extrema.min, extrema.max, extrema.argmax
+            self.state = state
+        self.mask = mask
+        return self.state
+
+
+# Numeric columns of the Success Factors correlation matrix.
+CORR_COLS = ["funding_musd", "valuation_busd", "revenue_musd", "employees", "success_score", "customers_mil", "followers"]
+
+
+def build_comoments(df, cols=CORR_COLS):
+    """Per-partition correlation sufficient statistics over complete rows.
+
+    For every country × industry × founded_year cell this keeps n, the column
+    sums and the centered co-moment matrix Σ(x - x̄)(y - ȳ). That is the same
+    information as n, Σx, Σx² and Σxy, but merges without the cancellation
+    raw second moments suffer on columns like `followers`.
+    """
+    complete = df.dropna(subset=PARTITION_KEYS + cols)
+    grouped = complete.groupby(PARTITION_KEYS, sort=True)
+    cell = grouped.ngroup().to_numpy()
+    keys = grouped.size().reset_index()[PARTITION_KEYS]
+    X = complete[cols].to_numpy(dtype=np.float64)
+    n = np.bincount(cell, minlength=len(keys)).astype(np.float64)
+    sums = np.column_stack([np.bincount(cell, weights=X[:, j], minlength=len(keys)) for j in range(len(cols))])
+    D = X - (sums / n[:, None])[cell]
+    comoments = np.empty((len(keys), len(cols), len(cols)))
+    for j in range(len(cols)):
+        for l in range(j, len(cols)):
+            comoments[:, j, l] = comoments[:, l, j] = np.bincount(cell, weights=D[:, j] * D[:, l], minlength=len(keys))
+    return {"keys": keys, "cols": list(cols), "n": n, "sums": sums, "comoments": comoments}
+
+
+def merged_corr(moments, mask=None):
+    """Exact Pearson matrix of the selected partitions, like `DataFrame.corr()`."""
+    n, sums, comoments = moments["n"], moments["sums"], moments["comoments"]
+    if mask is not None:
+        n, sums, comoments = n[mask], sums[mask], comoments[mask]
+    total = n.sum()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spread = sums / n[:, None] - sums.sum(axis=0) / total
+        cov = comoments.sum(axis=0) + np.einsum("p,pj,pl->jl", n, spread, spread)
+        scale = np.sqrt(np.diag(cov))
+        corr = cov / np.outer(scale, scale)
+    np.fill_diagonal(corr, np.where(scale > 0, 1.0, np.nan))
+    return pd.DataFrame(corr, index=moments["cols"], columns=moments["cols"])
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from .config import DEBUG, PROFILE_DIR, PROFILE_INTERVAL_MS, PROFILE_KEEP, PROFILE_MAX_S
+
+# `?profile=1` captures the rerun it is on, then is removed from the URL.
+QUERY_PARAM = "profile"
+
+_local = threading.local()
+
+
+class RerunSampler:
+    """Samples the stack of one script thread until its page frame returns.
+
+    Stacks are trimmed to start at the page's module frame and folded into
+    `function (file:line)` frames, so the output is the collapsed-stack
+    format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, page, page_frame, interval_ms=PROFILE_INTERVAL_MS, max_s=PROFILE_MAX_S):
+        self.page = page
+        self.meta = {}
+        self.stacks = Counter()
+        self.interval = interval_ms / 1000
+        self.max_s = max_s
+        self._thread_id = threading.get_ident()
+        self._page_code = page_frame.f_code
+        self.started = time.time()
+
+    def start(self):
+        threading.Thread(target=self._run, name=f"profile-{self.page}", daemon=True).start()
+
+    def _stack(self):
+        frame = sys._current_frames().get(self._thread_id)
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+            if code is self._page_code:
+                return ";".join(reversed(names))
+            frame = frame.f_back
+        return None
+
+    def _run(self):
+        deadline = self.started + self.max_s
+        while time.time() < deadline:
+            stack = self._stack()
+            if stack is None:
+                break
+            self.stacks[stack] += 1
+            time.sleep(self.interval)
+        try:
+            save(self)
+        except OSError:
+            pass
+
+
+def start_capture(page, page_frame):
+    """Profile the rerun now starting on this thread when DEBUG or `?profile=1` asks for it.
+
+    Costs one query-parameter lookup when neither is set.
+    """
+    import streamlit as st
+
+    requested = st.query_params.get(QUERY_PARAM) == "1"
+    if not (DEBUG or requested):
+        _local.capture = None
+        return None
+    if requested:
+        del st.query_params[QUERY_PARAM]
+    sampler = _local.capture = RerunSampler(page, page_frame)
+    sampler.start()
+    return sampler
+
+
+def annotate(**fields):
+    """Attach fields (e.g. the filter key) to the capture running on this thread, if any."""
+    capture = getattr(_local, "capture", None)
+    if capture is not None:
+        capture.meta.update(fields)
+
+
+def save(sampler):
+    """Write `<timestamp>_<page>_<filter hash>.folded` plus a `.json` with its metadata."""
+    folder = Path(PROFILE_DIR)
+    folder.mkdir(parents=True, exist_ok=True)
+    key = sampler.meta.get("filter_key")
+    stem = "_".join([
+        time.strftime("%Y%m%d-%H%M%S", time.localtime(sampler.started)),
+        re.sub(r"\W+", "-", sampler.page).strip("-").lower(),
+        hashlib.blake2b(repr(key).encode(), digest_size=4).hexdigest() if key is not None else "nofilter",
+    ])
+    (folder / f"{stem}.folded").write_text("".join(f"{stack} {n}\n" for stack, n in sampler.stacks.most_common()))
+    meta = {
+        "page": sampler.page, "filter_key": key, "started": sampler.started,
+        "duration_s": round(time.time() - sampler.started, 3), "interval_ms": sampler.interval * 1000,
+        "samples": sum(sampler.stacks.values()), **{k: v for k, v in sampler.meta.items() if k != "filter_key"},
+    }
+    (folder / f"{stem}.json").write_text(json.dumps(meta, indent=2))
+    rotate(folder)
+    return folder / f"{stem}.folded"
+
+
+def rotate(folder, keep=PROFILE_KEEP):
+    """Delete all but the newest `keep` captures in `folder`."""
+    for old in sorted(folder.glob("*.folded"))[:-keep or None]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".json").unlink(missing_ok=True)
+
+
+def captures(folder=PROFILE_DIR):
+    """Saved captures, newest first, as (path of the .folded file, metadata dict)."""
+    out = []
+    for path in sorted(Path(folder).glob("*.folded"), reverse=True):
+        try:
+            meta = json.loads(path.with_suffix(".json").read_text())
+        except (OSError, ValueError):
+            meta = {}
+        out.append((path, meta))
+    return out
@@ -1,22 +1,90 @@
+import sqlite3
+
 import pandas as pd
 from .db import get_conn
+from .metrics import timed
+from .single_flight import coalesced
 
+@timed
+@coalesced
 def kpis():
     q = "SELECT SUM(funding_musd) AS total_funding, AVG(valuation_busd) AS avg_valuation, AVG(success_score) AS avg_success FROM startups"
     return pd.read_sql(q, get_conn()).iloc[0].to_dict()
 
+@timed
+@coalesced
 def top_industries():
     q = "SELECT industry, SUM(funding_musd) AS total FROM startups GROUP BY industry ORDER BY total DESC LIMIT 10"
     return pd.read_sql(q, get_conn())
 
+@timed
+@coalesced
 def top_countries():
     q = "SELECT country, SUM(funding_musd) AS total FROM startups GROUP BY country ORDER BY total DESC LIMIT 10"
     return pd.read_sql(q, get_conn())
 
+@timed
+@coalesced
 def funding_vs_valuation():
     q = "SELECT funding_musd, valuation_busd, industry FROM startups WHERE funding_musd IS NOT NULL AND valuation_busd IS NOT NULL"
     return pd.read_sql(q, get_conn())
 
+@timed
+def data_version():
+    row = get_conn().execute("SELECT value FROM metadata WHERE key = 'last_updated'").fetchone()
+    return row[0] if row else None
+
+def filter_clause(key):
+    """SQL condition and parameters selecting the rows of a sidebar filter key."""
+    countries, industries, (y0, y1) = key
+    where = (f"country IN ({', '.join('?' * len(countries))}) "
+             f"AND industry IN ({', '.join('?' * len(industries))}) "
+             "AND founded_year BETWEEN ? AND ?")
+    return where, [*countries, *industries, y0, y1]
+
+@timed
+def has_rows(key, conn=None):
+    """Whether filter `key` selects any startup: one indexed probe that stops at the first match."""
+    where, params = filter_clause(key)
+    return (conn or get_conn()).execute(f"SELECT 1 FROM startups WHERE {where} LIMIT 1", params).fetchone() is not None
+
+@timed
+@coalesced
+def exit_breakdown(key):
+    """Startup, acquisition and IPO counts per stage × industry × country × year for a filter key.
+
+    One grouped scan of the ETL-built `exit_cube`, with the sidebar filters
+    pushed into the WHERE clause so SQLite can use its filter index.
+    """
+    where, params = filter_clause(key)
+    q = f"""
+    SELECT funding_stage, industry, country, founded_year,
+           SUM(startups) AS startups, SUM(acquired) AS acquired, SUM(ipo) AS ipo
+    FROM exit_cube
+    WHERE {where}
+    GROUP BY funding_stage, industry, country, founded_year
+    """
+    return pd.read_sql(q, get_conn(), params=params)
+
+@timed
+@coalesced
+def group_aggregate(key, by, aggs, order_by=None, limit=None, conn=None):
+    """One row per `by` value with `{column: "SUM"/"AVG"/...}` aggregates of the startups in filter `key`.
+
+    Sorted descending by `order_by` and cut to `limit` rows when given. Pass
+    `conn` to run on another connection, e.g. a scheduler worker's.
+    """
+    where, params = filter_clause(key)
+    select = ", ".join(f"{fn}({col}) AS {col}" for col, fn in aggs.items())
+    q = f"SELECT {by}, {select} FROM startups WHERE {where} GROUP BY {by}"
+    if order_by:
+        q += f" ORDER BY {order_by} DESC"
+    if limit:
+        q += f" LIMIT {int(limit)}"
+    return pd.read_sql(q, conn or get_conn(), params=params)
+
+@timed
+@coalesced
 def acquisition_ipo_stats():
     q = """
     SELECT 
@@ -26,3 +94,31 @@ def acquisition_ipo_stats():
     FROM startups
     """
     return pd.read_sql(q, get_conn()).iloc[0].to_dict()
+
+@timed
+@coalesced
+def company_ranks(startup_id):
+    q = "SELECT * FROM startup_ranks WHERE startup_id = ?"
+    try:
+        rows = pd.read_sql(q, get_conn(), params=(startup_id,))
+    except (sqlite3.OperationalError, pd.errors.DatabaseError):
+        # Databases loaded before etl/build_ranks.py existed have no startup_ranks table.
+        return None
+    return rows.iloc[0] if not rows.empty else None
+
+@timed
+@coalesced
+def startups_by_id(startup_ids):
+    ids = list(startup_ids)
+    q = f"SELECT * FROM startups WHERE startup_id IN ({', '.join('?' * len(ids))})"
+    return pd.read_sql(q, get_conn(), params=ids)
+
+@timed
+@coalesced
+def metrics_since(ts):
+    q = "SELECT * FROM metrics WHERE ts >= ? ORDER BY ts"
+    try:
+        return pd.read_sql(q, get_conn(), params=(ts,))
+    except Exception:
+        # No span has been flushed yet, so the table does not exist.
+        return pd.DataFrame(columns=["ts", "rerun", "page", "span", "ms", "rows", "cache"])
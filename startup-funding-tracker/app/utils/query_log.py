@@ -0,0 +1,218 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from .config import DATA_VERSION_TTL_S, QUERY_LOG, QUERY_LOG_RECENT, QUERY_SCAN_ROWS
+
+log = logging.getLogger(__name__)
+
+# Per statement shape: calls, total/max ms, rows, last params, query plan and full-scan flags.
+SHAPES = {}
+# The most recent executions as (ts, shape, params, ms, rows), newest last.
+RECENT = deque(maxlen=QUERY_LOG_RECENT)
+_lock = threading.Lock()
+# Row counts per table, and the shapes already explained, for the dataset version in _version.
+_table_rows = {}
+_explained = set()
+_version = {"value": None, "checked": float("-inf")}
+# Records of cursors finished by the garbage collector, which must not take _lock;
+# deque.append is atomic, and the next `record` or `report` files them.
+_orphans = deque()
+
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_READ = re.compile(r"\s*(?:SELECT|WITH)\b", re.I)
+_SCAN = re.compile(r"\bSCAN (?:TABLE )?(\w+)\b(?! USING (?:COVERING )?INDEX)")
+
+
+def normalize(sql):
+    """Statement shape: whitespace collapsed, literals and `IN (?, ?, …)` lists folded to `?`."""
+    shape = _LITERAL.sub("?", " ".join(sql.split()))
+    return _IN_LIST.sub("IN (?…)", shape)
+
+
+class LoggedCursor(sqlite3.Cursor):
+    """Cursor that times each statement from `execute` until its rows are fetched or it closes."""
+
+    _pending = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        start = time.perf_counter()
+        cursor = super().execute(sql, parameters)
+        self._pending = [sql, parameters, time.perf_counter() - start, 0]
+        explain_once(self.connection, sql, parameters)
+        if self.description is None:
+            self._finish()
+        return cursor
+
+    def _fetched(self, rows, elapsed, done):
+        if self._pending is not None:
+            self._pending[2] += elapsed
+            self._pending[3] += rows
+            if done:
+                self._finish()
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(row is not None, time.perf_counter() - start, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(len(rows), time.perf_counter() - start, not rows)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(len(rows), time.perf_counter() - start, True)
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # `conn.execute(...).fetchone()` never exhausts or closes its cursor. The
+        # collector can run this while another frame of this thread holds _lock.
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, params, elapsed, rows = pending
+            _orphans.append((sql, params, elapsed * 1000, rows))
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, params, elapsed, rows = pending
+            record(sql, params, elapsed * 1000, rows)
+
+
+class LoggedConnection(sqlite3.Connection):
+    """sqlite3 connection whose statements are all recorded in SHAPES and RECENT."""
+
+    def cursor(self, factory=LoggedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+
+def connect(path, **kwargs):
+    """`sqlite3.connect`, logging queries unless QUERY_LOG is off."""
+    if QUERY_LOG:
+        kwargs.setdefault("factory", LoggedConnection)
+    return sqlite3.connect(path, **kwargs)
+
+
+def record(sql, params, ms, rows):
+    """Add one finished execution to SHAPES and RECENT."""
+    _file_orphans()
+    _add(sql, params, ms, rows)
+
+
+def _stats(shape):
+    # Caller holds _lock.
+    stats = SHAPES.get(shape)
+    if stats is None:
+        stats = SHAPES[shape] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                                 "plan": None, "full_scans": []}
+    return stats
+
+
+def _add(sql, params, ms, rows):
+    shape = normalize(sql)
+    with _lock:
+        RECENT.append((time.time(), shape, tuple(params), ms, rows))
+        stats = _stats(shape)
+        stats["calls"] += 1
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+        stats["rows"] += rows
+        stats["params"] = tuple(params)
+
+
+def _file_orphans():
+    while _orphans:
+        try:
+            sql, params, ms, rows = _orphans.popleft()
+        except IndexError:
+            return
+        _add(sql, params, ms, rows)
+
+
+def explain_once(conn, sql, params):
+    """`explain` a read statement the first time its shape runs against the current dataset version."""
+    if not _READ.match(sql):
+        return
+    _check_version(conn)
+    shape = normalize(sql)
+    with _lock:
+        if shape in _explained:
+            return
+        _explained.add(shape)
+    explain(conn, shape, sql, params)
+
+
+def _check_version(conn):
+    """Re-read metadata `last_updated` at most every DATA_VERSION_TTL_S; a new version
+    forgets the explained shapes and table sizes, so plans and full-scan flags are redone."""
+    now = time.monotonic()
+    with _lock:
+        if now - _version["checked"] < DATA_VERSION_TTL_S:
+            return
+        _version["checked"] = now
+    try:
+        row = sqlite3.Cursor(conn).execute("SELECT value FROM metadata WHERE key = 'last_updated'").fetchone()
+    except sqlite3.Error:
+        row = None
+    version = row[0] if row else None
+    with _lock:
+        if version != _version["value"]:
+            _version["value"] = version
+            _explained.clear()
+            _table_rows.clear()
+
+
+def explain(conn, shape, sql, params):
+    """Store the statement's `EXPLAIN QUERY PLAN` and flag full scans of tables of QUERY_SCAN_ROWS or more."""
+    try:
+        cursor = sqlite3.Cursor(conn)
+        plan = [row[-1] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+        scans = [table for line in plan for table in _SCAN.findall(line)
+                 if _row_count(cursor, table) >= QUERY_SCAN_ROWS]
+    except sqlite3.Error:
+        return
+    with _lock:
+        stats = _stats(shape)
+        stats["plan"] = plan
+        stats["full_scans"] = scans
+    if scans:
+        log.warning("Full scan of %s (>= %d rows) in: %s", ", ".join(scans), QUERY_SCAN_ROWS, shape)
+
+
+def _row_count(cursor, table):
+    """Rows in `table`, counted once per dataset version (see `_check_version`)."""
+    with _lock:
+        if table in _table_rows:
+            return _table_rows[table]
+    try:
+        rows = cursor.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+    except sqlite3.Error:
+        rows = 0
+    with _lock:
+        _table_rows[table] = rows
+    return rows
+
+
+def report():
+    """Statement shapes ranked by total time, as dicts with the shape text and its stats."""
+    _file_orphans()
+    with _lock:
+        rows = [{"shape": shape, **stats} for shape, stats in SHAPES.items()]
+    return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
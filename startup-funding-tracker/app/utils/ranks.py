@@ -0,0 +1,26 @@
+import pandas as pd
+
+# Metrics ranked per startup at ETL time, and the peer groups they are ranked in.
+RANK_METRICS = ["funding_musd", "valuation_busd", "revenue_musd", "success_score", "customers_mil", "employees"]
+RANK_SCOPES = {"industry": "industry", "country": "country", "global": None}
+
+
+def rank_column(metric, scope):
+    return f"{metric}__{scope}_pct"
+
+
+def build_ranks(df, metrics=RANK_METRICS):
+    """Percentile rank of every startup's metrics within its industry, its country and overall.
+
+    A rank is the share of peers whose value is at or below the startup's,
+    so the top company scores 1.0. Missing values stay missing.
+    """
+    ranks = {"startup_id": df["startup_id"]}
+    for scope, by in RANK_SCOPES.items():
+        values = df[metrics] if by is None else df.groupby(by)[metrics]
+        ranked = values.rank(method="max", pct=True)
+        for m in metrics:
+            ranks[rank_column(m, scope)] = ranked[m]
+    ranks["industry_peers"] = df.groupby("industry")["startup_id"].transform("size")
+    ranks["country_peers"] = df.groupby("country")["startup_id"].transform("size")
+    return pd.DataFrame(ranks)
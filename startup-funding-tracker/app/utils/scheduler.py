@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+from .config import QUERY_WORKERS
+from .db import DB_PATH
+from .metrics import adopt_rerun, current_rerun
+from .query_log import connect
+
+_local = threading.local()
+_pool = {"executor": None}
+_lock = threading.Lock()
+
+
+def read_conn():
+    """This thread's read-only connection to the dashboard database, opened on first use.
+
+    sqlite3 releases the GIL while a statement runs, so jobs on separate
+    connections overlap their query time.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = connect(f"file:{DB_PATH}?mode=ro", uri=True)
+    return conn
+
+
+def _executor():
+    with _lock:
+        if _pool["executor"] is None:
+            _pool["executor"] = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="query")
+        return _pool["executor"]
+
+
+def run_batch(jobs):
+    """Run independent jobs at the same time and return their results under the same names.
+
+    `jobs` maps a name to a callable taking a read-only sqlite3 connection.
+    Jobs should spend their time in SQLite or GIL-releasing NumPy kernels;
+    the batch then takes about as long as its slowest job rather than their
+    sum. Spans recorded by jobs count towards the caller's rerun. As soon as
+    a job fails, jobs that have not started are cancelled and the first
+    failure (in `jobs` order) is raised; jobs already running finish in the
+    background and their results are dropped.
+    """
+    rerun = current_rerun()
+
+    def run(job):
+        adopt_rerun(rerun)
+        return job(read_conn())
+
+    futures = {name: _executor().submit(run, job) for name, job in jobs.items()}
+    done, pending = wait(futures.values(), return_when=FIRST_EXCEPTION)
+    for future in pending:
+        future.cancel()
+    errors = [f.exception() for f in futures.values() if f in done and f.exception() is not None]
+    if errors:
+        raise errors[0]
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,105 @@
+import functools
+import threading
+from collections import Counter
+
+from .config import SINGLE_FLIGHT_TIMEOUT_S
+from .figure_cache import fingerprint
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.owner = threading.get_ident()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one computation.
+
+    The first caller of a key (the leader) runs the function; callers that
+    arrive while it is running wait up to `timeout` seconds for it and get
+    the same result, or the same exception. A waiter that times out raises
+    TimeoutError, while the leader keeps going. A key is forgotten as soon
+    as its call finishes, so results are never cached here.
+    """
+
+    def __init__(self, timeout=SINGLE_FLIGHT_TIMEOUT_S):
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = self.coalesced = self.timeouts = self.errors = 0
+        self.coalesced_by_name = Counter()
+
+    def do(self, key, fn, name=None, timeout=None):
+        """`fn()` computed once for every concurrent caller with `key`.
+
+        Returns `(result, shared)`, where `shared` is True for callers that
+        waited on another caller's computation.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                role = "leader"
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            elif call.owner == threading.get_ident():
+                # Re-entrant call from the leader's own thread: waiting would deadlock.
+                role = "reentrant"
+            else:
+                role = "waiter"
+                self.coalesced += 1
+                self.coalesced_by_name[name] += 1
+        if role == "waiter":
+            return self._wait(call, name, self.timeout if timeout is None else timeout), True
+        if role == "reentrant":
+            return fn(), False
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def _wait(self, call, name, timeout):
+        if not call.done.wait(timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"Gave up after {timeout}s waiting for the in-flight {name or 'call'}")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced,
+                    "timeouts": self.timeouts, "errors": self.errors,
+                    "coalesced_by_name": dict(self.coalesced_by_name)}
+
+
+# Shared by every coalesced loader and query in the process.
+FLIGHTS = SingleFlight()
+
+
+def coalesced(fn):
+    """Share one in-flight call of `fn` among concurrent callers passing equal arguments.
+
+    A `conn` keyword argument is left out of the key, so callers on
+    different connections still share. Waiters receive a copy of frame
+    results, since query results are not treated as read-only the way
+    cached values are.
+    """
+    label = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = fingerprint((label, args, {k: v for k, v in kwargs.items() if k != "conn"}))
+        result, shared = FLIGHTS.do(key, lambda: fn(*args, **kwargs), name=label)
+        return result.copy() if shared and hasattr(result, "copy") else result
+    return wrapper
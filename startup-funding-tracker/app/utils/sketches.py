@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from .partials import PARTITION_KEYS
+
+# Metrics that get a quantile sketch per partition at ETL time.
+SKETCH_METRICS = ["funding_musd", "valuation_busd"]
+# Selections up to this many rows are answered exactly from the rows themselves.
+EXACT_MAX_ROWS = 20_000
+DEFAULT_K = 200
+
+
+class KLLSketch:
+    """Mergeable KLL quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Error bound: with k = 200 a quantile query for rank q returns a value whose
+    true normalized rank lies within q ± 1.7% with 99% confidence, regardless
+    of how many values were added or how many sketches were merged. Memory is
+    O(k log(n / k)) values. Sketches that never compacted (fewer than ~k
+    values) are exact.
+    """
+
+    def __init__(self, k=DEFAULT_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, h):
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - h - 1))))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) <= self._capacity(h):
+                h += 1
+                continue
+            grew = h + 1 == len(self.levels)
+            if grew:
+                self.levels.append(np.empty(0))
+            level = np.sort(level)
+            # An odd item stays behind so total weight is preserved exactly.
+            held, level = level[:len(level) % 2], level[len(level) % 2:]
+            promoted = level[self._rng.integers(2)::2]
+            self.levels[h] = held
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            # A new top level shrinks every lower level's capacity, so recheck from the bottom.
+            h = 0 if grew else h + 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self._compress()
+        return self
+
+    def merge(self, *others):
+        depth = max([len(self.levels)] + [len(other.levels) for other in others])
+        pieces = [[level] for level in self.levels] + [[] for _ in range(depth - len(self.levels))]
+        for other in others:
+            for h, level in enumerate(other.levels):
+                pieces[h].append(level)
+            self.n += other.n
+        self.levels = [np.concatenate(parts) for parts in pieces]
+        self._compress()
+        return self
+
+    @classmethod
+    def merged(cls, sketches, k=DEFAULT_K):
+        return cls(k).merge(*sketches)
+
+    def quantiles(self, qs):
+        values = np.concatenate(self.levels)
+        if not len(values):
+            return np.full(len(qs), np.nan)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, cum = values[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, np.asarray(qs) * cum[-1], side="left")
+        return values[np.minimum(idx, len(values) - 1)]
+
+    def to_bytes(self):
+        header = np.array([self.k, self.n, len(self.levels)] + [len(level) for level in self.levels], dtype=np.int64)
+        return header.tobytes() + np.concatenate(self.levels).tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob):
+        k, n, depth = np.frombuffer(blob, dtype=np.int64, count=3)
+        sizes = np.frombuffer(blob, dtype=np.int64, count=depth, offset=24)
+        values = np.frombuffer(blob, dtype=np.float64, offset=8 * (3 + depth))
+        sketch = cls(int(k))
+        sketch.n = int(n)
+        sketch.levels = np.split(values.copy(), np.cumsum(sizes)[:-1])
+        return sketch
+
+
+def build_partition_sketches(df, metrics=SKETCH_METRICS, k=DEFAULT_K):
+    """One serialized sketch per partition and metric, ready for `to_sql`."""
+    keyed = df.dropna(subset=PARTITION_KEYS)
+    rows = []
+    for keys, group in keyed.groupby(PARTITION_KEYS, sort=True):
+        for m in metrics:
+            sketch = KLLSketch(k).update(group[m].to_numpy())
+            rows.append((*keys, m, sketch.n, sketch.to_bytes()))
+    return pd.DataFrame(rows, columns=PARTITION_KEYS + ["metric", "n", "sketch"])
+
+
+def load_sketch_table(frame):
+    """Deserialize a `partition_sketches` table into {metric: partition frame}."""
+    tables = {}
+    for m, part in frame.groupby("metric", sort=False):
+        part = part.drop(columns="metric").reset_index(drop=True)
+        part["sketch"] = [KLLSketch.from_bytes(blob) for blob in part["sketch"]]
+        tables[m] = part
+    return tables
+
+
+def merged_quantiles(table, qs, mask=None):
+    """Quantiles of the selected partitions, answered by merging their sketches."""
+    sketches = table["sketch"] if mask is None else table["sketch"][mask]
+    return KLLSketch.merged(sketches).quantiles(qs)
+
+
+def grouped_quantiles(table, by, qs, mask=None):
+    """Per-group quantiles (columns p<q>) from merged partition sketches."""
+    sel = table if mask is None else table[mask]
+    out = {
+        name: merged_quantiles(group, qs)
+        for name, group in sel.groupby(by, sort=True)
+    }
+    return pd.DataFrame.from_dict(out, orient="index", columns=[f"p{round(q * 100)}" for q in qs]).rename_axis(by)
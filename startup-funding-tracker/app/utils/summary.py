@@ -0,0 +1,30 @@
+import sqlite3
+
+from .db import get_conn
+
+# kpi_summary column → KPI card label, in display order.
+HEADLINE_KPIS = {
+    "startups": "Total Startups",
+    "total_funding_musd": "Total Funding ($M)",
+    "avg_valuation_busd": "Avg Valuation ($B)",
+    "avg_success_score": "Avg Success Score",
+    "ipo_pct": "IPO %",
+    "acquired_pct": "Acquired %",
+    "top_country": "Top Country",
+    "top_industry": "Top Industry",
+}
+
+
+def headline_kpis():
+    """Whole-dataset headline KPIs from the one-row `kpi_summary` table, or None.
+
+    Deliberately free of pandas/numpy so Home.py can paint these before the
+    heavy imports and the full `load_data`. None when the database predates
+    the summary step of etl/load_to_sqlite.py.
+    """
+    try:
+        cur = get_conn().execute(f"SELECT {', '.join(HEADLINE_KPIS)} FROM kpi_summary")
+        row = cur.fetchone()
+    except sqlite3.Error:
+        return None
+    return dict(zip(HEADLINE_KPIS.values(), row)) if row else None
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from .partials import METRICS
+
+
+def _prefix(cube):
+    """Cumulative sum along the year axis with a leading zero slice."""
+    zero = np.zeros(cube.shape[:2] + (1,) + cube.shape[3:], dtype=cube.dtype)
+    return np.concatenate([zero, np.cumsum(cube, axis=2)], axis=2)
+
+
+class YearIndex:
+    """Prefix sums over founded_year for every country × industry cell.
+
+    `rows[c, i, t]`, `counts[c, i, t, m]` and `sums[c, i, t, m]` total the
+    rows of cell (c, i) founded before `years[t]`, so the totals of any
+    [y0, y1] range are two lookups per selected cell however many rows the
+    dataset has. Build it once from the unfiltered frame.
+    """
+
+    def __init__(self, df, metrics=METRICS):
+        keyed = df.dropna(subset=["country", "industry", "founded_year"])
+        country, self.countries = pd.factorize(keyed["country"], sort=True)
+        industry, self.industries = pd.factorize(keyed["industry"], sort=True)
+        year = keyed["founded_year"].to_numpy().astype(np.int64)
+        self.metrics = list(metrics)
+        self.first = int(year.min())
+        self.years = np.arange(self.first, int(year.max()) + 1)
+
+        shape = (len(self.countries), len(self.industries), len(self.years))
+        cell = np.ravel_multi_index((country, industry, year - self.first), shape)
+        size = int(np.prod(shape))
+        counts, sums = [], []
+        for m in self.metrics:
+            values = keyed[m].to_numpy(dtype=np.float64)
+            present = ~np.isnan(values)
+            counts.append(np.bincount(cell[present], minlength=size))
+            sums.append(np.bincount(cell[present], weights=values[present], minlength=size))
+        self.rows = _prefix(np.bincount(cell, minlength=size).reshape(shape))
+        self.counts = _prefix(np.stack(counts, axis=-1).reshape(shape + (len(self.metrics),)))
+        self.sums = _prefix(np.stack(sums, axis=-1).reshape(shape + (len(self.metrics),)))
+
+    def _selection(self, key):
+        countries, industries, (y0, y1) = key
+        ci = self.countries.get_indexer(list(countries))
+        ii = self.industries.get_indexer(list(industries))
+        lo = int(np.clip(y0 - self.first, 0, len(self.years)))
+        hi = int(np.clip(y1 - self.first + 1, lo, len(self.years)))
+        return ci[ci >= 0], ii[ii >= 0], lo, hi
+
+    def _slices(self, prefix, key, years):
+        ci, ii, _, _ = self._selection(key)
+        return prefix[np.ix_(ci, ii, years)].sum(axis=(0, 1))
+
+    def totals(self, key):
+        """Row count plus per-metric non-null count and sum over a `filters.filter_key` selection."""
+        _, _, lo, hi = self._selection(key)
+        rows, counts, sums = (np.diff(self._slices(p, key, [lo, hi]), axis=0)[0] for p in (self.rows, self.counts, self.sums))
+        return {
+            "rows": int(rows),
+            "count": dict(zip(self.metrics, counts.astype(np.int64).tolist())),
+            "sum": dict(zip(self.metrics, sums.tolist())),
+        }
+
+    def yearly(self, key, aggs):
+        """`df.groupby("founded_year").agg(aggs)` for a {metric: sum|count|mean} mapping.
+
+        Only years with at least one selected row are returned, as a groupby would.
+        """
+        _, _, lo, hi = self._selection(key)
+        span = list(range(lo, hi + 1))
+        rows = np.diff(self._slices(self.rows, key, span))
+        counts = np.diff(self._slices(self.counts, key, span), axis=0)
+        sums = np.diff(self._slices(self.sums, key, span), axis=0)
+        out = {}
+        for m, stat in aggs.items():
+            j = self.metrics.index(m)
+            if stat == "sum":
+                out[m] = sums[:, j]
+            elif stat == "count":
+                out[m] = counts[:, j]
+            elif stat == "mean":
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    out[m] = np.where(counts[:, j] > 0, sums[:, j] / counts[:, j], np.nan)
+            else:
+                raise ValueError(f"Unsupported stat: {stat}")
+        frame = pd.DataFrame(out, index=pd.Index(self.years[lo:hi], name="founded_year"))
+        return frame[rows > 0]
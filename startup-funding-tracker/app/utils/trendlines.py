@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+
+def group_moments(moments, x, y, by, mask=None):
+    """Per-group n, means and centered (co)moments of `x`/`y` from partition co-moments.
+
+    `moments` is the output of `partials.build_comoments`; cells are merged
+    into `by` groups in one vectorized pass, so no raw rows are read.
+    """
+    keys, cols = moments["keys"], moments["cols"]
+    i, j = cols.index(x), cols.index(y)
+    n, sums, co = moments["n"], moments["sums"][:, [i, j]], moments["comoments"][:, [i, j]][:, :, [i, j]]
+    if mask is not None:
+        keys, n, sums, co = keys[mask], n[mask], sums[mask], co[mask]
+    groups, labels = pd.factorize(keys[by], sort=True)
+    size = len(labels)
+    gn = np.bincount(groups, weights=n, minlength=size)
+    gmean = np.column_stack([np.bincount(groups, weights=sums[:, k], minlength=size) for k in range(2)]) / gn[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spread = sums / n[:, None] - gmean[groups]
+    spread = np.nan_to_num(spread)
+    sxx = np.bincount(groups, weights=co[:, 0, 0] + n * spread[:, 0] ** 2, minlength=size)
+    sxy = np.bincount(groups, weights=co[:, 0, 1] + n * spread[:, 0] * spread[:, 1], minlength=size)
+    syy = np.bincount(groups, weights=co[:, 1, 1] + n * spread[:, 1] ** 2, minlength=size)
+    return pd.DataFrame(
+        {"n": gn, "x_mean": gmean[:, 0], "y_mean": gmean[:, 1], "sxx": sxx, "sxy": sxy, "syy": syy},
+        index=pd.Index(labels, name=by),
+    )
+
+
+def fit_lines(stats):
+    """Ordinary least-squares slope, intercept and R² for every row of `group_moments`."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.where(stats["sxx"] > 0, stats["sxy"] / stats["sxx"], 0.0)
+        r2 = np.where((stats["sxx"] > 0) & (stats["syy"] > 0), stats["sxy"] ** 2 / (stats["sxx"] * stats["syy"]), np.nan)
+    return stats.assign(slope=slope, intercept=stats["y_mean"] - slope * stats["x_mean"], r2=r2)
+
+
+def trendline_segments(fits, x_min, x_max):
+    """Two-point line segments spanning each group's x range, ready to plot."""
+    lo, hi = x_min.reindex(fits.index), x_max.reindex(fits.index)
+    return fits.assign(
+        x0=lo, x1=hi,
+        y0=fits["intercept"] + fits["slope"] * lo,
+        y1=fits["intercept"] + fits["slope"] * hi,
+    )
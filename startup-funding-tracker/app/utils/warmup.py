@@ -0,0 +1,112 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import WARMUP_FILTERS, WARMUP_WORKERS
+
+log = logging.getLogger(__name__)
+
+# Selections precomputed besides each page's default view. Entries follow the
+# WARMUP_FILTERS file format: "countries"/"industries" are lists of names or
+# "all", "years" is [from, to] or "all"; anything left out means "all".
+POPULAR_FILTERS = [
+    {},
+    {"countries": ["USA"]},
+    {"countries": ["India"]},
+    {"industries": ["AI"]},
+    {"industries": ["FinTech"]},
+]
+
+_started = {"done": False}
+_lock = threading.Lock()
+
+
+def popular_filters():
+    """POPULAR_FILTERS, or the list read from the WARMUP_FILTERS JSON file when it is set."""
+    if not WARMUP_FILTERS:
+        return POPULAR_FILTERS
+    try:
+        with open(WARMUP_FILTERS) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        log.warning("Could not read WARMUP_FILTERS file %s; using the built-in list", WARMUP_FILTERS)
+        return POPULAR_FILTERS
+
+
+def warm_keys(df, filters=None):
+    """Filter keys of the default sidebar selection plus every entry of `filters`."""
+    from .filters import default_selection, filter_key, filter_options
+
+    countries, industries, years = filter_options(df)
+    keys = [filter_key(*default_selection(countries, industries, years))]
+    for spec in popular_filters() if filters is None else filters:
+        chosen_countries = spec.get("countries", "all")
+        chosen_industries = spec.get("industries", "all")
+        chosen_years = spec.get("years", "all")
+        key = filter_key(
+            countries if chosen_countries == "all" else [c for c in chosen_countries if c in countries],
+            industries if chosen_industries == "all" else [i for i in chosen_industries if i in industries],
+            (min(years), max(years)) if chosen_years == "all" else chosen_years,
+        )
+        if key[0] and key[1] and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def warm_shared():
+    """Load the whole-dataset structures every page builds on."""
+    from . import cache
+
+    df = cache.load_data()
+    for build in (cache.dimension_codes, cache.partition_table, cache.year_index, cache.comoment_table,
+                  cache.country_codes, cache.sketch_tables, cache.cached_industry_data, cache.cached_country_data):
+        build()
+    return df
+
+
+def warm_key(df, key):
+    """Compute every page's cached per-selection results (`cache.PAGE_LOADERS`) for `key`."""
+    from . import cache
+    from .filters import filter_frame
+
+    rows = filter_frame(df, key)
+    for load in cache.PAGE_LOADERS.values():
+        load(key, rows)
+
+
+def warm_up(filters=None, workers=WARMUP_WORKERS):
+    """Precompute shared structures, then every warm-up selection on a thread pool.
+
+    Results land in DATA_CACHE and RESULT_CACHE, so a later request for the
+    same selection (in this process or, via the disk tier, any other) is a
+    hit. A selection that fails is logged and skipped. Returns the number of
+    selections warmed.
+    """
+    df = warm_shared()
+    keys = warm_keys(df, filters)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="warmup") as pool:
+        futures = {pool.submit(warm_key, df, key): key for key in keys}
+    warmed = 0
+    for future, key in futures.items():
+        if future.exception() is None:
+            warmed += 1
+        else:
+            log.warning("Warm-up failed for %s: %r", key, future.exception())
+    return warmed
+
+
+def start_warmup():
+    """Run `warm_up` once per process on a daemon thread and return immediately."""
+    with _lock:
+        if _started["done"]:
+            return
+        _started["done"] = True
+
+    def run():
+        try:
+            warm_up()
+        except Exception:
+            log.exception("Cache warm-up failed")
+
+    threading.Thread(target=run, name="cache-warmup", daemon=True).start()
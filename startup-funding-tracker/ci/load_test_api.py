@@ -0,0 +1,77 @@
+"""Load test for a local app/api_server.py instance.
+
+    python ci/load_test_api.py --url http://127.0.0.1:8502 --concurrency 20 --duration 10 \
+        --path /kpis --path "/industries?industry=all" [--revalidate]
+
+Each of `concurrency` keep-alive connections sends requests back to back,
+cycling through the paths, for `duration` seconds. With --revalidate,
+requests repeat the ETag of the path's last response in If-None-Match,
+the way a polling client would. Prints requests per second, latency
+percentiles and the count of each status code.
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+async def client(host, port, paths, deadline, revalidate, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        for path in itertools.cycle(paths):
+            if time.perf_counter() >= deadline:
+                break
+            lines = [f"GET {path} HTTP/1.1", f"Host: {host}:{port}"]
+            if revalidate and path in etags:
+                lines.append(f"If-None-Match: {etags[path]}")
+            start = time.perf_counter()
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            await reader.readexactly(int(headers.get("content-length", 0)))
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+            if "etag" in headers:
+                etags[path] = headers["etag"]
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def main(args):
+    url = urlsplit(args.url)
+    paths = args.path or ["/kpis"]
+    latencies, statuses = [], Counter()
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(client(url.hostname, url.port or 80, paths, deadline, args.revalidate, latencies, statuses)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    if not latencies:
+        print("No responses received.")
+        return
+    ms = sorted(x * 1000 for x in latencies)
+    print(f"{len(ms)} requests in {elapsed:.1f}s over {args.concurrency} connections: {len(ms) / elapsed:.1f} req/s")
+    print(f"latency ms  mean {statistics.fmean(ms):.1f}  p50 {percentile(ms, 0.5):.1f}  p95 {percentile(ms, 0.95):.1f}  "
+          f"p99 {percentile(ms, 0.99):.1f}  max {ms[-1]:.1f}")
+    print("status", dict(sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8502")
+    parser.add_argument("--path", action="append", help="request path with query string; repeat to cycle through several")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--revalidate", action="store_true", help="send If-None-Match with the last ETag seen")
+    asyncio.run(main(parser.parse_args()))
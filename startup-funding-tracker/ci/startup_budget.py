@@ -0,0 +1,115 @@
+"""Cold-start budget for the dashboard's first paint.
+
+Run from the project root: `python ci/startup_budget.py [--profile]`. The
+same check runs in the test suite (tests/test_startup_budget.py).
+
+Home.py paints its headline KPI cards after importing only
+FIRST_PAINT_MODULES and reading `kpi_summary`, then imports pandas and
+Plotly and loads the dataset synchronously in the same run. This script
+runs the real Home.py through `streamlit.testing.v1.AppTest` in fresh
+interpreters, stops it at the first KPI card, and fails (exit 1) if
+
+* any of HEAVY_MODULES was imported by then, or
+* the best of RUNS cold starts to that card exceeds STARTUP_BUDGET_S seconds.
+
+Only Home.py has this first-paint path: the other pages import pandas and
+Plotly at module top.
+
+`--profile` also prints the slowest imports of the first paint and of the
+full Home.py import set, from `python -X importtime`.
+"""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+APP = ROOT / "app"
+
+FIRST_PAINT_MODULES = ["streamlit", "utils.summary", "utils.metrics"]
+FULL_MODULES = FIRST_PAINT_MODULES + ["utils.filters", "utils.kpis", "utils.cache", "utils.partials", "utils.charts"]
+HEAVY_MODULES = ["pandas", "plotly.express", "sklearn", "scipy"]
+STARTUP_BUDGET_S = float(os.getenv("STARTUP_BUDGET_S", "1.5"))
+RUNS = 3
+
+# Runs Home.py until its first KPI card is sent, then prints the heavy modules imported by that point.
+FIRST_PAINT = f"""
+import sys
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+painted = []
+_markdown = streamlit.markdown
+
+def markdown(body, *args, **kwargs):
+    out = _markdown(body, *args, **kwargs)
+    if 'class="kpi-value"' in body and not painted:
+        painted.append([m for m in {HEAVY_MODULES!r} if m in sys.modules])
+        streamlit.stop()
+    return out
+
+streamlit.markdown = markdown
+app = AppTest.from_file("app/Home.py", default_timeout=60).run()
+if app.exception or not painted:
+    sys.exit(f"Home.py painted no KPI card: {{[e.message for e in app.exception]}}")
+print(",".join(painted[0]))
+"""
+
+
+def run(code, *flags):
+    env = dict(os.environ, PYTHONPATH=str(APP))
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def import_profile(modules, top=15):
+    """(cumulative µs, module) of the `top` slowest imports of `modules` in a fresh interpreter."""
+    stderr = run("; ".join(f"import {m}" for m in modules), "-X", "importtime").stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        rows.append((int(cumulative), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def measure(runs=RUNS):
+    """(best cold-start seconds to Home.py's first KPI card of `runs`, heavy modules imported by then)."""
+    timings, heavy = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        heavy = [m for m in run(FIRST_PAINT).stdout.strip().split(",") if m]
+        timings.append(time.perf_counter() - start)
+    return min(timings), heavy
+
+
+def failures(best, heavy, budget=STARTUP_BUDGET_S):
+    out = []
+    if heavy:
+        out.append(f"first paint imports heavy modules: {', '.join(heavy)}")
+    if best > budget:
+        out.append(f"cold start {best:.2f}s is over the {budget:.2f}s budget")
+    return out
+
+
+def main():
+    if "--profile" in sys.argv:
+        for label, modules in (("First paint", FIRST_PAINT_MODULES), ("Full Home.py", FULL_MODULES)):
+            print(f"{label} imports (cumulative ms):")
+            for micros, name in import_profile(modules):
+                print(f"  {micros / 1000:8.1f}  {name}")
+
+    best, heavy = measure()
+    print(f"First paint cold start: best {best:.2f}s of {RUNS} (budget {STARTUP_BUDGET_S:.2f}s)")
+    failures_found = failures(best, heavy)
+    for failure in failures_found:
+        print(f"❌ {failure}")
+    if failures_found:
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
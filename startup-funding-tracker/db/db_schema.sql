@@ -14,7 +14,59 @@ CREATE TABLE IF NOT EXISTS startups (
     ipo INTEGER,
     customers_mil REAL,
     tech_stack TEXT,
-    followers REAL
+    followers REAL,
+    iso3 TEXT
 );
 CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
 CREATE TABLE IF NOT EXISTS analytics (day DATE PRIMARY KEY, visits INTEGER DEFAULT 0);
+CREATE TABLE IF NOT EXISTS metrics (ts REAL, rerun TEXT, page TEXT, span TEXT, ms REAL, rows INTEGER, cache TEXT);
+CREATE TABLE IF NOT EXISTS partition_sketches (
+    country TEXT,
+    industry TEXT,
+    founded_year INTEGER,
+    metric TEXT,
+    n INTEGER,
+    sketch BLOB
+);
+CREATE TABLE IF NOT EXISTS startup_ranks (
+    startup_id TEXT PRIMARY KEY,
+    funding_musd__industry_pct REAL,
+    valuation_busd__industry_pct REAL,
+    revenue_musd__industry_pct REAL,
+    success_score__industry_pct REAL,
+    customers_mil__industry_pct REAL,
+    employees__industry_pct REAL,
+    funding_musd__country_pct REAL,
+    valuation_busd__country_pct REAL,
+    revenue_musd__country_pct REAL,
+    success_score__country_pct REAL,
+    customers_mil__country_pct REAL,
+    employees__country_pct REAL,
+    funding_musd__global_pct REAL,
+    valuation_busd__global_pct REAL,
+    revenue_musd__global_pct REAL,
+    success_score__global_pct REAL,
+    customers_mil__global_pct REAL,
+    employees__global_pct REAL,
+    industry_peers INTEGER,
+    country_peers INTEGER
+);
+CREATE TABLE IF NOT EXISTS exit_cube (
+    country TEXT,
+    industry TEXT,
+    founded_year INTEGER,
+    funding_stage TEXT,
+    startups INTEGER,
+    acquired INTEGER,
+    ipo INTEGER
+);
+CREATE TABLE IF NOT EXISTS kpi_summary (
+    startups INTEGER,
+    total_funding_musd REAL,
+    avg_valuation_busd REAL,
+    ipo_pct REAL,
+    acquired_pct REAL,
+    avg_success_score REAL,
+    top_country TEXT,
+    top_industry TEXT
+);
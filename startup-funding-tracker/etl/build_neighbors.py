@@ -0,0 +1,18 @@
+import sqlite3
+import sys
+import pandas as pd
+from pathlib import Path
+
+# Reuse the dashboard's index class so ETL and app agree on the file format.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from utils.neighbors import INDEX_PATH, NeighborIndex
+
+DB = Path("db/funding.db")
+
+con = sqlite3.connect(DB)
+df = pd.read_sql("SELECT * FROM startups", con)
+con.close()
+
+index = NeighborIndex.build(df)
+index.save(INDEX_PATH)
+print(f"✅ Indexed {len(df)} startups for similarity search in {INDEX_PATH}")
@@ -0,0 +1,21 @@
+import sqlite3
+import sys
+import pandas as pd
+from pathlib import Path
+
+# Reuse the dashboard's rank definitions so ETL and app agree on column names.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from utils.ranks import build_ranks
+
+DB = Path("db/funding.db")
+
+con = sqlite3.connect(DB)
+df = pd.read_sql("SELECT * FROM startups", con)
+
+ranks = build_ranks(df)
+ranks.to_sql("startup_ranks", con, if_exists="replace", index=False)
+con.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_startup_ranks_id ON startup_ranks(startup_id)")
+
+con.commit()
+con.close()
+print(f"✅ Ranked {len(ranks)} startups against their industry, country and global peers in db/funding.db")
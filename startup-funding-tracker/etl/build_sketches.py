@@ -0,0 +1,21 @@
+import sqlite3
+import sys
+import pandas as pd
+from pathlib import Path
+
+# Reuse the dashboard's sketch implementation so ETL and app agree on the format.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from utils.sketches import build_partition_sketches
+
+DB = Path("db/funding.db")
+
+con = sqlite3.connect(DB)
+df = pd.read_sql("SELECT * FROM startups", con)
+
+sketches = build_partition_sketches(df)
+sketches.to_sql("partition_sketches", con, if_exists="replace", index=False)
+con.execute("CREATE INDEX IF NOT EXISTS idx_partition_sketches_metric ON partition_sketches(metric)")
+
+con.commit()
+con.close()
+print(f"✅ Built {len(sketches)} partition quantile sketches in db/funding.db")
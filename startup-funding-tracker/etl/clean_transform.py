@@ -1,7 +1,12 @@
+import sys
 import pandas as pd
 from pathlib import Path
 import uuid
 
+# Shared with the dashboard, which falls back to it for databases without the iso3 column.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+from utils.geo import iso3_codes
+
 RAW = Path("data/raw")
 INTERIM = Path("data/interim")
 INTERIM.mkdir(parents=True, exist_ok=True)
@@ -40,6 +45,16 @@ df["startup_id"] = [
     str(uuid.uuid5(uuid.NAMESPACE_DNS, str(name) + str(country)))
     for name, country in zip(df["name"], df["country"])
 ]
+# startup_id is the table's key (a unique index in load_to_sqlite.py): one row per name and country.
+duplicates = df["startup_id"].duplicated()
+if duplicates.any():
+    print(f"⚠️ Dropped {duplicates.sum()} rows repeating a name and country already seen (kept the first)")
+    df = df[~duplicates].reset_index(drop=True)
+
+df["iso3"] = iso3_codes(df["country"]).to_numpy()
+unmapped = sorted(df.loc[df["iso3"].isna(), "country"].dropna().unique())
+if unmapped:
+    print(f"⚠️ No ISO-3 code for: {', '.join(unmapped)} (left off the maps)")
 
 df.to_csv(INTERIM / "startups_clean.csv", index=False)
 print("✅ Cleaned data saved to data/interim/startups_clean.csv")
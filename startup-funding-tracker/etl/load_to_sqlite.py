@@ -25,13 +25,44 @@ CREATE TABLE IF NOT EXISTS startups (
     ipo INTEGER,
     customers_mil REAL,
     tech_stack TEXT,
-    followers REAL
+    followers REAL,
+    iso3 TEXT
 );
 """
 cur.executescript(schema)
 
 df = pd.read_csv(INTERIM / "startups_clean.csv")
 df.to_sql("startups", con, if_exists="replace", index=False)
+# `replace` drops the schema's primary key; keep id lookups indexed.
+cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_startups_id ON startups(startup_id)")
+# Filter pushdown (utils.queries.filter_clause) searches this instead of scanning the table.
+cur.execute("CREATE INDEX IF NOT EXISTS idx_startups_filter ON startups(country, industry, founded_year)")
+
+# Exit analytics read this cube instead of scanning every startup row.
+cur.executescript("""
+DROP TABLE IF EXISTS exit_cube;
+CREATE TABLE exit_cube AS
+SELECT country, industry, founded_year, funding_stage,
+       COUNT(*) AS startups, SUM(acquired) AS acquired, SUM(ipo) AS ipo
+FROM startups
+GROUP BY country, industry, founded_year, funding_stage;
+CREATE INDEX idx_exit_cube_filter ON exit_cube(country, industry, founded_year);
+""")
+
+# One-row headline KPIs of the whole dataset, painted by Home.py before pandas is even imported.
+cur.executescript("""
+DROP TABLE IF EXISTS kpi_summary;
+CREATE TABLE kpi_summary AS
+SELECT COUNT(*) AS startups,
+       SUM(funding_musd) AS total_funding_musd,
+       AVG(valuation_busd) AS avg_valuation_busd,
+       100.0 * AVG(ipo) AS ipo_pct,
+       100.0 * AVG(acquired) AS acquired_pct,
+       AVG(success_score) AS avg_success_score,
+       (SELECT country FROM startups GROUP BY country ORDER BY SUM(funding_musd) DESC LIMIT 1) AS top_country,
+       (SELECT industry FROM startups GROUP BY industry ORDER BY SUM(funding_musd) DESC LIMIT 1) AS top_industry
+FROM startups;
+""")
 
 cur.execute("""
 CREATE TABLE IF NOT EXISTS metadata (
@@ -11,5 +11,9 @@ print("🚀 Running full ETL pipeline...")
 os.system(f'python "{ETL_DIR / "fetch_data.py"}"')
 os.system(f'python "{ETL_DIR / "clean_transform.py"}"')
 os.system(f'python "{ETL_DIR / "load_to_sqlite.py"}"')
+os.system(f'python "{ETL_DIR / "build_sketches.py"}"')
+os.system(f'python "{ETL_DIR / "build_ranks.py"}"')
+os.system(f'python "{ETL_DIR / "build_neighbors.py"}"')
+os.system(f'python "{ETL_DIR / "warm_cache.py"}"')
 
 print("✅ ETL pipeline complete.")
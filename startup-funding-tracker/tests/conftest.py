@@ -0,0 +1,37 @@
+import sqlite3
+import sys
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# The app imports its helpers as `utils.*`, with app/ on the path (as `streamlit run app/Home.py` does).
+sys.path.insert(0, str(ROOT / "app"))
+
+
+@pytest.fixture(scope="session")
+def bundled():
+    """The bundled dataset as the dashboard serves it: the `startups` table the ETL builds."""
+    path = ROOT / "db" / "funding.db"
+    if not path.exists():
+        pytest.skip("db/funding.db not built; run etl/clean_transform.py and etl/load_to_sqlite.py")
+    with closing(sqlite3.connect(path)) as conn:
+        return pd.read_sql("SELECT * FROM startups", conn)
+
+
+@pytest.fixture(scope="session")
+def selections(bundled):
+    """(filter key, matching rows) pairs over the bundled data: everything, a slice, and a narrow slice."""
+    countries = sorted(bundled["country"].dropna().unique())
+    industries = sorted(bundled["industry"].dropna().unique())
+    years = (int(bundled["founded_year"].min()), int(bundled["founded_year"].max()))
+    keys = [
+        (tuple(countries), tuple(industries), years),
+        (tuple(countries[:4]), tuple(industries[:5]), (2000, 2018)),
+        (tuple(countries[1:2]), tuple(industries[2:4]), (2010, 2015)),
+    ]
+    return [(key, bundled[bundled["country"].isin(key[0]) & bundled["industry"].isin(key[1])
+                          & bundled["founded_year"].between(*key[2])]) for key in keys]
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from utils.charts import aggregate_for_chart
+
+
+@pytest.mark.parametrize("agg", ["sum", "mean", "count", "median"])
+def test_aggregate_matches_groupby(bundled, agg):
+    out = aggregate_for_chart(bundled, "industry", "funding_musd", agg=agg, color="country", top_n=50, color_top_n=50)
+    grouped = bundled.groupby(["industry", "country"])["funding_musd"]
+    expected = (grouped.size() if agg == "count" else grouped.agg(agg)).rename("funding_musd").reset_index()
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False)
+
+
+def test_numeric_axis_is_binned(bundled):
+    out = aggregate_for_chart(bundled, "employees", "funding_musd", bins=30)
+    assert len(out) <= 30
+    assert out["funding_musd"].sum() == bundled["funding_musd"].sum()
+
+
+def test_over_budget_raises(bundled):
+    # One group per startup name: far more marks than the budget allows.
+    with pytest.raises(ValueError, match="chart budget"):
+        aggregate_for_chart(bundled, "name", "funding_musd", top_n=len(bundled), budget=2_000)
+
+
+def test_capped_categories_stay_within_budget(bundled):
+    out = aggregate_for_chart(bundled, "name", "funding_musd", top_n=15, budget=2_000)
+    assert len(out) == 16
+    assert "Other" in set(out["name"])
+    assert out["funding_musd"].sum() == bundled["funding_musd"].sum()
@@ -0,0 +1,114 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.kpis import calculate_kpis, encode_dimensions, kpi_stats, kpis_from_stats
+
+
+def baseline_kpis(df):
+    """The row-by-row KPI dictionary the dashboard computed before sufficient statistics."""
+    return {
+        "Total Startups": len(df),
+        "Total Funding ($M)": df["funding_musd"].sum(),
+        "Avg Funding ($M)": df["funding_musd"].mean(),
+        "Avg Valuation ($B)": df["valuation_busd"].mean(),
+        "Avg Revenue ($M)": df["revenue_musd"].mean(),
+        "Avg Employees": df["employees"].mean(),
+        "IPO %": 100 * df["ipo"].mean(),
+        "Acquired %": 100 * df["acquired"].mean(),
+        "Avg Success Score": df["success_score"].mean(),
+        "Avg Customers (M)": df["customers_mil"].mean(),
+        "Top Country": df.groupby("country")["funding_musd"].sum().idxmax(),
+        "Top Industry": df.groupby("industry")["funding_musd"].sum().idxmax(),
+        "Median Funding ($M)": df["funding_musd"].median(),
+        "Valuation / Funding Ratio": (df["valuation_busd"].sum() / df["funding_musd"].sum()) if df["funding_musd"].sum() > 0 else 0,
+        "Top Tech Stack": df["tech_stack"].mode()[0] if "tech_stack" in df.columns and not df["tech_stack"].dropna().empty else "N/A",
+        "Highest Success Startup": df.loc[df["success_score"].idxmax(), "name"],
+        "Avg Funding per Employee": (df["funding_musd"].sum() / df["employees"].sum()) if df["employees"].sum() > 0 else 0,
+        "Total Followers (M)": df["followers"].sum() / 1_000_000,
+        "Avg Valuation / Employee": (df["valuation_busd"].sum() * 1000 / df["employees"].sum()) if df["employees"].sum() > 0 else 0,
+    }
+
+
+def startups(n, seed=0, nan_share=0.0):
+    """Synthetic `startups` frame with the dashboard's columns; `nan_share` of float cells set to NaN."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "name": [f"Startup_{i}" for i in range(n)],
+        "country": rng.choice(["USA", "India", "UK", "Germany", "Brazil"], n),
+        "industry": rng.choice(["AI", "FinTech", "HealthTech", "EdTech"], n),
+        "tech_stack": rng.choice(["Python", "Go", "Node.js", "Java"], n),
+        "funding_musd": rng.integers(1, 500, n),
+        "valuation_busd": rng.gamma(2.0, 1.5, n),
+        "revenue_musd": rng.integers(0, 300, n),
+        "employees": rng.integers(5, 5000, n),
+        "ipo": rng.integers(0, 2, n),
+        "acquired": rng.integers(0, 2, n),
+        "success_score": rng.integers(1, 11, n),
+        "customers_mil": rng.integers(0, 100, n),
+        "followers": rng.integers(0, 1_000_000, n),
+    })
+    if nan_share:
+        for col in ["funding_musd", "valuation_busd", "revenue_musd", "success_score", "country", "tech_stack"]:
+            df[col] = df[col].astype(float if col not in ("country", "tech_stack") else object)
+            df.loc[rng.random(n) < nan_share, col] = np.nan
+    return df
+
+
+def assert_same_kpis(actual, expected):
+    assert list(actual) == list(expected)
+    for key, value in expected.items():
+        got = actual[key]
+        if isinstance(value, float) and math.isnan(value):
+            assert isinstance(got, float) and math.isnan(got), key
+        else:
+            assert got == value, key
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_baseline(seed):
+    df = startups(2_000, seed)
+    assert_same_kpis(calculate_kpis(df), baseline_kpis(df))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_baseline_with_nans(seed):
+    df = startups(2_000, seed, nan_share=0.1)
+    assert_same_kpis(calculate_kpis(df), baseline_kpis(df))
+
+
+def test_all_nan_tech_stack_is_na():
+    df = startups(200, nan_share=0.0)
+    df["tech_stack"] = np.nan
+    assert calculate_kpis(df)["Top Tech Stack"] == "N/A" == baseline_kpis(df)["Top Tech Stack"]
+
+
+@pytest.mark.parametrize("nan_share", [0.0, 0.1])
+def test_filtered_frame_with_shared_codes(nan_share):
+    df = startups(3_000, seed=7, nan_share=nan_share)
+    codes = encode_dimensions(df)
+    for mask in [df["country"].isin(["USA", "India"]), df["industry"] == "AI", df["employees"] > 4_000]:
+        part = df[mask]
+        assert_same_kpis(kpis_from_stats(kpi_stats(part, codes)), baseline_kpis(part))
+
+
+def test_supplied_median_funding():
+    df = startups(1_000, seed=3, nan_share=0.1)
+    median = df["funding_musd"].median()
+    stats = kpi_stats(df, median_funding=median)
+    assert_same_kpis(calculate_kpis(df, stats), baseline_kpis(df))
+
+
+def test_single_row():
+    df = startups(1, seed=1)
+    assert_same_kpis(calculate_kpis(df), baseline_kpis(df))
+
+
+def test_empty_frame_raises_like_baseline():
+    df = startups(0)
+    with pytest.raises(ValueError):
+        baseline_kpis(df)
+    with pytest.raises(ValueError):
+        calculate_kpis(df)
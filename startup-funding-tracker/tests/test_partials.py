@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from utils.partials import (CORR_COLS, METRICS, IncrementalAggregate, build_comoments, build_partitions, merged_corr,
+                            partition_mask, reduce_partitions)
+
+
+@pytest.fixture(scope="module")
+def parts(bundled):
+    return build_partitions(bundled)
+
+
+def assert_matches_rows(state, rows, extrema=True):
+    """`state` agrees with pandas on `rows`: counts, sums, means and stds, plus extrema unless unknown (NaN)."""
+    summary = state.to_dict()
+    for m in METRICS:
+        col = rows[m]
+        got = summary[m]
+        assert got["count"] == col.count(), m
+        assert got["sum"] == pytest.approx(col.sum(), rel=1e-12), m
+        assert got["mean"] == pytest.approx(col.mean(), rel=1e-12), m
+        assert got["std"] == pytest.approx(col.std(), rel=1e-9), m
+        for stat, expected in (("min", col.min()), ("max", col.max())):
+            if extrema:
+                assert got[stat] == expected, (m, stat)
+            else:
+                assert np.isnan(got[stat]) or got[stat] == expected, (m, stat)
+        if extrema:
+            assert rows.loc[got["argmax"], m] == col.max(), m
+
+
+def test_reduce_matches_pandas(parts, selections):
+    for key, rows in selections:
+        assert_matches_rows(reduce_partitions(parts, partition_mask(parts, key)), rows)
+
+
+def test_subtraction_matches_pandas(bundled, parts, selections):
+    everything = reduce_partitions(parts)
+    for key, rows in selections[1:]:
+        rest = bundled.drop(rows.index)
+        assert_matches_rows(everything - reduce_partitions(parts, partition_mask(parts, key)), rest, extrema=False)
+
+
+def test_incremental_updates_match_pandas(parts, selections):
+    running = IncrementalAggregate(parts)
+    # Wide to narrow and back, so the aggregate both adds and drops partitions.
+    for key, rows in selections + selections[::-1]:
+        assert_matches_rows(running.update(key), rows)
+
+
+def test_merged_corr_matches_pandas(bundled, selections):
+    moments = build_comoments(bundled)
+    for key, rows in selections:
+        expected = rows.dropna(subset=CORR_COLS)[CORR_COLS].corr()
+        got = merged_corr(moments, partition_mask(moments["keys"], key))
+        np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+        assert list(got.index) == list(expected.index)
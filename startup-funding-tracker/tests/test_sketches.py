@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from utils.partials import partition_mask
+from utils.sketches import SKETCH_METRICS, KLLSketch, build_partition_sketches, grouped_quantiles, load_sketch_table, merged_quantiles
+
+QS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+# The documented KLL bound for k = 200: true normalized rank within q ± 1.7%.
+RANK_ERROR = 0.017
+
+
+def rank_error(values, estimate, q):
+    """Distance from `q` to the normalized rank interval of `estimate` among `values` (0 inside it)."""
+    lo, hi = np.mean(values < estimate), np.mean(values <= estimate)
+    return max(lo - q, q - hi, 0.0)
+
+
+def assert_within_bound(values, estimates):
+    values = values[~np.isnan(values)]
+    for q, estimate in zip(QS, estimates):
+        assert rank_error(values, estimate, q) <= RANK_ERROR, (q, estimate, np.quantile(values, q))
+
+
+@pytest.fixture(scope="module")
+def sketches(bundled):
+    return load_sketch_table(build_partition_sketches(bundled))
+
+
+@pytest.mark.parametrize("metric", SKETCH_METRICS)
+def test_merged_quantiles_match_numpy(bundled, sketches, metric):
+    assert_within_bound(bundled[metric].to_numpy(float), merged_quantiles(sketches[metric], QS))
+
+
+@pytest.mark.parametrize("metric", SKETCH_METRICS)
+def test_merged_quantiles_of_a_selection(bundled, sketches, metric):
+    countries = sorted(bundled["country"].dropna().unique())[:4]
+    industries = sorted(bundled["industry"].dropna().unique())[:6]
+    key = (tuple(countries), tuple(industries), (2000, 2020))
+    rows = bundled[bundled["country"].isin(countries) & bundled["industry"].isin(industries)
+                   & bundled["founded_year"].between(2000, 2020)]
+    table = sketches[metric]
+    assert_within_bound(rows[metric].to_numpy(float), merged_quantiles(table, QS, partition_mask(table, key)))
+
+
+@pytest.mark.parametrize("by", ["industry", "country"])
+def test_grouped_quantiles_match_numpy(bundled, sketches, by):
+    grouped = grouped_quantiles(sketches["funding_musd"], by, QS)
+    assert sorted(grouped.index) == sorted(bundled[by].dropna().unique())
+    for name, group in bundled.groupby(by):
+        assert_within_bound(group["funding_musd"].to_numpy(float), grouped.loc[name].to_numpy())
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_merge_keeps_every_level_within_capacity(seed):
+    rng = np.random.default_rng(seed)
+    k = int(rng.integers(8, 64))
+    parts = [KLLSketch(k).update(rng.normal(size=n)) for n in rng.integers(1, 2_000, size=int(rng.integers(2, 20)))]
+    merged = KLLSketch.merged(parts, k)
+    assert merged.n == sum(part.n for part in parts)
+    assert all(len(level) <= merged._capacity(h) for h, level in enumerate(merged.levels))
+    weight = sum(len(level) * 2 ** h for h, level in enumerate(merged.levels))
+    assert weight == merged.n
+
+
+def test_round_trip_preserves_sketch():
+    sketch = KLLSketch().update(np.arange(10_000, dtype=float))
+    restored = KLLSketch.from_bytes(sketch.to_bytes())
+    assert restored.n == sketch.n
+    assert np.array_equal(restored.quantiles(QS), sketch.quantiles(QS))
@@ -0,0 +1,12 @@
+import importlib.util
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location(
+    "startup_budget", Path(__file__).resolve().parents[1] / "ci" / "startup_budget.py")
+startup_budget = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(startup_budget)
+
+
+def test_first_paint_stays_light_and_within_budget():
+    best, heavy = startup_budget.measure()
+    assert startup_budget.failures(best, heavy) == []
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.partials import METRICS
+from utils.time_index import YearIndex
+
+
+@pytest.fixture(scope="module")
+def index(bundled):
+    return YearIndex(bundled)
+
+
+def test_totals_match_pandas(index, selections):
+    for key, rows in selections:
+        totals = index.totals(key)
+        assert totals["rows"] == len(rows)
+        for m in METRICS:
+            assert totals["count"][m] == rows[m].count(), m
+            assert totals["sum"][m] == pytest.approx(rows[m].sum(), rel=1e-12), m
+
+
+def test_yearly_matches_groupby(index, selections):
+    aggs = {"funding_musd": "sum", "valuation_busd": "mean", "success_score": "count"}
+    for key, rows in selections:
+        expected = rows.groupby("founded_year").agg(aggs)
+        pd.testing.assert_frame_equal(index.yearly(key, aggs), expected, check_dtype=False, check_index_type=False)
+
+
+def test_empty_selection(index):
+    key = ((), (), (2000, 2020))
+    assert index.totals(key)["rows"] == 0
+    assert index.yearly(key, {"funding_musd": "sum"}).empty
+
+
+def test_unknown_stat_raises(index, selections):
+    with pytest.raises(ValueError):
+        index.yearly(selections[0][0], {"funding_musd": "median"})
+
+
+def test_years_outside_the_data_are_clipped(index, bundled):
+    countries = tuple(bundled["country"].unique())
+    industries = tuple(bundled["industry"].unique())
+    assert index.totals((countries, industries, (1900, 2100)))["rows"] == len(bundled)
+    assert np.isclose(index.totals((countries, industries, (1900, 2100)))["sum"]["funding_musd"], bundled["funding_musd"].sum())
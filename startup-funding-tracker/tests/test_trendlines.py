@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from utils.partials import build_comoments, partition_mask
+from utils.trendlines import fit_lines, group_moments, trendline_segments
+
+
+@pytest.mark.parametrize("x, y, by", [("employees", "success_score", "industry"),
+                                      ("funding_musd", "valuation_busd", "country")])
+def test_fit_lines_match_polyfit(bundled, selections, x, y, by):
+    moments = build_comoments(bundled)
+    for key, rows in selections:
+        fits = fit_lines(group_moments(moments, x, y, by, partition_mask(moments["keys"], key)))
+        assert sorted(fits.index) == sorted(rows[by].unique())
+        for name, group in rows.groupby(by):
+            slope, intercept = np.polyfit(group[x], group[y], 1)
+            r = np.corrcoef(group[x], group[y])[0, 1]
+            assert fits.loc[name, "n"] == len(group)
+            assert fits.loc[name, "slope"] == pytest.approx(slope, rel=1e-9, abs=1e-12)
+            assert fits.loc[name, "intercept"] == pytest.approx(intercept, rel=1e-9, abs=1e-9)
+            assert fits.loc[name, "r2"] == pytest.approx(r ** 2, rel=1e-9, abs=1e-12)
+
+
+def test_segments_span_each_group(bundled):
+    fits = fit_lines(group_moments(build_comoments(bundled), "employees", "success_score", "industry"))
+    grouped = bundled.groupby("industry")["employees"]
+    segments = trendline_segments(fits, grouped.min(), grouped.max())
+    np.testing.assert_allclose(segments["y1"], fits["intercept"] + fits["slope"] * grouped.max().reindex(fits.index))
+    assert (segments["x0"] <= segments["x1"]).all()